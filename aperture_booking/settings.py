@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Only active with REQUEST_PROFILING_ENABLED
+    'booking.middleware.profiling.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -156,6 +158,23 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caches. Idempotency keys must be visible to every worker, so they are kept
+# in a database table (created by migration) unless a shared cache such as
+# Redis is configured; see booking/idempotency.py
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'idempotency': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'booking_idempotency_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+IDEMPOTENCY_CACHE = 'idempotency'
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -165,6 +184,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        # Budgets come from SystemSetting api_throttle_rate_<scope>, see booking/throttling.py.
+        # Counters live in API_THROTTLE_CACHE (default 'default'), which must be shared by
+        # every worker (Redis) for the limits to hold overall rather than per worker.
+        'booking.throttling.UserRateThrottle',
+        'booking.throttling.AnonRateThrottle',
+        'booking.throttling.ScopedRateThrottle',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -276,6 +303,11 @@ LOGGING = {
             'level': 'INFO' if not DEBUG else 'DEBUG',
             'propagate': False,
         },
+        'booking.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
         'root': {
             'handlers': ['console'],
             'level': 'WARNING',
@@ -303,6 +335,30 @@ SCHEDULER_CONFIG = {
 # Disable APScheduler for development to prevent database locking issues
 SCHEDULER_AUTOSTART = False
 
+# Request profiling (site admin > Request Performance); adds a little overhead to every request
+REQUEST_PROFILING_ENABLED = config('REQUEST_PROFILING_ENABLED', default=False, cast=bool)
+# Requests slower than this, or running more queries, are logged to logs/slow_requests.log
+REQUEST_PROFILING_SLOW_MS = config('REQUEST_PROFILING_SLOW_MS', default=1000, cast=int)
+REQUEST_PROFILING_SLOW_QUERIES = config('REQUEST_PROFILING_SLOW_QUERIES', default=100, cast=int)
+
+if REQUEST_PROFILING_ENABLED:
+    LOGGING['handlers']['slow_requests_file'] = {
+        'level': 'WARNING',
+        'class': 'logging.handlers.RotatingFileHandler',
+        'filename': str(LOG_DIR / 'slow_requests.log'),
+        'maxBytes': 1024*1024*10,  # 10 MB
+        'backupCount': 5,
+        'formatter': 'simple',
+        'delay': True,  # Only create the file once a slow request is logged
+    }
+    LOGGING['loggers']['booking.performance']['handlers'].append('slow_requests_file')
+
+# CSV user imports run in the background in chunks; 0 means no upload size limit
+USER_IMPORT_MAX_FILE_SIZE = config('USER_IMPORT_MAX_FILE_SIZE', default=0, cast=int)
+USER_IMPORT_CHUNK_SIZE = config('USER_IMPORT_CHUNK_SIZE', default=1000, cast=int)
+# Seconds without progress after which a running import is marked failed
+USER_IMPORT_STALL_TIMEOUT = config('USER_IMPORT_STALL_TIMEOUT', default=900, cast=int)
+
 # Google Calendar OAuth Integration
 GOOGLE_OAUTH2_CLIENT_ID = os.environ.get('GOOGLE_OAUTH2_CLIENT_ID', '')
 GOOGLE_OAUTH2_CLIENT_SECRET = os.environ.get('GOOGLE_OAUTH2_CLIENT_SECRET', '')
@@ -56,6 +56,7 @@ if os.environ.get('REDIS_URL'):
             }
         }
     }
+    IDEMPOTENCY_CACHE = 'default'
     
     # Use Redis for sessions (optional)
     SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
@@ -23,7 +23,8 @@ from django.urls import reverse
 from .models import (
     AboutPage, LabSettings, UserProfile, Resource, Booking, BookingAttendee, 
     ApprovalRule, Maintenance, BookingHistory,
-    Notification, NotificationPreference, EmailTemplate, PushSubscription,
+    Notification, NotificationPreference, EmailTemplate, PushSubscription, OutboxEvent,
+    UserImportJob,
     WaitingListEntry,
     CheckInOutEvent, UsageAnalytics,
     Faculty, College, Department,
@@ -165,38 +166,10 @@ class UserProfileAdmin(admin.ModelAdmin):
     actions = ['export_users_csv', 'bulk_assign_group', 'bulk_change_role', 'bulk_set_training_level']
     
     def export_users_csv(self, request, queryset):
-        """Export selected users to CSV format."""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="users_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'username', 'email', 'first_name', 'last_name', 'role', 'group',
-            'faculty_code', 'college_code', 'department_code', 'student_id',
-            'staff_number', 'training_level', 'phone'
-        ])
-        
-        for profile in queryset.select_related('user', 'faculty', 'college', 'department'):
-            writer.writerow([
-                profile.user.username,
-                profile.user.email,
-                profile.user.first_name,
-                profile.user.last_name,
-                profile.role,
-                profile.group,
-                profile.faculty.code if profile.faculty else '',
-                profile.college.code if profile.college else '',
-                profile.department.code if profile.department else '',
-                profile.student_id or '',
-                profile.staff_number or '',
-                profile.training_level,
-                profile.phone,
-            ])
+        """Stream selected users as CSV in the import_users_csv format."""
+        from .exports import USER_PROFILE_COLUMNS, export_response
         
-        return response
+        return export_response(queryset, USER_PROFILE_COLUMNS, 'users_export')
     export_users_csv.short_description = 'Export selected users as CSV'
     
     def bulk_assign_group(self, request, queryset):
@@ -353,31 +326,29 @@ class BookingAdmin(admin.ModelAdmin):
         """Mark selected bookings as no-show."""
         from .checkin_service import checkin_service
         
-        count = 0
-        for booking in queryset:
-            if not booking.checked_in_at and not booking.no_show:
-                try:
-                    success, message = checkin_service.mark_no_show(booking.id, request.user, "Marked by admin")
-                    if success:
-                        count += 1
-                except Exception:
-                    pass
-        
-        self.message_user(request, f'Marked {count} bookings as no-show.')
+        try:
+            result = checkin_service.bulk_mark_no_show(queryset, request.user, "Marked by admin")
+        except PermissionError as e:
+            self.message_user(request, str(e), level='error')
+            return
+        
+        self.message_user(
+            request,
+            f"Marked {result['updated']} bookings as no-show "
+            f"({result['skipped']} skipped as already checked in or marked)."
+        )
     mark_no_show.short_description = 'Mark selected bookings as no-show'
     
     def auto_check_out_selected(self, request, queryset):
         """Auto check-out selected bookings."""
-        count = 0
-        for booking in queryset:
-            if booking.is_checked_in:
-                try:
-                    if booking.auto_check_out():
-                        count += 1
-                except Exception:
-                    pass
-        
-        self.message_user(request, f'Auto checked-out {count} bookings.')
+        from .checkin_service import checkin_service
+        
+        result = checkin_service.bulk_auto_check_out(queryset)
+        self.message_user(
+            request,
+            f"Auto checked-out {result['updated']} bookings "
+            f"({result['skipped']} skipped as not checked in)."
+        )
     auto_check_out_selected.short_description = 'Auto check-out selected bookings'
     
     def get_queryset(self, request):
@@ -409,17 +380,45 @@ class BookingHistoryAdmin(admin.ModelAdmin):
     date_hierarchy = 'timestamp'
 
 
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event_type', 'status', 'attempts', 'created_at', 'available_at', 'dispatched_at')
+    list_filter = ('event_type', 'status', 'created_at')
+    readonly_fields = ('event_type', 'payload', 'attempts', 'last_error', 'created_at', 'dispatched_at')
+    actions = ['retry_events']
+    
+    def retry_events(self, request, queryset):
+        """Queue failed events for another dispatch attempt."""
+        from django.utils import timezone
+        updated = queryset.filter(status='failed').update(
+            status='pending', attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} events queued for retry.')
+    retry_events.short_description = "Retry failed events"
+
+
+@admin.register(UserImportJob)
+class UserImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created_by', 'status', 'rows_processed', 'created_count', 'updated_count', 'error_count', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    readonly_fields = (
+        'file', 'created_by', 'update_existing', 'status', 'file_size', 'bytes_processed',
+        'rows_processed', 'created_count', 'updated_count', 'skipped_count', 'error_count',
+        'errors', 'warnings', 'last_error', 'created_at', 'started_at', 'progress_at', 'finished_at'
+    )
+
+
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'notification_type', 'delivery_method', 'status', 'priority', 'created_at', 'retry_count')
-    list_filter = ('notification_type', 'delivery_method', 'status', 'priority', 'created_at')
+    list_filter = ('notification_type', 'delivery_method', 'status', 'digest_frequency', 'priority', 'created_at')
     search_fields = ('title', 'message', 'user__username', 'user__email')
     readonly_fields = ('created_at', 'updated_at', 'sent_at', 'read_at', 'next_retry_at')
     date_hierarchy = 'created_at'
     
     fieldsets = (
         ('Notification Details', {
-            'fields': ('user', 'notification_type', 'title', 'message', 'priority', 'delivery_method', 'status')
+            'fields': ('user', 'notification_type', 'title', 'message', 'priority', 'delivery_method', 'status', 'digest_frequency')
         }),
         ('Related Objects', {
             'fields': ('booking', 'resource', 'maintenance', 'access_request', 'training_request'),
@@ -1574,13 +1573,9 @@ class MaintenanceAdmin(admin.ModelAdmin):
     
     def calculate_analytics(self, request, queryset):
         """Recalculate analytics for resources with selected maintenance."""
-        resources = set(maintenance.resource for maintenance in queryset)
-        updated = 0
-        
-        for resource in resources:
-            analytics, created = MaintenanceAnalytics.objects.get_or_create(resource=resource)
-            analytics.calculate_metrics()
-            updated += 1
+        resource_ids = set(queryset.values_list('resource_id', flat=True))
+        MaintenanceAnalytics.calculate_metrics_bulk(resource_ids)
+        updated = len(resource_ids)
         
         self.message_user(request, f'Recalculated analytics for {updated} resources.')
     calculate_analytics.short_description = 'Recalculate analytics for affected resources'
@@ -1743,10 +1738,9 @@ class MaintenanceAnalyticsAdmin(admin.ModelAdmin):
     
     def recalculate_metrics(self, request, queryset):
         """Recalculate metrics for selected analytics."""
-        updated = 0
-        for analytics in queryset:
-            analytics.calculate_metrics()
-            updated += 1
+        resource_ids = list(queryset.values_list('resource_id', flat=True))
+        MaintenanceAnalytics.calculate_metrics_bulk(resource_ids)
+        updated = len(resource_ids)
         
         self.message_user(request, f'Recalculated metrics for {updated} resources.')
     recalculate_metrics.short_description = 'Recalculate metrics for selected analytics'
@@ -24,7 +24,9 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from django.conf import settings
+from django.core import serializers
 from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import connection
 from django.core.files.storage import default_storage
 import tempfile
@@ -304,30 +306,46 @@ class BackupService:
                 'errors': [str(e)]
             }
     
-    def _backup_django_dumpdata(self, backup_path: str, timestamp: str) -> Dict[str, Any]:
-        """Backup using Django's dumpdata command as fallback."""
-        backup_file = os.path.join(backup_path, f'database_django_{timestamp}.json')
+    def _backup_django_dumpdata(self, backup_path: str, timestamp: str,
+                                model_filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Backup using a streaming NDJSON export as fallback.
+        
+        Each model is read with ``iterator(chunk_size=...)`` and every object is
+        written as one JSON line straight into the (optionally gzipped) output,
+        so memory stays flat regardless of table size.
+        
+        Args:
+            backup_path: Directory to write the dump into
+            timestamp: Timestamp used in the dump file name
+            model_filters: Optional per-model filters keyed by lower-case model
+                label (e.g. ``'booking.notification'``). Values may be a ``Q``
+                object, a dict of lookup kwargs or a callable taking and
+                returning a queryset. Merged over ``BACKUP_DUMPDATA_FILTERS``.
+        """
+        backup_file = os.path.join(backup_path, f'database_django_{timestamp}.jsonl')
+        if self.compression_enabled:
+            backup_file = f"{backup_file}.gz"
         
         try:
-            with open(backup_file, 'w') as f:
-                call_command('dumpdata', stdout=f, indent=2)
+            filters = dict(getattr(settings, 'BACKUP_DUMPDATA_FILTERS', {}))
+            filters.update(model_filters or {})
             
-            if self.compression_enabled:
-                compressed_file = f"{backup_file}.gz"
-                with open(backup_file, 'rb') as f_in:
-                    with gzip.open(compressed_file, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                os.remove(backup_file)
-                backup_file = compressed_file
+            opener = gzip.open if self.compression_enabled else open
+            with opener(backup_file, 'wt', encoding='utf-8') as f:
+                object_counts = self.stream_dump(f, model_filters=filters)
             
             return {
                 'success': True,
                 'file_path': backup_file,
                 'size': os.path.getsize(backup_file),
+                'object_counts': object_counts,
                 'errors': []
             }
             
         except Exception as e:
+            if os.path.exists(backup_file):
+                os.remove(backup_file)
             return {
                 'success': False,
                 'file_path': '',
@@ -335,6 +353,150 @@ class BackupService:
                 'errors': [str(e)]
             }
     
+    def _get_dump_models(self) -> List[Any]:
+        """Return concrete, migratable models in dependency order for dumping."""
+        from django.apps import apps
+        from django.core.serializers import sort_dependencies
+        from django.db import router
+        
+        excluded = {label.lower() for label in getattr(settings, 'BACKUP_DUMPDATA_EXCLUDE', [])}
+        app_list = [(app_config, None) for app_config in apps.get_app_configs()
+                    if app_config.models_module is not None and app_config.label not in excluded]
+        
+        models = []
+        for model in sort_dependencies(app_list, allow_cycles=True):
+            if model._meta.proxy or not model._meta.managed:
+                continue
+            if model._meta.label_lower in excluded:
+                continue
+            if not router.allow_migrate_model(connection.alias, model):
+                continue
+            models.append(model)
+        return models
+    
+    def _apply_dump_filter(self, queryset, model_filter: Any):
+        """Apply a single per-model filter specification to a queryset."""
+        from django.db.models import Q
+        
+        if model_filter is None:
+            return queryset
+        if isinstance(model_filter, Q):
+            return queryset.filter(model_filter)
+        if isinstance(model_filter, dict):
+            return queryset.filter(**model_filter)
+        if callable(model_filter):
+            return model_filter(queryset)
+        raise ValueError(f"Unsupported backup filter: {model_filter!r}")
+    
+    def stream_dump(self, stream, model_filters: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Write every model's rows to ``stream`` as NDJSON in dependency order.
+        
+        Each line holds one object in Django's python serialization format
+        (``{"model": ..., "pk": ..., "fields": {...}}``), so backups can be
+        reloaded with :meth:`stream_load` or converted for ``loaddata``.
+        
+        Returns:
+            Mapping of model label to number of objects written
+        """
+        chunk_size = getattr(settings, 'BACKUP_DUMPDATA_CHUNK_SIZE', 2000)
+        model_filters = {label.lower(): spec for label, spec in (model_filters or {}).items()}
+        object_counts = {}
+        
+        for model in self._get_dump_models():
+            label = model._meta.label_lower
+            queryset = model._default_manager.using(connection.alias).order_by(model._meta.pk.name)
+            queryset = self._apply_dump_filter(queryset, model_filters.get(label))
+            
+            # Prefetch auto-created m2m relations so the serializer does not
+            # issue one query per object for each many-to-many field.
+            m2m_fields = [field.name for field in model._meta.many_to_many
+                          if field.remote_field.through._meta.auto_created]
+            if m2m_fields:
+                queryset = queryset.prefetch_related(*m2m_fields)
+            
+            count = 0
+            chunk = []
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                chunk.append(obj)
+                if len(chunk) >= chunk_size:
+                    count += self._write_dump_chunk(stream, chunk)
+                    chunk = []
+            if chunk:
+                count += self._write_dump_chunk(stream, chunk)
+            
+            if count:
+                object_counts[label] = count
+                logger.debug(f"Dumped {count} {label} objects")
+        
+        return object_counts
+    
+    def _write_dump_chunk(self, stream, chunk: List[Any]) -> int:
+        """Serialize a chunk of model instances as NDJSON lines."""
+        lines = [json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+                 for data in serializers.serialize('python', chunk)]
+        stream.write('\n'.join(lines))
+        stream.write('\n')
+        return len(lines)
+    
+    def stream_load(self, stream) -> Dict[str, Any]:
+        """
+        Load an NDJSON dump produced by :meth:`stream_dump`.
+        
+        Objects are deserialized and saved in chunks inside a single
+        transaction with constraint checks deferred until the end, mirroring
+        ``loaddata`` without reading the whole file into memory.
+        """
+        from django.core.management.color import no_style
+        from django.db import transaction
+        
+        chunk_size = getattr(settings, 'BACKUP_DUMPDATA_CHUNK_SIZE', 2000)
+        loaded_models = set()
+        loaded_count = 0
+        deferred_objects = []
+        
+        def save_chunk(chunk):
+            nonlocal loaded_count
+            for obj in serializers.deserialize('python', chunk, ignorenonexistent=True,
+                                               handle_forward_references=True):
+                obj.save(using=connection.alias)
+                if obj.deferred_fields:
+                    deferred_objects.append(obj)
+                loaded_models.add(obj.object.__class__)
+                loaded_count += 1
+        
+        with transaction.atomic(using=connection.alias):
+            with connection.constraint_checks_disabled():
+                chunk = []
+                for line in stream:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    chunk.append(json.loads(line))
+                    if len(chunk) >= chunk_size:
+                        save_chunk(chunk)
+                        chunk = []
+                if chunk:
+                    save_chunk(chunk)
+                
+                for obj in deferred_objects:
+                    obj.save_deferred_fields(using=connection.alias)
+            
+            table_names = [model._meta.db_table for model in loaded_models]
+            connection.check_constraints(table_names=table_names)
+        
+        if loaded_models:
+            sequence_sql = connection.ops.sequence_reset_sql(no_style(), loaded_models)
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for sql in sequence_sql:
+                        cursor.execute(sql)
+        
+        return {
+            'objects_loaded': loaded_count,
+            'models_loaded': len(loaded_models)
+        }
+    
     def backup_media_files(self, backup_path: str) -> Dict[str, Any]:
         """Backup media files."""
         result = {
@@ -796,7 +958,8 @@ class BackupService:
             db_files = []
             for file in os.listdir(backup_path):
                 if file.startswith('database_') and (file.endswith('.sql') or file.endswith('.db') 
-                                                   or file.endswith('.json') or file.endswith('.gz')):
+                                                   or file.endswith('.json') or file.endswith('.jsonl')
+                                                   or file.endswith('.gz')):
                     db_files.append(file)
             
             if not db_files:
@@ -1000,6 +1163,9 @@ class BackupService:
     
     def _restore_django_loaddata(self, db_file_path: str) -> Dict[str, Any]:
         """Restore using Django's loaddata command."""
+        if db_file_path.endswith('.jsonl') or db_file_path.endswith('.jsonl.gz'):
+            return self._restore_django_stream(db_file_path)
+        
         try:
             # Handle compressed file
             if db_file_path.endswith('.gz'):
@@ -1040,6 +1206,33 @@ class BackupService:
                 'errors': [str(e)]
             }
     
+    def _restore_django_stream(self, db_file_path: str) -> Dict[str, Any]:
+        """Restore a streaming NDJSON dump created by the dumpdata fallback."""
+        try:
+            from django.db import connections
+            connections.close_all()
+            
+            # Flush existing data and stream the backup back in
+            call_command('flush', '--noinput')
+            
+            opener = gzip.open if db_file_path.endswith('.gz') else open
+            with opener(db_file_path, 'rt', encoding='utf-8') as f:
+                load_result = self.stream_load(f)
+            
+            return {
+                'success': True,
+                'restored_file': db_file_path,
+                'objects_loaded': load_result['objects_loaded'],
+                'errors': []
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'restored_file': '',
+                'errors': [str(e)]
+            }
+    
     def _restore_media_files(self, backup_path: str) -> Dict[str, Any]:
         """Restore media files from backup."""
         result = {
@@ -1160,7 +1353,8 @@ class BackupService:
             # Check for database files
             db_files = [f for f in os.listdir(extraction_path) 
                        if f.startswith('database_') and 
-                       (f.endswith('.sql') or f.endswith('.db') or f.endswith('.json') or f.endswith('.gz'))]
+                       (f.endswith('.sql') or f.endswith('.db') or f.endswith('.json') or
+                        f.endswith('.jsonl') or f.endswith('.gz'))]
             
             if db_files:
                 components['database'] = True
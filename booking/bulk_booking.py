@@ -0,0 +1,170 @@
+# booking/bulk_booking.py
+"""
+Bulk booking creation for the Aperature Booking.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import logging
+from bisect import bisect_left
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking, BookingHistory, Resource, UserProfile
+from .outbox import record_event
+from .serializers import BulkBookingItemSerializer
+from .services.google_calendar import queue_bookings_sync
+
+logger = logging.getLogger(__name__)
+
+# Statuses that block the time slot for new bookings
+BLOCKING_STATUSES = ['approved', 'pending']
+
+
+class BulkBookingService:
+    """Service for creating many bookings at once, such as a course timetable."""
+    
+    def create_bookings(self, user, items: List[dict], atomic: bool = True) -> List[Dict]:
+        """
+        Validate and create a batch of bookings for a user.
+
+        Items are checked against existing bookings with one query, and against
+        earlier items in the batch in memory. Valid bookings are inserted with
+        bulk_create; their history, notifications and calendar sync are handled
+        for the batch as a whole. In atomic mode nothing is created unless every
+        item is valid.
+
+        Returns one result per item, with a status of 'created' (and the new id),
+        'error' (and the errors) or 'skipped' (valid, but the batch failed).
+        """
+        results = [None] * len(items)
+        candidates = []
+        for index, item in enumerate(items):
+            serializer = BulkBookingItemSerializer(data=item)
+            if serializer.is_valid():
+                candidates.append((index, serializer.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+        
+        profile = UserProfile.objects.filter(user=user).first()
+        with transaction.atomic():
+            # Lock the resources so concurrent bulk requests can't double-book them
+            resources = Resource.objects.select_for_update().in_bulk(
+                {data['resource_id'] for _, data in candidates}
+            )
+            existing = self._get_existing_intervals(candidates)
+            accepted = {}
+            valid = []
+            for index, data in candidates:
+                error = self._check_item(data, resources.get(data['resource_id']), profile, existing, accepted)
+                if error:
+                    results[index] = {'index': index, 'status': 'error', 'errors': {'non_field_errors': [error]}}
+                else:
+                    accepted.setdefault(data['resource_id'], []).append((index, data))
+                    valid.append((index, data))
+            
+            if atomic and len(valid) < len(items):
+                for index, data in valid:
+                    results[index] = {'index': index, 'status': 'skipped'}
+                return results
+            
+            bookings = Booking.objects.bulk_create([Booking(user=user, **data) for _, data in valid])
+            BookingHistory.objects.bulk_create([
+                BookingHistory(
+                    booking=booking,
+                    user=user,
+                    action='created',
+                    new_values={
+                        'title': booking.title,
+                        'start_time': booking.start_time.isoformat(),
+                        'end_time': booking.end_time.isoformat(),
+                        'status': booking.status,
+                    }
+                )
+                for booking in bookings
+            ])
+            booking_ids = [booking.pk for booking in bookings]
+            if booking_ids:
+                record_event('bookings_created', booking_ids=booking_ids)
+                queue_bookings_sync(user.pk, booking_ids)
+        
+        for (index, _), booking in zip(valid, bookings):
+            results[index] = {'index': index, 'status': 'created', 'id': booking.pk}
+        
+        logger.info(f"{len(bookings)} of {len(items)} bookings created in bulk by {user.username}")
+        return results
+    
+    def _get_existing_intervals(self, candidates) -> Dict[int, tuple]:
+        """
+        Load blocking bookings that could overlap any candidate, in one query.
+
+        Returns {resource_id: (starts, max_ends)}, sorted by start time, where
+        max_ends[i] is the latest end among the first i + 1 bookings.
+        """
+        if not candidates:
+            return {}
+        
+        rows = Booking.objects.filter(
+            resource_id__in={data['resource_id'] for _, data in candidates},
+            status__in=BLOCKING_STATUSES,
+            start_time__lt=max(data['end_time'] for _, data in candidates),
+            end_time__gt=min(data['start_time'] for _, data in candidates)
+        ).order_by('start_time').values_list('resource_id', 'start_time', 'end_time')
+        
+        intervals = {}
+        for resource_id, start_time, end_time in rows:
+            starts, max_ends = intervals.setdefault(resource_id, ([], []))
+            starts.append(start_time)
+            max_ends.append(max(end_time, max_ends[-1]) if max_ends else end_time)
+        return intervals
+    
+    def _check_item(self, data, resource, profile, existing, accepted) -> Optional[str]:
+        """Return why a booking can't be created, or None if it can."""
+        start_time, end_time = data['start_time'], data['end_time']
+        if resource is None:
+            return "Selected resource does not exist."
+        if not resource.is_active:
+            return "Selected resource is not active."
+        if profile is None:
+            return "User profile not found. Please contact administrator."
+        if not resource.is_available_for_user(profile):
+            return "You don't have permission to book this resource."
+        
+        # Sysadmins bypass time restrictions, as for single bookings
+        if profile.role != 'sysadmin':
+            if start_time < timezone.now() - timedelta(minutes=5):
+                return "Cannot book in the past."
+            if (start_time.hour < 9 or start_time.hour >= 18 or end_time.hour < 9 or
+                    end_time.hour > 18 or (end_time.hour == 18 and end_time.minute > 0)):
+                return "Bookings must be between 09:00 and 18:00."
+            if resource.max_booking_hours:
+                duration_hours = (end_time - start_time).total_seconds() / 3600
+                if duration_hours > resource.max_booking_hours:
+                    return f"Booking exceeds maximum allowed hours ({resource.max_booking_hours}h)."
+        
+        starts, max_ends = existing.get(resource.pk, ((), ()))
+        # Bookings starting before this one ends overlap it if any of them ends after it starts
+        position = bisect_left(starts, end_time)
+        if position and max_ends[position - 1] > start_time:
+            return "This time slot conflicts with existing bookings."
+        
+        for index, other in accepted.get(resource.pk, ()):
+            if other['start_time'] < end_time and other['end_time'] > start_time:
+                return f"This time slot conflicts with booking {index} in this request."
+        return None
+
+
+# Global service instance
+bulk_booking_service = BulkBookingService()
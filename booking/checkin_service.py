@@ -21,9 +21,11 @@ from django.utils import timezone
 from django.db.models import Q, F, Count, Avg, Sum
 from django.db import transaction
 from .models import (
-    Booking, CheckInOutEvent, UsageAnalytics, Resource, UserProfile
+    Booking, BookingHistory, CheckInOutEvent, UsageAnalytics, Resource, UserProfile
 )
 from .notifications import notification_service
+from .outbox import record_event
+from .services.google_calendar import queue_users_bookings_sync
 
 logger = logging.getLogger(__name__)
 
@@ -187,6 +189,134 @@ class CheckInService:
             logger.error(f"Error marking booking {booking_id} as no-show: {str(e)}")
             return False, f"Failed to mark as no-show: {str(e)}"
     
+    def bulk_mark_no_show(self, bookings, user, notes: str = "") -> Dict[str, int]:
+        """
+        Mark many bookings as no-show in a few statements (admin only).
+
+        Bookings already checked in or marked are skipped. Owner notifications
+        are sent from the outbox after commit and the changes are queued for
+        calendar sync. Returns updated/skipped counts.
+        """
+        try:
+            if user.userprofile.role not in ['lab_manager', 'sysadmin']:
+                raise PermissionError("Only lab managers can mark bookings as no-show.")
+        except UserProfile.DoesNotExist:
+            raise PermissionError("User profile not found.")
+        
+        now = timezone.now()
+        with transaction.atomic():
+            selected = Booking.objects.select_for_update().filter(pk__in=bookings.values('pk'))
+            total = selected.count()
+            rows = list(
+                selected.filter(checked_in_at__isnull=True, no_show=False).values(
+                    'id', 'user_id', 'status', 'resource_id', 'start_time', 'end_time'
+                )
+            )
+            booking_ids = [row['id'] for row in rows]
+            
+            updated = Booking.objects.filter(id__in=booking_ids).update(
+                no_show=True, status='completed', updated_at=now
+            )
+            CheckInOutEvent.objects.bulk_create([
+                CheckInOutEvent(
+                    booking_id=row['id'], event_type='no_show', user=user, timestamp=now, notes=notes
+                )
+                for row in rows
+            ])
+            BookingHistory.objects.bulk_create([
+                BookingHistory(
+                    booking_id=row['id'], user=user, action='updated', notes=notes,
+                    old_values={'no_show': False, 'status': row['status']},
+                    new_values={'no_show': True, 'status': 'completed'}
+                )
+                for row in rows
+            ])
+            self._bulk_update_usage_analytics(rows, 'no_show_bookings')
+            if booking_ids:
+                record_event('bookings_marked_no_show', booking_ids=booking_ids)
+            # The update skips post_save, which queues single bookings
+            self._queue_calendar_sync(rows)
+        
+        logger.info(f"{updated} bookings marked as no-show by {user.username}")
+        return {'updated': updated, 'skipped': total - updated}
+    
+    def bulk_auto_check_out(self, bookings) -> Dict[str, int]:
+        """
+        Automatically check out many bookings in a few statements.
+
+        Only bookings currently checked in are updated; their actual end time
+        is the scheduled end. Notifications are sent from the outbox after
+        commit and the changes are queued for calendar sync. Returns
+        updated/skipped counts.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            selected = Booking.objects.select_for_update().filter(pk__in=bookings.values('pk'))
+            total = selected.count()
+            rows = list(
+                selected.filter(checked_in_at__isnull=False, checked_out_at__isnull=True).values(
+                    'id', 'user_id', 'status', 'resource_id', 'start_time', 'end_time', 'actual_start_time'
+                )
+            )
+            booking_ids = [row['id'] for row in rows]
+            
+            updated = Booking.objects.filter(id__in=booking_ids).update(
+                checked_out_at=now,
+                actual_end_time=F('end_time'),
+                auto_checked_out=True,
+                status='completed',
+                updated_at=now
+            )
+            CheckInOutEvent.objects.bulk_create([
+                CheckInOutEvent(
+                    booking_id=row['id'], event_type='auto_check_out', user_id=row['user_id'],
+                    timestamp=now, actual_time=row['end_time']
+                )
+                for row in rows
+            ])
+            BookingHistory.objects.bulk_create([
+                BookingHistory(
+                    booking_id=row['id'], user_id=row['user_id'], action='updated',
+                    old_values={
+                        'checked_out_at': None, 'actual_end_time': None,
+                        'auto_checked_out': False, 'status': row['status']
+                    },
+                    new_values={
+                        'checked_out_at': now.isoformat(), 'actual_end_time': row['end_time'].isoformat(),
+                        'auto_checked_out': True, 'status': 'completed'
+                    }
+                )
+                for row in rows
+            ])
+            for row in rows:
+                row['actual_end_time'] = row['end_time']
+            self._bulk_update_usage_analytics(rows, 'completed_bookings')
+            if booking_ids:
+                record_event('bookings_auto_checked_out', booking_ids=booking_ids)
+            self._queue_calendar_sync(rows)
+        
+        if updated:
+            logger.info(f"Auto checked-out {updated} bookings")
+        return {'updated': updated, 'skipped': total - updated}
+    
+    def _queue_calendar_sync(self, rows):
+        """Queue bookings updated in bulk for Google Calendar sync, grouped by owner."""
+        booking_ids_by_user = {}
+        for row in rows:
+            booking_ids_by_user.setdefault(row['user_id'], []).append(row['id'])
+        if booking_ids_by_user:
+            queue_users_bookings_sync(booking_ids_by_user)
+    
+    def notify_no_shows(self, booking_ids: List[int]):
+        """Send no-show notifications for bookings marked in bulk."""
+        for booking in Booking.objects.filter(id__in=booking_ids).select_related('user', 'resource'):
+            self._send_noshow_notification(booking, None)
+    
+    def notify_auto_checkouts(self, booking_ids: List[int]):
+        """Send auto check-out notifications for bookings checked out in bulk."""
+        for booking in Booking.objects.filter(id__in=booking_ids).select_related('user', 'resource'):
+            self._send_auto_checkout_notification(booking)
+    
     def get_current_checkins(self, resource: Optional[Resource] = None) -> List[Booking]:
         """Get all current check-ins, optionally filtered by resource."""
         queryset = Booking.objects.filter(
@@ -224,27 +354,15 @@ class CheckInService:
     
     def process_automatic_checkouts(self) -> int:
         """Process automatic check-outs for overdue bookings."""
-        overdue_bookings = self.get_overdue_checkouts()
-        checked_out_count = 0
-        
-        for booking in overdue_bookings:
-            try:
-                if booking.auto_check_out():
-                    checked_out_count += 1
-                    
-                    # Send notification
-                    self._send_auto_checkout_notification(booking)
-                    
-                    # Update analytics
-                    self._update_usage_analytics(booking)
-                    
-            except Exception as e:
-                logger.error(f"Failed to auto check-out booking {booking.id}: {str(e)}")
+        overdue_ids = [booking.pk for booking in self.get_overdue_checkouts()]
+        if not overdue_ids:
+            return 0
         
-        if checked_out_count > 0:
-            logger.info(f"Auto checked-out {checked_out_count} overdue bookings")
-        
-        return checked_out_count
+        try:
+            return self.bulk_auto_check_out(Booking.objects.filter(pk__in=overdue_ids))['updated']
+        except Exception as e:
+            logger.error(f"Failed to auto check-out overdue bookings: {str(e)}")
+            return 0
     
     def send_checkin_reminders(self) -> int:
         """Send check-in reminders to users who should be checking in soon."""
@@ -506,6 +624,35 @@ class CheckInService:
         except Exception as e:
             logger.error(f"Failed to update usage analytics for booking {booking.id}: {str(e)}")
     
+    def _bulk_update_usage_analytics(self, rows: List[dict], outcome_field: str):
+        """Add booking rows to today's usage analytics with one update per resource."""
+        totals = {}
+        for row in rows:
+            resource_totals = totals.setdefault(row['resource_id'], {
+                'bookings': 0, 'booked': 0, 'actual': 0, 'wasted': 0
+            })
+            booked_minutes = int((row['end_time'] - row['start_time']).total_seconds() // 60)
+            resource_totals['bookings'] += 1
+            resource_totals['booked'] += booked_minutes
+            
+            if row.get('actual_start_time') and row.get('actual_end_time'):
+                actual_minutes = int((row['actual_end_time'] - row['actual_start_time']).total_seconds() // 60)
+                resource_totals['actual'] += actual_minutes
+                resource_totals['wasted'] += max(0, booked_minutes - actual_minutes)
+        
+        today = timezone.now().date()
+        for resource_id, resource_totals in totals.items():
+            analytics, created = UsageAnalytics.objects.get_or_create(resource_id=resource_id, date=today)
+            UsageAnalytics.objects.filter(pk=analytics.pk).update(**{
+                'total_bookings': F('total_bookings') + resource_totals['bookings'],
+                outcome_field: F(outcome_field) + resource_totals['bookings'],
+                'total_booked_minutes': F('total_booked_minutes') + resource_totals['booked'],
+                'total_actual_minutes': F('total_actual_minutes') + resource_totals['actual'],
+                'total_wasted_minutes': F('total_wasted_minutes') + resource_totals['wasted'],
+            })
+            analytics.refresh_from_db()
+            self._recalculate_analytics_rates(analytics)
+    
     def _recalculate_analytics_rates(self, analytics: UsageAnalytics):
         """Recalculate percentage rates for analytics."""
         try:
@@ -1,10 +1,15 @@
 import base64
+import hashlib
+import mimetypes
 import os
+import time
+from email.mime.image import MIMEImage
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, PasswordResetForm, SetPasswordForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
@@ -20,73 +25,199 @@ from .models import (
 from .recurring import RecurringBookingPattern
 
 
-def get_logo_base64():
-    """Get the logo as a base64 encoded string for email templates."""
+BRANDING_CACHE_KEY = 'email_branding_context'
+BRANDING_CACHE_TIMEOUT = 3600
+# Seconds a process trusts its last look at the branding version
+BRANDING_VERSION_CHECK_INTERVAL = 30
+LOGO_CID = 'branding-logo'
+
+# Version of the branding and lab settings rows, as last read by this process
+_branding_version = {'value': None, 'checked_at': 0.0}
+
+# Logo file contents by path, re-read only when the file's mtime changes
+_logo_assets = {}
+
+
+def get_logo_asset(logo_path):
+    """Get the logo file's contents, cached in-process by path and mtime."""
+    if not logo_path:
+        return None
     try:
-        # First try to get custom logo from branding configuration
-        from .models import LicenseConfiguration
+        mtime = os.path.getmtime(logo_path)
+    except OSError:
+        return None
+    
+    asset = _logo_assets.get(logo_path)
+    if asset is None or asset['mtime'] != mtime:
         try:
-            license_config = LicenseConfiguration.objects.filter(is_active=True).first()
-            if license_config and hasattr(license_config, 'branding') and license_config.branding.logo_primary:
-                logo_path = license_config.branding.logo_primary.path
-                if os.path.exists(logo_path):
-                    with open(logo_path, 'rb') as logo_file:
-                        logo_data = logo_file.read()
-                        return base64.b64encode(logo_data).decode('utf-8')
-        except Exception:
-            pass
-        
-        # Fallback to default logo
-        logo_path = os.path.join(settings.STATIC_ROOT or 'static', 'images', 'logo.png')
-        if not os.path.exists(logo_path):
-            # Fallback to development path
-            logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo.png')
-        
-        if os.path.exists(logo_path):
             with open(logo_path, 'rb') as logo_file:
-                logo_data = logo_file.read()
-                return base64.b64encode(logo_data).decode('utf-8')
+                data = logo_file.read()
+        except OSError:
+            return None
+        content_type = mimetypes.guess_type(logo_path)[0] or 'image/png'
+        asset = {
+            'path': logo_path,
+            'mtime': mtime,
+            'data': data,
+            'subtype': content_type.split('/')[-1],
+        }
+        _logo_assets[logo_path] = asset
+    return asset
+
+
+def _get_logo_path(license_config=None):
+    """Get the path of the custom branding logo, falling back to the default logo."""
+    try:
+        if license_config and hasattr(license_config, 'branding') and license_config.branding.logo_primary:
+            logo_path = license_config.branding.logo_primary.path
+            if os.path.exists(logo_path):
+                return logo_path
     except Exception:
         pass
+    
+    # Fallback to default logo
+    logo_path = os.path.join(settings.STATIC_ROOT or 'static', 'images', 'logo.png')
+    if not os.path.exists(logo_path):
+        # Fallback to development path
+        logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo.png')
+    return logo_path if os.path.exists(logo_path) else None
+
+
+def get_logo_base64():
+    """Get the logo as a base64 encoded string for email templates."""
+    asset = get_logo_asset(get_email_branding_context()['logo_path'])
+    if asset:
+        return base64.b64encode(asset['data']).decode('utf-8')
     return None
 
 
-def get_email_branding_context():
-    """Get branding context for email templates."""
+def invalidate_email_branding_cache():
+    """Re-read the branding version on the next lookup after branding or lab settings change."""
+    _branding_version['checked_at'] = 0.0
+
+
+def _get_branding_version():
+    """
+    Get a version string for the active branding, license and lab settings.
+    
+    It changes whenever one of those rows is saved or deleted, in any process.
+    The version is read in one query at most every
+    BRANDING_VERSION_CHECK_INTERVAL seconds per process.
+    """
+    now = time.monotonic()
+    if now - _branding_version['checked_at'] < BRANDING_VERSION_CHECK_INTERVAL:
+        return _branding_version['value']
+    
+    from django.db.models import Value
+    from .models import BrandingConfiguration, LicenseConfiguration, LabSettings
+    
+    rows = LabSettings.objects.filter(is_active=True).order_by().values_list(
+        Value('lab'), 'pk', 'updated_at'
+    ).union(
+        LicenseConfiguration.objects.filter(is_active=True).order_by().values_list(
+            Value('license'), 'pk', 'updated_at'
+        ),
+        BrandingConfiguration.objects.filter(license__is_active=True).order_by().values_list(
+            Value('branding'), 'pk', 'updated_at'
+        ),
+        all=True
+    )
+    version = repr(sorted((tag, pk, str(updated_at)) for tag, pk, updated_at in rows))
+    _branding_version['value'] = hashlib.md5(version.encode('utf-8')).hexdigest()
+    _branding_version['checked_at'] = now
+    return _branding_version['value']
+
+
+def _build_email_branding_context():
+    """Build branding context for email templates from the database."""
     from .models import LicenseConfiguration, LabSettings
     
     context = {
         'app_title': 'Aperature Booking',
         'company_name': 'Aperature Booking',
         'lab_name': 'Aperature Booking',
-        'logo_base64': get_logo_base64(),
+        'logo_path': None,
         'support_email': 'support@aperature-booking.org',
         'website_url': '',
         'show_powered_by': True,
     }
     
+    # Get lab settings
+    lab_name = LabSettings.get_lab_name()
+    context['lab_name'] = lab_name
+    
+    # Get branding from license configuration
+    license_config = LicenseConfiguration.objects.filter(is_active=True).select_related('branding').first()
+    context['logo_path'] = _get_logo_path(license_config)
+    if license_config and hasattr(license_config, 'branding'):
+        branding = license_config.branding
+        context.update({
+            'app_title': branding.app_title,
+            'company_name': branding.company_name,
+            'support_email': branding.support_email or context['support_email'],
+            'website_url': branding.website_url,
+            'show_powered_by': branding.show_powered_by,
+        })
+    
+    return context
+
+
+def get_email_branding_context():
+    """
+    Get branding context for email templates.
+    
+    The database lookups are cached under the branding version, so a saved
+    change is used straight away by the saving process and within
+    BRANDING_VERSION_CHECK_INTERVAL seconds by every other one. The logo is
+    referenced by ``logo_cid`` and attached by ``send_branded_email``.
+    """
     try:
-        # Get lab settings
-        lab_name = LabSettings.get_lab_name()
-        context['lab_name'] = lab_name
-        
-        # Get branding from license configuration
-        license_config = LicenseConfiguration.objects.filter(is_active=True).first()
-        if license_config and hasattr(license_config, 'branding'):
-            branding = license_config.branding
-            context.update({
-                'app_title': branding.app_title,
-                'company_name': branding.company_name,
-                'support_email': branding.support_email or context['support_email'],
-                'website_url': branding.website_url,
-                'show_powered_by': branding.show_powered_by,
-            })
+        cache_key = f'{BRANDING_CACHE_KEY}:{_get_branding_version()}'
+        context = cache.get(cache_key)
     except Exception:
-        pass
-    
+        cache_key, context = None, None
+    if context is None:
+        try:
+            context = _build_email_branding_context()
+            if cache_key:
+                cache.set(cache_key, context, BRANDING_CACHE_TIMEOUT)
+        except Exception:
+            context = {
+                'app_title': 'Aperature Booking',
+                'company_name': 'Aperature Booking',
+                'lab_name': 'Aperature Booking',
+                'logo_path': _get_logo_path(),
+                'support_email': 'support@aperature-booking.org',
+                'website_url': '',
+                'show_powered_by': True,
+            }
+    
+    context = dict(context)
+    context['logo_cid'] = LOGO_CID if get_logo_asset(context['logo_path']) else None
     return context
 
 
+def send_branded_email(subject, html_message, recipient_list, branding_context, from_email=None):
+    """Send an HTML email with the branding logo attached once as an inline image."""
+    message = EmailMultiAlternatives(
+        subject,
+        strip_tags(html_message),
+        from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient_list,
+    )
+    message.attach_alternative(html_message, 'text/html')
+    
+    asset = get_logo_asset(branding_context.get('logo_path'))
+    if asset and branding_context.get('logo_cid'):
+        message.mixed_subtype = 'related'
+        logo = MIMEImage(asset['data'], _subtype=asset['subtype'])
+        logo.add_header('Content-ID', f"<{branding_context['logo_cid']}>")
+        logo.add_header('Content-Disposition', 'inline', filename=os.path.basename(asset['path']))
+        message.attach(logo)
+    
+    return message.send(fail_silently=False)
+
+
 class UserRegistrationForm(UserCreationForm):
     """Extended user registration form with profile fields."""
     # Use email as username
@@ -282,17 +413,9 @@ class UserRegistrationForm(UserCreationForm):
         }
         
         html_message = render_to_string('registration/verification_email.html', email_context)
-        plain_message = strip_tags(html_message)
         
         try:
-            send_mail(
-                subject,
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
+            send_branded_email(subject, html_message, [user.email], branding_context)
         except Exception as e:
             # Log error but don't prevent registration
             import logging
@@ -477,17 +600,9 @@ class CustomPasswordResetForm(PasswordResetForm):
         }
         
         html_message = render_to_string('registration/password_reset_email.html', email_context)
-        plain_message = strip_tags(html_message)
         
         try:
-            send_mail(
-                subject,
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
+            send_branded_email(subject, html_message, [user.email], branding_context)
         except Exception as e:
             import logging
             logger = logging.getLogger('booking')
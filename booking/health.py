@@ -0,0 +1,129 @@
+# booking/health.py
+"""
+Background-sampled system health for Aperature Booking.
+
+The scheduler records CPU, memory, disk and database latency readings into the
+cache, so health views can report the latest sample without blocking a worker.
+Use a shared cache backend when the scheduler runs in a separate process.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_CACHE_KEY = 'health:system_sample'
+
+# Usage thresholds (percent) above which a resource is reported as a warning
+CPU_WARNING_PERCENT = 80
+MEMORY_WARNING_PERCENT = 80
+DISK_WARNING_PERCENT = 85
+
+
+def get_sample_interval() -> int:
+    """Seconds between background samples."""
+    return getattr(settings, 'HEALTH_SAMPLE_INTERVAL', 15)
+
+
+def get_max_sample_age() -> int:
+    """Seconds after which a sample is reported as stale."""
+    return getattr(settings, 'HEALTH_SAMPLE_MAX_AGE', get_sample_interval() * 4)
+
+
+def measure_database_latency() -> float:
+    """Time a trivial query, in milliseconds."""
+    start_time = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return round((time.perf_counter() - start_time) * 1000, 2)
+
+
+def collect_system_sample() -> Dict:
+    """
+    Take one reading of system resources and database latency.
+
+    CPU usage is measured since the previous call, so the first sample in a
+    process reports 0 until the sampler has run once.
+    """
+    sample = {'sampled_at': timezone.now().isoformat(), 'warnings': []}
+
+    try:
+        import psutil
+        sample['cpu_percent'] = psutil.cpu_percent(interval=None)
+        sample['memory_percent'] = psutil.virtual_memory().percent
+        sample['disk_percent'] = psutil.disk_usage('/').percent
+    except ImportError:
+        sample['error'] = 'System resource monitoring unavailable (psutil not installed)'
+    except Exception as e:
+        sample['error'] = f'Could not check system resources: {e}'
+
+    try:
+        sample['db_latency_ms'] = measure_database_latency()
+    except Exception as e:
+        sample['db_latency_ms'] = None
+        sample['db_error'] = str(e)
+
+    if sample.get('cpu_percent', 0) > CPU_WARNING_PERCENT:
+        sample['warnings'].append(f"High CPU usage: {sample['cpu_percent']}%")
+    if sample.get('memory_percent', 0) > MEMORY_WARNING_PERCENT:
+        sample['warnings'].append(f"High memory usage: {sample['memory_percent']}%")
+    if sample.get('disk_percent', 0) > DISK_WARNING_PERCENT:
+        sample['warnings'].append(f"High disk usage: {sample['disk_percent']}%")
+
+    return sample
+
+
+def record_system_sample() -> Dict:
+    """Collect a sample and store it as the latest reading."""
+    sample = collect_system_sample()
+    cache.set(SAMPLE_CACHE_KEY, sample, timeout=get_max_sample_age() * 10)
+    return sample
+
+
+def get_latest_sample() -> Tuple[Optional[Dict], Optional[float]]:
+    """Return the latest sample and its age in seconds, or (None, None)."""
+    sample = cache.get(SAMPLE_CACHE_KEY)
+    if not sample:
+        return None, None
+    sampled_at = datetime.fromisoformat(sample['sampled_at'])
+    return sample, round((timezone.now() - sampled_at).total_seconds(), 1)
+
+
+def check_readiness() -> Tuple[bool, Dict]:
+    """Check the dependencies a worker needs to serve requests."""
+    checks = {}
+    ready = True
+
+    try:
+        checks['database'] = {'status': 'ok', 'response_time_ms': measure_database_latency()}
+    except Exception as e:
+        checks['database'] = {'status': 'error', 'error': str(e)}
+        ready = False
+
+    try:
+        cache.get(SAMPLE_CACHE_KEY)
+        checks['cache'] = {'status': 'ok'}
+    except Exception as e:
+        checks['cache'] = {'status': 'error', 'error': str(e)}
+        ready = False
+
+    return ready, checks
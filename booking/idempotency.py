@@ -0,0 +1,133 @@
+# booking/idempotency.py
+"""
+Idempotency-Key support for API writes.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import hashlib
+import json
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+_local_cache_warned = False
+
+
+def get_idempotency_cache():
+    """
+    Return the cache that stores responses, IDEMPOTENCY_CACHE (default 'default').
+    
+    The cache must be shared by all workers, otherwise a retry that reaches
+    another process runs the write again. A warning is logged once per
+    process when it resolves to a per-process LocMemCache.
+    """
+    global _local_cache_warned
+    
+    alias = getattr(settings, 'IDEMPOTENCY_CACHE', 'default')
+    cache = caches[alias]
+    if isinstance(cache, LocMemCache) and not _local_cache_warned:
+        _local_cache_warned = True
+        logger.warning(
+            f"IDEMPOTENCY_CACHE '{alias}' is a per-process LocMemCache; retries handled by "
+            f"another worker will not be deduplicated. Use a DatabaseCache or Redis cache."
+        )
+    return cache
+
+
+def get_key_ttl():
+    """Return how long stored responses are replayed, in seconds."""
+    return getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60)
+
+
+def _fingerprint(request):
+    """Hash the parts of a request a retry must repeat exactly."""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{body}'.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """
+    Replay the first response to a write for retries with the same Idempotency-Key.
+
+    Keys are scoped to the authenticated user. The first response (other than
+    a server error) is stored for IDEMPOTENCY_KEY_TTL seconds and returned to
+    retries with an ``Idempotent-Replayed`` header, without running the view
+    again. A retry while the first request is still running gets 409, and
+    reusing a key for a different request gets 422. Requests without the
+    header are handled as before.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        cache = get_idempotency_cache()
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        cache_key = f'idempotency:{request.user.pk}:{digest}'
+        lock_key = f'{cache_key}:lock'
+        fingerprint = _fingerprint(request)
+        
+        stored = cache.get(cache_key)
+        if stored is None:
+            if not cache.add(lock_key, fingerprint, timeout=getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60)):
+                return Response(
+                    {'error': f'A request with this {IDEMPOTENCY_HEADER} is still being processed'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            try:
+                try:
+                    response = view_method(self, request, *args, **kwargs)
+                except Exception as exc:
+                    # Store validation and permission errors too; others are re-raised
+                    response = self.handle_exception(exc)
+                if response.status_code < 500:
+                    cache.set(cache_key, {
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'data': response.data,
+                        'location': response.get('Location'),
+                    }, timeout=get_key_ttl())
+            finally:
+                cache.delete(lock_key)
+            return response
+        
+        if stored['fingerprint'] != fingerprint:
+            return Response(
+                {'error': f'This {IDEMPOTENCY_HEADER} was already used for a different request'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        
+        logger.debug(f"Replaying stored response for {request.method} {request.path}")
+        headers = {REPLAYED_HEADER: 'true'}
+        if stored['location']:
+            headers['Location'] = stored['location']
+        return Response(stored['data'], status=stored['status'], headers=headers)
+    
+    return wrapper
@@ -14,10 +14,14 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://aperature-booking.org/commercial
 """
 
+import base64
+import heapq
 import os
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from itertools import islice
 from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin.views.main import ChangeList
@@ -40,6 +44,9 @@ class LogEntry:
         self.message = message
         self.line_number = line_number
         self.id = f"{source}_{line_number}_{timestamp.timestamp()}"
+        # Source key and cursor state that resumes reading just after this entry
+        self.source_key = None
+        self.resume_state = None
     
     def get_level_color(self):
         """Get Bootstrap color class for log level."""
@@ -53,11 +60,300 @@ class LogEntry:
         return level_colors.get(self.level.upper(), 'secondary')
 
 
+# Parsers for each log format, compiled once at import time. Each parser takes
+# (line, line_number, source_name) and returns a LogEntry or None.
+LOG_PARSERS = {}
+
+
+def register_parser(name):
+    """Register a line parser for a log format."""
+    def decorator(func):
+        LOG_PARSERS[name] = func
+        return func
+    return decorator
+
+
+TIMESTAMP_FORMATS = [
+    (re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})'), '%Y-%m-%d %H:%M:%S'),
+    (re.compile(r'(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2})'), '%Y/%m/%d %H:%M:%S'),
+    (re.compile(r'(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2})'), '%d/%b/%Y:%H:%M:%S'),
+    (re.compile(r'(\w{3}\s+\d{1,2} \d{2}:\d{2}:\d{2})'), '%b %d %H:%M:%S'),
+]
+
+LEVEL_KEYWORDS = {
+    'CRITICAL': 'CRITICAL', 'CRIT': 'CRITICAL', 'FATAL': 'CRITICAL', 'PANIC': 'CRITICAL',
+    'EMERG': 'CRITICAL', 'ALERT': 'CRITICAL',
+    'ERROR': 'ERROR', 'ERR': 'ERROR',
+    'WARNING': 'WARNING', 'WARN': 'WARNING',
+    'INFO': 'INFO', 'NOTICE': 'INFO', 'LOG': 'INFO',
+    'DEBUG': 'DEBUG',
+}
+LEVEL_ORDER = ['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG']
+LEVEL_PATTERN = re.compile(
+    r'\b(CRITICAL|CRIT|FATAL|EMERG|ALERT|ERROR|ERR|WARNING|WARN|INFO|NOTICE|DEBUG)\b', re.IGNORECASE
+)
+
+# Journal PRIORITY values (syslog severities)
+JOURNAL_PRIORITY_LEVELS = {
+    '0': 'CRITICAL', '1': 'CRITICAL', '2': 'CRITICAL', '3': 'ERROR',
+    '4': 'WARNING', '5': 'INFO', '6': 'INFO', '7': 'DEBUG',
+}
+
+DJANGO_LINE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) (\w+) ([^:]+): (.+)')
+NGINX_ACCESS_LINE = re.compile(r'\[(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2})[^\]]*\] "[^"]*" (\d{3}) ')
+NGINX_ERROR_LINE = re.compile(r'(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(\w+)\] (.*)')
+POSTGRES_LINE = re.compile(
+    r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:\.\d+)?(?: \w+)? \[\d+\][^ ]* ?(\w+):\s+(.*)'
+)
+SYSLOG_LINE = re.compile(r'(\w{3}\s+\d{1,2} \d{2}:\d{2}:\d{2}) (.*)')
+
+MESSAGE_PREFIXES = [
+    re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}[,\.]?\d*\s*'),
+    re.compile(r'^\w{3}\s+\d{1,2} \d{2}:\d{2}:\d{2}\s*'),
+    re.compile(r'^\[\w+\]\s*'),
+]
+
+
+def _syslog_timestamp(timestamp_str):
+    """Parse a syslog timestamp, which has no year."""
+    now = datetime.now()
+    timestamp = datetime.strptime(f"{now.year} {timestamp_str}", '%Y %b %d %H:%M:%S')
+    if timestamp > now + timedelta(days=1):
+        # Entries from December read in January
+        timestamp = timestamp.replace(year=now.year - 1)
+    return timestamp
+
+
+def _level_from_text(text, default='INFO'):
+    """Return the most severe level keyword found in the text."""
+    found = {LEVEL_KEYWORDS[match.upper()] for match in LEVEL_PATTERN.findall(text)}
+    for level in LEVEL_ORDER:
+        if level in found:
+            return level
+    return default
+
+
+@register_parser('django')
+def parse_django_line(line, line_number, source_name):
+    """Parse a Django log line: 2025-07-13 14:17:38,123 INFO django.request: ..."""
+    match = DJANGO_LINE.match(line.strip())
+    if not match:
+        return None
+    
+    timestamp_str, level, logger_name, message = match.groups()
+    try:
+        timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S,%f')
+    except ValueError:
+        timestamp = datetime.now()
+    
+    return LogEntry(
+        timestamp=timestamp,
+        level=level,
+        source=logger_name,
+        message=message.strip(),
+        line_number=line_number
+    )
+
+
+@register_parser('generic')
+def parse_generic_line(line, line_number, source_name):
+    """Parse a line of unknown format, extracting a timestamp and level if possible."""
+    timestamp = datetime.now()
+    for pattern, date_format in TIMESTAMP_FORMATS:
+        match = pattern.search(line)
+        if match:
+            try:
+                if date_format == '%b %d %H:%M:%S':
+                    timestamp = _syslog_timestamp(match.group(1))
+                else:
+                    timestamp = datetime.strptime(match.group(1), date_format)
+                break
+            except ValueError:
+                continue
+    
+    # Clean up the message
+    message = line.strip()
+    for prefix in MESSAGE_PREFIXES:
+        message = prefix.sub('', message)
+    
+    return LogEntry(
+        timestamp=timestamp,
+        level=_level_from_text(line),
+        source=source_name,
+        message=message,
+        line_number=line_number
+    )
+
+
+@register_parser('nginx_access')
+def parse_nginx_access_line(line, line_number, source_name):
+    """Parse a combined-format access log line, using the status for the level."""
+    match = NGINX_ACCESS_LINE.search(line)
+    if not match:
+        return parse_generic_line(line, line_number, source_name)
+    
+    timestamp_str, status = match.groups()
+    try:
+        timestamp = datetime.strptime(timestamp_str, '%d/%b/%Y:%H:%M:%S')
+    except ValueError:
+        timestamp = datetime.now()
+    
+    level = 'ERROR' if status.startswith('5') else 'WARNING' if status.startswith('4') else 'INFO'
+    return LogEntry(timestamp, level, source_name, line.strip(), line_number)
+
+
+@register_parser('nginx_error')
+def parse_nginx_error_line(line, line_number, source_name):
+    """Parse an nginx error log line: 2025/07/13 14:17:38 [error] 123#0: ..."""
+    match = NGINX_ERROR_LINE.match(line.strip())
+    if not match:
+        return parse_generic_line(line, line_number, source_name)
+    
+    timestamp_str, severity, message = match.groups()
+    try:
+        timestamp = datetime.strptime(timestamp_str, '%Y/%m/%d %H:%M:%S')
+    except ValueError:
+        timestamp = datetime.now()
+    
+    level = LEVEL_KEYWORDS.get(severity.upper(), 'INFO')
+    return LogEntry(timestamp, level, source_name, message, line_number)
+
+
+@register_parser('postgresql')
+def parse_postgresql_line(line, line_number, source_name):
+    """Parse a PostgreSQL log line: 2025-07-13 14:17:38.123 UTC [123] LOG:  ..."""
+    match = POSTGRES_LINE.match(line.strip())
+    if not match:
+        return parse_generic_line(line, line_number, source_name)
+    
+    timestamp_str, severity, message = match.groups()
+    timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
+    level = LEVEL_KEYWORDS.get(severity.upper(), 'INFO')
+    return LogEntry(timestamp, level, source_name, message, line_number)
+
+
+@register_parser('syslog')
+def parse_syslog_line(line, line_number, source_name):
+    """Parse a syslog line: Jul 13 14:17:38 host program[pid]: ..."""
+    match = SYSLOG_LINE.match(line.strip())
+    if not match:
+        return parse_generic_line(line, line_number, source_name)
+    
+    timestamp_str, message = match.groups()
+    try:
+        timestamp = _syslog_timestamp(timestamp_str)
+    except ValueError:
+        timestamp = datetime.now()
+    
+    return LogEntry(timestamp, _level_from_text(message), source_name, message, line_number)
+
+
+BLOCK_SIZE = 64 * 1024
+
+
+def _complete_end(log_file, start, end):
+    """Return the offset just past the last newline in ``[start, end)``."""
+    position = end
+    while position > start:
+        read_size = min(BLOCK_SIZE, position - start)
+        log_file.seek(position - read_size)
+        index = log_file.read(read_size).rfind(b'\n')
+        if index != -1:
+            return position - read_size + index + 1
+        position -= read_size
+    return start
+
+
+def read_lines_reverse(log_file, start, end):
+    """
+    Yield ``(offset, line)`` pairs from a binary file, newest line first.
+    
+    Only complete lines between ``start`` and ``end`` are read; ``end`` must
+    fall just after a newline (see ``_complete_end``). Blocks are read from
+    the end of the range so the cost is proportional to the lines consumed,
+    not the file size.
+    """
+    position = end
+    remainder = b''
+    first_block = True
+    while position > start:
+        read_size = min(BLOCK_SIZE, position - start)
+        position -= read_size
+        log_file.seek(position)
+        block = log_file.read(read_size)
+        if first_block:
+            # Drop the final newline so every block ends just before one
+            block = block[:-1]
+            first_block = False
+        block += remainder
+        
+        parts = block.split(b'\n')
+        remainder = parts[0]
+        line_end = position + len(block)
+        for part in reversed(parts[1:]):
+            line_start = line_end - len(part)
+            yield line_start, part
+            line_end = line_start - 1
+    
+    if end > start:
+        yield start, remainder
+
+
+def read_lines_forward(log_file, start, end):
+    """
+    Yield ``(offset, line)`` pairs from a binary file, oldest line first.
+    
+    The counterpart of ``read_lines_reverse`` for follow-up reads, which page
+    forward from a previous cursor. ``end`` must fall just after a newline.
+    """
+    position = start
+    remainder = b''
+    while position < end:
+        read_size = min(BLOCK_SIZE, end - position)
+        log_file.seek(position)
+        line_start = position - len(remainder)
+        block = remainder + log_file.read(read_size)
+        position += read_size
+        
+        parts = block.split(b'\n')
+        remainder = parts.pop()
+        for part in parts:
+            yield line_start, part
+            line_start += len(part) + 1
+
+
+def encode_cursor(state):
+    """Encode per-source read positions as an opaque cursor string."""
+    payload = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by ``encode_cursor``, raising ValueError if invalid."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid log cursor: {e}")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid log cursor")
+    return state
+
+
+def _entry_timestamp(entry):
+    """Sort key for merging log entries by time."""
+    return entry.timestamp
+
+
 class LogViewer:
     """Service class for reading and parsing system logs."""
     
     def __init__(self):
         self.log_sources = self._get_log_sources()
+        # Upper bound on bytes scanned backwards per file source and request
+        self.max_scan_bytes = getattr(settings, 'LOG_VIEWER_MAX_SCAN_BYTES', 8 * 1024 * 1024)
+        # Sources are read concurrently; slower ones are skipped after this many seconds
+        self.time_budget = getattr(settings, 'LOG_VIEWER_TIME_BUDGET', 5)
+        self.max_workers = getattr(settings, 'LOG_VIEWER_MAX_WORKERS', 8)
     
     def _get_log_sources(self):
         """Get all available log sources."""
@@ -73,11 +369,13 @@ class LogViewer:
         
         for log_path, log_name in nginx_logs:
             if os.path.exists(log_path):
-                source_key = os.path.basename(log_path).replace('.log', '').lower() + '_nginx'
+                log_type = os.path.basename(log_path).replace('.log', '').lower()
+                source_key = log_type + '_nginx'
                 sources[source_key] = {
                     'name': log_name,
                     'path': log_path,
-                    'type': 'file'
+                    'type': 'file',
+                    'format': f'nginx_{log_type}'
                 }
         
         # System logs - Application Server
@@ -107,25 +405,27 @@ class LogViewer:
                     sources['postgresql'] = {
                         'name': log_name,
                         'path': log_path,
-                        'type': 'file'
+                        'type': 'file',
+                        'format': 'postgresql'
                     }
                     break
         
         # System logs - Linux System
         system_logs = [
-            ('/var/log/syslog', 'System Log'),
-            ('/var/log/auth.log', 'Authentication Log'),
-            ('/var/log/kern.log', 'Kernel Log'),
-            ('/var/log/dpkg.log', 'Package Manager Log'),
+            ('/var/log/syslog', 'System Log', 'syslog'),
+            ('/var/log/auth.log', 'Authentication Log', 'syslog'),
+            ('/var/log/kern.log', 'Kernel Log', 'syslog'),
+            ('/var/log/dpkg.log', 'Package Manager Log', 'generic'),
         ]
         
-        for log_path, log_name in system_logs:
+        for log_path, log_name, log_format in system_logs:
             if os.path.exists(log_path):
                 source_key = os.path.basename(log_path).replace('.log', '')
                 sources[source_key] = {
                     'name': log_name,
                     'path': log_path,
-                    'type': 'file'
+                    'type': 'file',
+                    'format': log_format
                 }
         
         # Systemd journal for services
@@ -149,167 +449,183 @@ class LogViewer:
         
         return sources
     
-    def _parse_django_log_line(self, line, line_number):
-        """Parse a Django log line."""
-        # Pattern: 2025-07-13 14:17:38,123 INFO django.request: ...
-        pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) (\w+) ([^:]+): (.+)'
-        match = re.match(pattern, line.strip())
-        
-        if match:
-            timestamp_str, level, logger_name, message = match.groups()
-            try:
-                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S,%f')
-            except ValueError:
-                timestamp = datetime.now()
-            
-            return LogEntry(
-                timestamp=timestamp,
-                level=level,
-                source=logger_name,
-                message=message.strip(),
-                line_number=line_number
-            )
-        
-        return None
-    
-    def _parse_generic_log_line(self, line, line_number, source_name):
-        """Parse a generic log line."""
-        # Try to extract timestamp and level if possible
-        timestamp_patterns = [
-            (r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', '%Y-%m-%d %H:%M:%S'),
-            (r'(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2})', '%Y/%m/%d %H:%M:%S'),
-            (r'(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2})', '%d/%b/%Y:%H:%M:%S'),
-            (r'(\w{3} \d{2} \d{2}:\d{2}:\d{2})', '%b %d %H:%M:%S'),
-            (r'(\w{3}\s+\d{1,2} \d{2}:\d{2}:\d{2})', '%b %d %H:%M:%S'),
-        ]
-        
-        timestamp = datetime.now()
-        for pattern, date_format in timestamp_patterns:
-            match = re.search(pattern, line)
-            if match:
-                try:
-                    timestamp_str = match.group(1)
-                    if date_format == '%b %d %H:%M:%S':
-                        # Add current year for syslog format
-                        timestamp_str = f"{datetime.now().year} {timestamp_str}"
-                        date_format = '%Y %b %d %H:%M:%S'
-                    timestamp = datetime.strptime(timestamp_str, date_format)
-                    break
-                except ValueError:
-                    continue
-        
-        # Try to extract log level
-        level = 'INFO'
-        # Check for nginx error levels
-        if 'nginx' in source_name.lower():
-            if '[error]' in line:
-                level = 'ERROR'
-            elif '[warn]' in line:
-                level = 'WARNING'
-            elif '[crit]' in line:
-                level = 'CRITICAL'
-            elif '[alert]' in line or '[emerg]' in line:
-                level = 'CRITICAL'
-        else:
-            # Standard log levels
-            level_patterns = [
-                ('CRITICAL', ['CRIT', 'FATAL', 'EMERG', 'ALERT']),
-                ('ERROR', ['ERROR', 'ERR']),
-                ('WARNING', ['WARN', 'WARNING']),
-                ('INFO', ['INFO', 'NOTICE']),
-                ('DEBUG', ['DEBUG']),
-            ]
-            for level_name, patterns in level_patterns:
-                for pattern in patterns:
-                    if re.search(r'\b' + pattern + r'\b', line, re.IGNORECASE):
-                        level = level_name
-                        break
-                if level != 'INFO':
-                    break
-        
-        # Clean up the message
-        message = line.strip()
-        # Remove common prefixes
-        message = re.sub(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}[,\.]?\d*\s*', '', message)
-        message = re.sub(r'^\w{3}\s+\d{1,2} \d{2}:\d{2}:\d{2}\s*', '', message)
-        message = re.sub(r'^\[\w+\]\s*', '', message)
-        
-        return LogEntry(
-            timestamp=timestamp,
-            level=level,
-            source=source_name,
-            message=message,
-            line_number=line_number
-        )
+    def _matches(self, entry, level=None, search=None):
+        """Check a log entry against the level and search filters."""
+        if level and entry.level.upper() != level.upper():
+            return False
+        if search:
+            search_lower = search.lower()
+            return search_lower in entry.message.lower() or search_lower in entry.source.lower()
+        return True
     
     def get_logs(self, source=None, level=None, search=None, hours=24, max_lines=1000):
         """Get logs from specified source with filtering."""
-        logs = []
+        logs, _ = self.get_logs_since(None, source, level, search, hours, max_lines)
+        return logs
+    
+    def get_logs_since(self, cursor=None, source=None, level=None, search=None, hours=24, max_lines=1000):
+        """
+        Get logs written after ``cursor`` along with a cursor for the next poll.
+        
+        Without a cursor the newest ``max_lines`` entries are returned. With a
+        cursor from a previous call the oldest ``max_lines`` entries written
+        since then are returned, and the new cursor only moves past entries
+        that were returned, so a burst larger than a page arrives over several
+        polls instead of being skipped. Raises ValueError if the cursor cannot
+        be decoded.
+        """
+        state = decode_cursor(cursor) if cursor else {}
+        next_state = {}
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
         sources_to_read = [source] if source else list(self.log_sources.keys())
-        
-        for source_key in sources_to_read:
-            if source_key not in self.log_sources:
-                continue
-                
-            source_config = self.log_sources[source_key]
-            
-            try:
-                if source_config['type'] == 'file':
-                    logs.extend(self._read_file_logs(source_key, source_config, cutoff_time, max_lines))
-                elif source_config['type'] == 'systemd':
-                    logs.extend(self._read_systemd_logs(source_key, source_config, cutoff_time, max_lines))
-            except Exception as e:
-                # Create an error log entry if we can't read a source
-                logs.append(LogEntry(
+        sources_to_read = [key for key in sources_to_read if key in self.log_sources]
+        if not sources_to_read:
+            return [], encode_cursor(next_state)
+        
+        # Read all sources concurrently; anything still running when the
+        # budget runs out is reported and left for the next poll.
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(sources_to_read)))
+        futures = {
+            executor.submit(
+                self._read_source, source_key, self.log_sources[source_key], cutoff_time,
+                max_lines, level, search, state.get(source_key)
+            ): source_key
+            for source_key in sources_to_read
+        }
+        done, pending = wait(futures, timeout=self.time_budget)
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        streams = []
+        notices = []
+        for future, source_key in futures.items():
+            source_state = state.get(source_key)
+            if future in done:
+                try:
+                    entries, source_state = future.result()
+                    streams.append(sorted(entries, key=_entry_timestamp, reverse=True))
+                except Exception as e:
+                    # Create an error log entry if we can't read a source
+                    notices.append(LogEntry(
+                        timestamp=datetime.now(),
+                        level='ERROR',
+                        source=f'LogViewer-{source_key}',
+                        message=f'Failed to read logs: {str(e)}'
+                    ))
+            else:
+                notices.append(LogEntry(
                     timestamp=datetime.now(),
-                    level='ERROR',
+                    level='WARNING',
                     source=f'LogViewer-{source_key}',
-                    message=f'Failed to read logs: {str(e)}'
+                    message=f'Timed out after {self.time_budget}s; showing other sources'
                 ))
-        
-        # Filter logs
-        if level:
-            logs = [log for log in logs if log.level.upper() == level.upper()]
-        
-        if search:
-            search_lower = search.lower()
-            logs = [log for log in logs if search_lower in log.message.lower() or search_lower in log.source.lower()]
-        
-        # Sort by timestamp (newest first) and limit
-        logs.sort(key=lambda x: x.timestamp, reverse=True)
-        return logs[:max_lines]
+            
+            if source_state is not None:
+                next_state[source_key] = source_state
+        
+        if not state:
+            # Merge the per-source streams (each newest first) until the page is full
+            streams.append(sorted(notices, key=_entry_timestamp, reverse=True))
+            merged = heapq.merge(*streams, key=_entry_timestamp, reverse=True)
+            return list(islice(merged, max_lines)), encode_cursor(next_state)
+        
+        # Follow-up polls keep the oldest entries, and each source whose
+        # entries didn't all fit resumes after the last one returned
+        merged = list(heapq.merge(*[stream[::-1] for stream in streams], key=_entry_timestamp))
+        page, dropped = merged[:max_lines], merged[max_lines:]
+        resume = {}
+        for entry in dropped:
+            resume.setdefault(entry.source_key, state.get(entry.source_key))
+        for entry in page:
+            if entry.source_key in resume and entry.resume_state is not None:
+                resume[entry.source_key] = entry.resume_state
+        for source_key, source_state in resume.items():
+            if source_state is None:
+                next_state.pop(source_key, None)
+            else:
+                next_state[source_key] = source_state
+        
+        page.extend(notices)
+        page.sort(key=_entry_timestamp, reverse=True)
+        return page, encode_cursor(next_state)
     
-    def _read_file_logs(self, source_key, source_config, cutoff_time, max_lines):
-        """Read logs from a file."""
+    def _read_source(self, source_key, source_config, cutoff_time, max_lines,
+                     level=None, search=None, state=None):
+        """Read a single source, returning its entries and new cursor state."""
+        if source_config['type'] == 'systemd':
+            entries, next_state = self._read_systemd_logs(
+                source_key, source_config, cutoff_time, max_lines, level, search, state
+            )
+        else:
+            entries, next_state = self._read_file_logs(
+                source_key, source_config, cutoff_time, max_lines, level, search, state
+            )
+        for entry in entries:
+            entry.source_key = source_key
+        return entries, next_state
+    
+    def _read_file_logs(self, source_key, source_config, cutoff_time, max_lines,
+                        level=None, search=None, state=None):
+        """
+        Read logs from a file.
+        
+        Without ``state`` the file is scanned backwards from the end for the
+        newest entries. ``state`` is the ``[inode, offset]`` pair returned by
+        a previous read; bytes appended since then are read forwards, and the
+        returned offset stops after the last line consumed when the page or
+        scan limit is reached. A rotated or truncated file is read from the
+        end again. Returns the entries and new state.
+        """
         logs = []
+        path = source_config['path']
+        
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return logs, None
+        
+        default_format = 'django' if source_key == 'django_app' else 'generic'
+        parser = LOG_PARSERS[source_config.get('format', default_format)]
         
-        if not os.path.exists(source_config['path']):
-            return logs
+        follow_up = bool(state and state[0] == stat.st_ino and state[1] <= stat.st_size)
+        start = state[1] if follow_up else 0
         
         try:
-            # Use tail to get last N lines for performance
-            result = subprocess.run([
-                'tail', '-n', str(max_lines * 2), source_config['path']
-            ], capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for i, line in enumerate(lines):
+            with open(path, 'rb') as log_file:
+                end = _complete_end(log_file, start, stat.st_size)
+                
+                if follow_up:
+                    lines = read_lines_forward(log_file, start, end)
+                else:
+                    lines = read_lines_reverse(log_file, start, end)
+                scan_floor = max(start, end - self.max_scan_bytes)
+                consumed = start
+                
+                for offset, raw_line in lines:
+                    if follow_up and (len(logs) >= max_lines or offset - start >= self.max_scan_bytes):
+                        # Resume after the last line consumed on the next poll
+                        end = consumed
+                        break
+                    if not follow_up and (len(logs) >= max_lines or offset < scan_floor):
+                        break
+                    line_end = consumed = offset + len(raw_line) + 1
+                    
+                    line = raw_line.decode('utf-8', errors='replace')
                     if not line.strip():
                         continue
                     
-                    # Parse based on source type
-                    if source_key == 'django_app':
-                        log_entry = self._parse_django_log_line(line, i)
-                    else:
-                        log_entry = self._parse_generic_log_line(line, i, source_config['name'])
-                    
-                    if log_entry and log_entry.timestamp >= cutoff_time:
+                    log_entry = parser(line, offset, source_config['name'])
+                    if not log_entry:
+                        continue
+                    if log_entry.timestamp < cutoff_time:
+                        if follow_up:
+                            continue
+                        break
+                    if self._matches(log_entry, level, search):
+                        log_entry.resume_state = [stat.st_ino, line_end]
                         logs.append(log_entry)
                         
-        except Exception as e:
+        except OSError as e:
             # Return error entry
             logs.append(LogEntry(
                 timestamp=datetime.now(),
@@ -317,39 +633,64 @@ class LogViewer:
                 source='LogViewer',
                 message=f'Error reading {source_config["name"]}: {str(e)}'
             ))
+            return logs, state
         
-        return logs
+        return logs, [stat.st_ino, end]
     
-    def _read_systemd_logs(self, source_key, source_config, cutoff_time, max_lines):
-        """Read logs from systemd journal."""
+    def _read_systemd_logs(self, source_key, source_config, cutoff_time, max_lines,
+                           level=None, search=None, state=None):
+        """
+        Read logs from systemd journal.
+        
+        ``state`` is the journal cursor of the newest entry already returned,
+        or an ``@<epoch>`` timestamp when the unit had no entries yet.
+        Follow-up reads return the oldest ``max_lines`` entries after it, as
+        ``-n`` would keep the newest and skip the rest.
+        """
         logs = []
         service_name = source_config['path']
+        next_state = state
+        
+        command = ['journalctl', '-u', service_name, '--no-pager', '--output=json']
+        if not state:
+            command += ['-n', str(max_lines)]
+        if state and state.startswith('@'):
+            command.append(f'--since={state}')
+        elif state:
+            command.append(f'--after-cursor={state}')
+        else:
+            command.append(f'--since=@{int(cutoff_time.timestamp())}')
         
         try:
             # Use journalctl to get recent logs
-            result = subprocess.run([
-                'journalctl', '-u', service_name, '--no-pager', 
-                '-n', str(max_lines), '--output=json'
-            ], capture_output=True, text=True, timeout=15)
+            read_at = int(datetime.now().timestamp())
+            result = subprocess.run(command, capture_output=True, text=True, timeout=self.time_budget)
             
             if result.returncode == 0:
+                next_state = next_state or f'@{read_at}'
                 for line in result.stdout.strip().split('\n'):
                     if not line.strip():
                         continue
                     
+                    if state and len(logs) >= max_lines:
+                        break
                     try:
                         entry = json.loads(line)
                         timestamp = datetime.fromtimestamp(int(entry.get('__REALTIME_TIMESTAMP', 0)) / 1000000)
+                        next_state = entry.get('__CURSOR') or next_state
                         
                         if timestamp >= cutoff_time:
-                            logs.append(LogEntry(
+                            log_entry = LogEntry(
                                 timestamp=timestamp,
-                                level=entry.get('PRIORITY', '6') == '3' and 'ERROR' or 'INFO',
+                                level=JOURNAL_PRIORITY_LEVELS.get(entry.get('PRIORITY', '6'), 'INFO'),
                                 source=f"systemd-{service_name}",
                                 message=entry.get('MESSAGE', ''),
                                 line_number=None
-                            ))
-                    except (json.JSONDecodeError, ValueError):
+                            )
+                            if self._matches(log_entry, level, search):
+                                log_entry.resume_state = entry.get('__CURSOR')
+                                logs.append(log_entry)
+                    except (json.JSONDecodeError, ValueError, TypeError):
                         continue
                         
         except Exception as e:
@@ -360,7 +701,7 @@ class LogViewer:
                 message=f'Error reading systemd logs for {service_name}: {str(e)}'
             ))
         
-        return logs
+        return logs, next_state
     
     def get_available_sources(self):
         """Get list of available log sources."""
@@ -393,10 +734,14 @@ def log_viewer_ajax(request):
     source = request.GET.get('source')
     level = request.GET.get('level')
     search = request.GET.get('search')
+    cursor = request.GET.get('cursor')
     hours = int(request.GET.get('hours', 24))
     max_lines = int(request.GET.get('max_lines', 1000))
     
-    logs = log_viewer.get_logs(source, level, search, hours, max_lines)
+    try:
+        logs, next_cursor = log_viewer.get_logs_since(cursor, source, level, search, hours, max_lines)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
     
     log_data = []
     for log in logs:
@@ -410,7 +755,8 @@ def log_viewer_ajax(request):
     
     return JsonResponse({
         'logs': log_data,
-        'total': len(log_data)
+        'total': len(log_data),
+        'cursor': next_cursor
     })
 
 
@@ -15,7 +15,8 @@ https://aperature-booking.org/commercial
 """
 
 from django.utils import timezone
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Q, F, Count, Sum, Avg, Max, DurationField, ExpressionWrapper
+from django.db.models.functions import TruncDate, TruncWeek
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
@@ -39,81 +40,130 @@ class MaintenancePredictionService:
             'vendor_response_hours': 48,  # Alert if vendor response > 48 hours
         }
     
+    # Booking statuses that count as real instrument usage
+    USAGE_STATUSES = ['approved', 'completed']
+    
+    # Number of resources analysed per batch of queries
+    BATCH_SIZE = 500
+    
     def analyze_all_resources(self):
         """Run predictive analysis for all resources."""
         results = []
         
-        for resource in Resource.objects.all():
+        resource_ids = list(Resource.objects.order_by('id').values_list('id', flat=True))
+        for offset in range(0, len(resource_ids), self.BATCH_SIZE):
+            batch_ids = resource_ids[offset:offset + self.BATCH_SIZE]
+            batch = list(Resource.objects.filter(id__in=batch_ids).order_by('id'))
             try:
-                analysis = self.analyze_resource(resource)
-                if analysis:
-                    results.append(analysis)
+                results.extend(self.analyze_resources(batch))
             except Exception as e:
-                logger.error(f"Error analyzing resource {resource.id}: {e}")
+                logger.warning(
+                    f"Batch analysis of resources {batch_ids[0]}-{batch_ids[-1]} failed ({e}); "
+                    f"retrying one resource at a time"
+                )
+                # Isolate the failing resource so the rest of the batch is still analysed
+                for resource in batch:
+                    try:
+                        results.extend(self.analyze_resources([resource]))
+                    except Exception as e:
+                        logger.error(f"Error analyzing resource {resource.id}: {e}")
         
         return results
     
     def analyze_resource(self, resource):
         """Perform comprehensive analysis for a single resource."""
-        analysis = {
-            'resource': resource,
-            'alerts': [],
-            'predictions': {},
-            'recommendations': []
+        return self.analyze_resources([resource])[0]
+    
+    def analyze_resources(self, resources):
+        """
+        Perform comprehensive analysis for a batch of resources.
+        
+        Usage and maintenance history for the whole batch are pulled as
+        grouped aggregates in a fixed number of queries, and the resulting
+        alerts are written with bulk operations.
+        
+        Returns:
+            List of analysis dicts (resource, alerts, predictions,
+            recommendations) in the order the resources were given.
+        """
+        resources = list(resources)
+        if not resources:
+            return []
+        resource_ids = [resource.id for resource in resources]
+        
+        # Refresh stale analytics in one batch
+        MaintenanceAnalytics.calculate_metrics_bulk(
+            resource_ids, stale_before=timezone.now() - timedelta(hours=24)
+        )
+        analytics_by_resource = {
+            analytics.resource_id: analytics
+            for analytics in MaintenanceAnalytics.objects.filter(resource_id__in=resource_ids)
         }
         
-        # Get or create analytics object
-        analytics, created = MaintenanceAnalytics.objects.get_or_create(resource=resource)
-        if created or not analytics.last_calculated or \
-           analytics.last_calculated < timezone.now() - timedelta(hours=24):
-            analytics.calculate_metrics()
-        
-        # Check usage patterns
-        usage_alerts = self._analyze_usage_patterns(resource)
-        analysis['alerts'].extend(usage_alerts)
+        alert_specs = defaultdict(list)
+        for specs in (
+            self._analyze_usage_patterns(resource_ids),
+            self._analyze_maintenance_patterns(resource_ids),
+            self._analyze_cost_trends(resource_ids),
+            self._analyze_vendor_performance(resource_ids),
+        ):
+            for resource_id, resource_specs in specs.items():
+                alert_specs[resource_id].extend(resource_specs)
         
-        # Check maintenance patterns
-        maintenance_alerts = self._analyze_maintenance_patterns(resource)
-        analysis['alerts'].extend(maintenance_alerts)
+        predictions = self._generate_predictions(resource_ids, analytics_by_resource)
+        alerts = self._save_alerts(alert_specs)
         
-        # Check cost trends
-        cost_alerts = self._analyze_cost_trends(resource)
-        analysis['alerts'].extend(cost_alerts)
-        
-        # Check vendor performance
-        vendor_alerts = self._analyze_vendor_performance(resource)
-        analysis['alerts'].extend(vendor_alerts)
-        
-        # Generate predictions
-        analysis['predictions'] = self._generate_predictions(resource, analytics)
-        
-        # Generate recommendations
-        analysis['recommendations'] = self._generate_recommendations(resource, analytics)
+        results = []
+        for resource in resources:
+            analytics = analytics_by_resource[resource.id]
+            results.append({
+                'resource': resource,
+                'alerts': alerts.get(resource.id, []),
+                'predictions': predictions.get(resource.id, {}),
+                'recommendations': self._generate_recommendations(resource, analytics),
+            })
         
-        return analysis
+        return results
     
-    def _analyze_usage_patterns(self, resource):
+    def _alert(self, alert_type, severity, title, message, recommendation,
+               maintenance_id=None, threshold_value=None, actual_value=None):
+        """Describe an alert to be created or refreshed by ``_save_alerts``."""
+        return {
+            'alert_type': alert_type,
+            'severity': severity,
+            'title': title,
+            'message': message,
+            'recommendation': recommendation,
+            'maintenance_id': maintenance_id,
+            'threshold_value': threshold_value,
+            'actual_value': actual_value,
+        }
+    
+    def _analyze_usage_patterns(self, resource_ids):
         """Analyze resource usage patterns for anomalies."""
-        alerts = []
+        alerts = defaultdict(list)
         now = timezone.now()
         
         # Check recent usage (last 4 weeks)
-        recent_bookings = resource.bookings.filter(
+        recent_bookings = Booking.objects.filter(
+            resource_id__in=resource_ids,
             start_time__gte=now - timedelta(weeks=4),
-            status__in=['confirmed', 'completed']
-        )
-        
-        weekly_usage = defaultdict(float)
-        for booking in recent_bookings:
-            week = booking.start_time.isocalendar()[1]
-            duration_hours = (booking.end_time - booking.start_time).total_seconds() / 3600
-            weekly_usage[week] += duration_hours
-        
-        # Check for excessive usage
-        for week, hours in weekly_usage.items():
+            status__in=self.USAGE_STATUSES
+        ).order_by()
+        duration = ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+        
+        # Weekly hours are grouped by the truncated week start, so ISO weeks
+        # from different years are never merged.
+        weekly_usage = recent_bookings.annotate(
+            week=TruncWeek('start_time')
+        ).values('resource_id', 'week').annotate(total=Sum(duration))
+        
+        for row in weekly_usage:
+            hours = row['total'].total_seconds() / 3600 if row['total'] else 0
             if hours > self.alert_thresholds['usage_hours_per_week']:
-                alert = self._create_alert(
-                    resource=resource,
+                iso_year, iso_week, _ = row['week'].isocalendar()
+                week = f"{iso_year}-W{iso_week:02d}"
+                alerts[row['resource_id']].append(self._alert(
                     alert_type='pattern_anomaly',
                     severity='warning',
                     title=f"High Usage Week {week}",
@@ -121,128 +171,124 @@ class MaintenancePredictionService:
                     recommendation="Consider scheduling preventive maintenance to prevent wear.",
                     threshold_value=self.alert_thresholds['usage_hours_per_week'],
                     actual_value=hours
-                )
-                alerts.append(alert)
+                ))
         
         # Check for booking concentration (too many bookings in short period)
-        daily_bookings = defaultdict(int)
-        for booking in recent_bookings:
-            day = booking.start_time.date()
-            daily_bookings[day] += 1
-        
-        max_daily_bookings = max(daily_bookings.values()) if daily_bookings else 0
-        if max_daily_bookings > 8:  # More than 8 bookings per day
-            alert = self._create_alert(
-                resource=resource,
-                alert_type='pattern_anomaly',
-                severity='info',
-                title="High Booking Density",
-                message=f"Resource had {max_daily_bookings} bookings in a single day.",
-                recommendation="Monitor for signs of overuse and consider usage limits.",
-                actual_value=max_daily_bookings
-            )
-            alerts.append(alert)
+        daily_bookings = recent_bookings.annotate(
+            day=TruncDate('start_time')
+        ).values('resource_id', 'day').annotate(count=Count('id'))
+        
+        max_daily_bookings = defaultdict(int)
+        for row in daily_bookings:
+            max_daily_bookings[row['resource_id']] = max(max_daily_bookings[row['resource_id']], row['count'])
+        
+        for resource_id, max_daily in max_daily_bookings.items():
+            if max_daily > 8:  # More than 8 bookings per day
+                alerts[resource_id].append(self._alert(
+                    alert_type='pattern_anomaly',
+                    severity='info',
+                    title="High Booking Density",
+                    message=f"Resource had {max_daily} bookings in a single day.",
+                    recommendation="Monitor for signs of overuse and consider usage limits.",
+                    actual_value=max_daily
+                ))
         
         return alerts
     
-    def _analyze_maintenance_patterns(self, resource):
+    def _analyze_maintenance_patterns(self, resource_ids):
         """Analyze maintenance patterns and schedules."""
-        alerts = []
+        alerts = defaultdict(list)
         now = timezone.now()
         
         # Check for overdue maintenance
-        overdue_maintenance = resource.maintenances.filter(
+        overdue_maintenance = Maintenance.objects.filter(
+            resource_id__in=resource_ids,
             status__in=['scheduled', 'in_progress'],
             end_time__lt=now - timedelta(days=self.alert_thresholds['overdue_days'])
-        )
+        ).values_list('id', 'resource_id', 'title', 'end_time')
         
-        for maintenance in overdue_maintenance:
-            days_overdue = (now - maintenance.end_time).days
-            alert = self._create_alert(
-                resource=resource,
-                maintenance=maintenance,
+        for maintenance_id, resource_id, title, end_time in overdue_maintenance:
+            days_overdue = (now - end_time).days
+            alerts[resource_id].append(self._alert(
+                maintenance_id=maintenance_id,
                 alert_type='overdue',
                 severity='critical' if days_overdue > 14 else 'warning',
-                title=f"Maintenance Overdue: {maintenance.title}",
+                title=f"Maintenance Overdue: {title}",
                 message=f"Maintenance has been overdue for {days_overdue} days.",
                 recommendation="Complete maintenance immediately to prevent equipment damage.",
                 threshold_value=self.alert_thresholds['overdue_days'],
                 actual_value=days_overdue
-            )
-            alerts.append(alert)
-        
-        # Check maintenance frequency
-        recent_maintenance = resource.maintenances.filter(
-            completed_at__gte=now - timedelta(days=90),
-            status='completed'
-        )
-        
-        emergency_count = recent_maintenance.filter(maintenance_type='emergency').count()
-        if emergency_count > 2:
-            alert = self._create_alert(
-                resource=resource,
-                alert_type='pattern_anomaly',
-                severity='warning',
-                title="Frequent Emergency Maintenance",
-                message=f"{emergency_count} emergency maintenance events in the last 90 days.",
-                recommendation="Review preventive maintenance schedule and resource condition.",
-                actual_value=emergency_count
-            )
-            alerts.append(alert)
-        
-        # Check for missing preventive maintenance
-        last_preventive = resource.maintenances.filter(
-            maintenance_type='preventive',
-            status='completed'
-        ).order_by('-completed_at').first()
-        
-        if last_preventive:
-            days_since_preventive = (now - last_preventive.completed_at).days
-            if days_since_preventive > 180:  # 6 months
-                alert = self._create_alert(
-                    resource=resource,
-                    alert_type='due',
+            ))
+        
+        # Check maintenance frequency and missing preventive maintenance
+        history = Maintenance.objects.filter(
+            resource_id__in=resource_ids, status='completed'
+        ).values('resource_id').annotate(
+            emergency_count=Count('id', filter=Q(
+                maintenance_type='emergency', completed_at__gte=now - timedelta(days=90)
+            )),
+            last_preventive=Max('completed_at', filter=Q(maintenance_type='preventive')),
+        ).order_by()
+        
+        for row in history:
+            resource_id = row['resource_id']
+            emergency_count = row['emergency_count']
+            if emergency_count > 2:
+                alerts[resource_id].append(self._alert(
+                    alert_type='pattern_anomaly',
                     severity='warning',
-                    title="Preventive Maintenance Due",
-                    message=f"Last preventive maintenance was {days_since_preventive} days ago.",
-                    recommendation="Schedule preventive maintenance to maintain equipment reliability.",
-                    threshold_value=180,
-                    actual_value=days_since_preventive
-                )
-                alerts.append(alert)
+                    title="Frequent Emergency Maintenance",
+                    message=f"{emergency_count} emergency maintenance events in the last 90 days.",
+                    recommendation="Review preventive maintenance schedule and resource condition.",
+                    actual_value=emergency_count
+                ))
+            
+            if row['last_preventive']:
+                days_since_preventive = (now - row['last_preventive']).days
+                if days_since_preventive > 180:  # 6 months
+                    alerts[resource_id].append(self._alert(
+                        alert_type='due',
+                        severity='warning',
+                        title="Preventive Maintenance Due",
+                        message=f"Last preventive maintenance was {days_since_preventive} days ago.",
+                        recommendation="Schedule preventive maintenance to maintain equipment reliability.",
+                        threshold_value=180,
+                        actual_value=days_since_preventive
+                    ))
         
         return alerts
     
-    def _analyze_cost_trends(self, resource):
+    def _analyze_cost_trends(self, resource_ids):
         """Analyze maintenance cost trends."""
-        alerts = []
+        alerts = defaultdict(list)
         now = timezone.now()
         
         # Compare recent costs to historical average
         recent_period = now - timedelta(days=90)
         historical_period = now - timedelta(days=365)
         
-        recent_costs = resource.maintenances.filter(
-            completed_at__gte=recent_period,
+        costs = Maintenance.objects.filter(
+            resource_id__in=resource_ids,
             status='completed',
-            actual_cost__isnull=False
-        ).aggregate(total=Sum('actual_cost'))['total'] or 0
-        
-        historical_costs = resource.maintenances.filter(
-            completed_at__gte=historical_period,
-            completed_at__lt=recent_period,
-            status='completed',
-            actual_cost__isnull=False
-        ).aggregate(avg=Avg('actual_cost'))['avg'] or 0
-        
-        if historical_costs > 0:
+            actual_cost__isnull=False,
+            completed_at__gte=historical_period
+        ).values('resource_id').annotate(
+            recent_costs=Sum('actual_cost', filter=Q(completed_at__gte=recent_period)),
+            historical_costs=Avg('actual_cost', filter=Q(completed_at__lt=recent_period)),
+        ).order_by()
+        
+        for row in costs:
+            recent_costs = row['recent_costs'] or 0
+            historical_costs = row['historical_costs'] or 0
+            if historical_costs <= 0:
+                continue
+            
             # Annualize recent costs for comparison
             recent_annual = float(recent_costs) * (365 / 90)
             cost_increase = ((recent_annual - float(historical_costs)) / float(historical_costs)) * 100
             
             if cost_increase > self.alert_thresholds['cost_increase_percentage']:
-                alert = self._create_alert(
-                    resource=resource,
+                alerts[row['resource_id']].append(self._alert(
                     alert_type='cost_overrun',
                     severity='warning',
                     title="Rising Maintenance Costs",
@@ -250,120 +296,121 @@ class MaintenancePredictionService:
                     recommendation="Review maintenance procedures and consider equipment replacement.",
                     threshold_value=self.alert_thresholds['cost_increase_percentage'],
                     actual_value=cost_increase
-                )
-                alerts.append(alert)
+                ))
         
         return alerts
     
-    def _analyze_vendor_performance(self, resource):
+    def _analyze_vendor_performance(self, resource_ids):
         """Analyze vendor performance issues."""
-        alerts = []
+        alerts = defaultdict(list)
         now = timezone.now()
         
         # Check vendor response times
-        vendor_maintenance = resource.maintenances.filter(
+        response_time = ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField())
+        vendor_performance = Maintenance.objects.filter(
+            resource_id__in=resource_ids,
             vendor__isnull=False,
             created_at__gte=now - timedelta(days=90),
-            status__in=['completed', 'in_progress']
-        ).select_related('vendor')
-        
-        vendor_performance = defaultdict(list)
-        for maintenance in vendor_maintenance:
-            if maintenance.status == 'completed' and maintenance.completed_at:
-                response_time = (maintenance.completed_at - maintenance.created_at).total_seconds() / 3600
-                vendor_performance[maintenance.vendor].append(response_time)
-        
-        for vendor, response_times in vendor_performance.items():
-            avg_response = sum(response_times) / len(response_times)
+            status='completed',
+            completed_at__isnull=False
+        ).values('resource_id', 'vendor_id', 'vendor__name').annotate(
+            avg_response=Avg(response_time)
+        ).order_by()
+        
+        for row in vendor_performance:
+            if row['avg_response'] is None:
+                continue
+            avg_response = row['avg_response'].total_seconds() / 3600
             if avg_response > float(self.alert_thresholds['vendor_response_hours']):
-                alert = self._create_alert(
-                    resource=resource,
+                alerts[row['resource_id']].append(self._alert(
                     alert_type='vendor_performance',
                     severity='info',
-                    title=f"Slow Vendor Response: {vendor.name}",
+                    title=f"Slow Vendor Response: {row['vendor__name']}",
                     message=f"Average response time is {avg_response:.1f} hours.",
                     recommendation="Discuss response time expectations with vendor or consider alternatives.",
                     threshold_value=self.alert_thresholds['vendor_response_hours'],
                     actual_value=avg_response
-                )
-                alerts.append(alert)
+                ))
         
         return alerts
     
-    def _generate_predictions(self, resource, analytics):
+    def _generate_predictions(self, resource_ids, analytics_by_resource):
         """Generate predictive maintenance recommendations."""
-        predictions = {}
+        predictions = defaultdict(dict)
         now = timezone.now()
         
-        # Predict next failure based on maintenance history
-        completed_maintenance = resource.maintenances.filter(
+        # One ordered pass over completed corrective/emergency/preventive work
+        failures = defaultdict(list)
+        preventive = defaultdict(list)
+        completions = Maintenance.objects.filter(
+            resource_id__in=resource_ids,
             status='completed',
-            maintenance_type__in=['corrective', 'emergency']
-        ).order_by('completed_at')
-        
-        if completed_maintenance.count() >= 3:
-            # Simple prediction based on average time between failures
-            failure_intervals = []
-            prev_maintenance = None
+            completed_at__isnull=False,
+            maintenance_type__in=['corrective', 'emergency', 'preventive']
+        ).order_by('resource_id', 'completed_at').values_list('resource_id', 'maintenance_type', 'completed_at')
+        
+        for resource_id, maintenance_type, completed_at in completions.iterator(chunk_size=2000):
+            if maintenance_type == 'preventive':
+                preventive[resource_id].append(completed_at)
+            else:
+                failures[resource_id].append(completed_at)
+        
+        changed = {}
+        
+        # Predict next failure based on average time between failures
+        for resource_id, completed_times in failures.items():
+            if len(completed_times) < 3:
+                continue
+            
+            avg_interval = self._average_interval_days(completed_times)
+            last_failure = completed_times[-1]
+            next_failure_prediction = last_failure + timedelta(days=avg_interval)
             
-            for maintenance in completed_maintenance:
-                if prev_maintenance:
-                    interval = (maintenance.completed_at - prev_maintenance.completed_at).days
-                    failure_intervals.append(interval)
-                prev_maintenance = maintenance
+            # Calculate failure probability based on time since last failure
+            days_since_failure = (now - last_failure).days
+            failure_probability = min(days_since_failure / avg_interval, 1.0) if avg_interval else 1.0
             
-            if failure_intervals:
-                avg_interval = sum(failure_intervals) / len(failure_intervals)
-                last_failure = completed_maintenance.last().completed_at
-                next_failure_prediction = last_failure + timedelta(days=avg_interval)
-                
-                # Calculate failure probability based on time since last failure
-                days_since_failure = (now - last_failure).days
-                failure_probability = min(days_since_failure / avg_interval, 1.0)
-                
-                predictions['next_failure_date'] = next_failure_prediction
-                predictions['failure_probability'] = failure_probability
-                predictions['days_to_predicted_failure'] = (next_failure_prediction - now).days
-                
-                # Update analytics
-                analytics.next_failure_prediction = next_failure_prediction
-                analytics.failure_probability = failure_probability * 100
-                analytics.save()
+            predictions[resource_id]['next_failure_date'] = next_failure_prediction
+            predictions[resource_id]['failure_probability'] = failure_probability
+            predictions[resource_id]['days_to_predicted_failure'] = (next_failure_prediction - now).days
+            
+            analytics = analytics_by_resource[resource_id]
+            analytics.next_failure_prediction = next_failure_prediction
+            analytics.failure_probability = round(failure_probability * 100, 2)
+            changed[resource_id] = analytics
         
         # Predict optimal maintenance interval
-        preventive_maintenance = resource.maintenances.filter(
-            status='completed',
-            maintenance_type='preventive'
-        ).order_by('completed_at')
-        
-        if preventive_maintenance.count() >= 2:
-            intervals = []
-            prev_maintenance = None
+        for resource_id, completed_times in preventive.items():
+            if len(completed_times) < 2:
+                continue
             
-            for maintenance in preventive_maintenance:
-                if prev_maintenance:
-                    interval = (maintenance.completed_at - prev_maintenance.completed_at).days
-                    intervals.append(interval)
-                prev_maintenance = maintenance
+            avg_interval = self._average_interval_days(completed_times)
+            next_recommended = completed_times[-1] + timedelta(days=avg_interval)
             
-            if intervals:
-                avg_interval = sum(intervals) / len(intervals)
-                last_preventive = preventive_maintenance.last().completed_at
-                next_recommended = last_preventive + timedelta(days=avg_interval)
-                
-                predictions['next_preventive_recommended'] = next_recommended
-                predictions['recommended_interval_days'] = avg_interval
-                
-                # Update analytics
-                analytics.recommended_maintenance_interval = timedelta(days=avg_interval)
-                analytics.save()
+            predictions[resource_id]['next_preventive_recommended'] = next_recommended
+            predictions[resource_id]['recommended_interval_days'] = avg_interval
+            
+            analytics = analytics_by_resource[resource_id]
+            analytics.recommended_maintenance_interval = timedelta(days=avg_interval)
+            changed[resource_id] = analytics
+        
+        if changed:
+            MaintenanceAnalytics.objects.bulk_update(
+                changed.values(),
+                ['next_failure_prediction', 'failure_probability', 'recommended_maintenance_interval'],
+                batch_size=500
+            )
         
         return predictions
     
+    def _average_interval_days(self, timestamps):
+        """Average whole-day gap between consecutive sorted timestamps."""
+        intervals = [(later - earlier).days for earlier, later in zip(timestamps, timestamps[1:])]
+        return sum(intervals) / len(intervals)
+    
     def _generate_recommendations(self, resource, analytics):
         """Generate maintenance recommendations based on analysis."""
         recommendations = []
-        now = timezone.now()
         
         # Recommendation based on failure probability
         if analytics.failure_probability > self.alert_thresholds['failure_probability'] * 100:
@@ -403,42 +450,63 @@ class MaintenancePredictionService:
         
         return recommendations
     
-    def _create_alert(self, resource, alert_type, severity, title, message, 
-                     recommendation, maintenance=None, threshold_value=None, 
-                     actual_value=None, expires_hours=168):
-        """Create a maintenance alert."""
-        
-        # Check if similar alert already exists
-        existing_alert = MaintenanceAlert.objects.filter(
-            resource=resource,
-            alert_type=alert_type,
-            title=title,
-            is_active=True
-        ).first()
-        
-        if existing_alert:
-            # Update existing alert instead of creating duplicate
-            existing_alert.message = message
-            existing_alert.recommendation = recommendation
-            existing_alert.actual_value = actual_value
-            existing_alert.save()
-            return existing_alert
-        
-        # Create new alert
-        alert = MaintenanceAlert.objects.create(
-            resource=resource,
-            maintenance=maintenance,
-            alert_type=alert_type,
-            severity=severity,
-            title=title,
-            message=message,
-            recommendation=recommendation,
-            threshold_value=threshold_value,
-            actual_value=actual_value,
-            expires_at=timezone.now() + timedelta(hours=expires_hours)
-        )
+    def _save_alerts(self, alert_specs, expires_hours=168):
+        """
+        Create or refresh maintenance alerts in bulk.
+        
+        Active alerts with the same resource, type and title are updated in
+        place instead of creating duplicates.
+        
+        Returns:
+            Mapping of resource id to the list of saved alerts
+        """
+        if not alert_specs:
+            return {}
+        
+        existing = {}
+        for alert in MaintenanceAlert.objects.filter(
+            resource_id__in=list(alert_specs), is_active=True
+        ).order_by('id'):
+            existing.setdefault((alert.resource_id, alert.alert_type, alert.title), alert)
+        
+        expires_at = timezone.now() + timedelta(hours=expires_hours)
+        saved = defaultdict(list)
+        to_update = []
+        to_create = []
+        
+        for resource_id, specs in alert_specs.items():
+            for spec in specs:
+                alert = existing.get((resource_id, spec['alert_type'], spec['title']))
+                if alert:
+                    # Update existing alert instead of creating duplicate
+                    alert.message = spec['message']
+                    alert.recommendation = spec['recommendation']
+                    alert.actual_value = spec['actual_value']
+                    to_update.append(alert)
+                else:
+                    alert = MaintenanceAlert(
+                        resource_id=resource_id,
+                        maintenance_id=spec['maintenance_id'],
+                        alert_type=spec['alert_type'],
+                        severity=spec['severity'],
+                        title=spec['title'],
+                        message=spec['message'],
+                        recommendation=spec['recommendation'],
+                        threshold_value=spec['threshold_value'],
+                        actual_value=spec['actual_value'],
+                        expires_at=expires_at
+                    )
+                    to_create.append(alert)
+                saved[resource_id].append(alert)
+        
+        if to_update:
+            MaintenanceAlert.objects.bulk_update(
+                to_update, ['message', 'recommendation', 'actual_value'], batch_size=500
+            )
+        if to_create:
+            MaintenanceAlert.objects.bulk_create(to_create, batch_size=500)
         
-        return alert
+        return saved
     
     def generate_maintenance_schedule(self, resource, months_ahead=6):
         """Generate recommended maintenance schedule for a resource."""
@@ -0,0 +1,40 @@
+# booking/management/commands/dispatch_outbox.py
+"""
+Management command to dispatch pending outbox events.
+
+Booking and maintenance signals record their notifications in the outbox;
+run this from cron when the background scheduler is not in use.
+"""
+
+from django.core.management.base import BaseCommand
+
+from booking.outbox import dispatch_pending_events, purge_dispatched_events
+
+
+class Command(BaseCommand):
+    help = 'Dispatch pending outbox events recorded by committed changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of events to dispatch (default: OUTBOX_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Also delete dispatched events older than OUTBOX_RETENTION_DAYS'
+        )
+
+    def handle(self, *args, **options):
+        results = dispatch_pending_events(limit=options['limit'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Dispatched {results['dispatched']} events "
+            f"({results['retried']} to retry, {results['failed']} failed)"
+        ))
+
+        if options['purge']:
+            deleted = purge_dispatched_events()
+            self.stdout.write(f'Purged {deleted} dispatched events')
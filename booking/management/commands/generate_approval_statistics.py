@@ -0,0 +1,51 @@
+# booking/management/commands/generate_approval_statistics.py
+"""
+Management command to generate approval workflow statistics.
+
+This command fills ApprovalStatistics rows for every resource and approver
+in a period, which feed the approval statistics dashboard.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from booking.models import ApprovalStatistics
+
+
+class Command(BaseCommand):
+    help = 'Generate approval statistics for all resources and approvers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period',
+            choices=['daily', 'weekly', 'monthly', 'quarterly', 'yearly'],
+            default='monthly',
+            help='Statistics period type (default: monthly)'
+        )
+        parser.add_argument(
+            '--start',
+            help='Period start date (YYYY-MM-DD). Defaults to the start of the current month'
+        )
+
+    def handle(self, *args, **options):
+        period_start = None
+        if options['start']:
+            try:
+                period_start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Start date must be in YYYY-MM-DD format')
+
+        started = timezone.now()
+        written = ApprovalStatistics.generate_statistics_batch(
+            period_type=options['period'],
+            period_start=period_start
+        )
+        duration = (timezone.now() - started).total_seconds()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Generated {written} {options["period"]} statistics rows in {duration:.2f} seconds'
+            )
+        )
@@ -60,7 +60,7 @@ class Command(BaseCommand):
         
         # Send immediate notifications
         self.stdout.write('Processing pending notifications...')
-        sent_count = notification_service.send_pending_notifications()
+        sent_count = notification_service.send_pending_notifications(limit=limit)
         
         if sent_count > 0:
             self.stdout.write(
@@ -73,9 +73,9 @@ class Command(BaseCommand):
         if send_digest:
             self.stdout.write(f'Processing {digest_frequency} notifications...')
             try:
-                notification_service.send_digest_notifications(digest_frequency)
+                digest_count = notification_service.send_digest_notifications(digest_frequency)
                 self.stdout.write(
-                    self.style.SUCCESS(f'Successfully sent {digest_frequency} notifications')
+                    self.style.SUCCESS(f'Successfully sent {digest_count} {digest_frequency} notifications')
                 )
             except Exception as e:
                 self.stdout.write(
@@ -41,6 +41,7 @@ class LicenseValidationMiddleware:
         '/license/status/',
         '/static/',
         '/media/',
+        '/health/',
     ]
     
     def __init__(self, get_response):
@@ -0,0 +1,54 @@
+# booking/middleware/profiling.py
+"""
+Request profiling middleware.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from booking.profiling import install_template_timer, profile_request, record_request
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfilingMiddleware:
+    """
+    Record wall time, query count, database time and template time for each request.
+
+    Enabled with REQUEST_PROFILING_ENABLED. Samples are kept per view in the
+    cache for the site-admin performance page, and slow requests are logged
+    with a summary of their queries. Place it near the top of MIDDLEWARE so
+    the wall time covers the other middleware.
+    """
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+    
+    def __call__(self, request):
+        started = time.perf_counter()
+        with profile_request() as profile:
+            response = self.get_response(request)
+        
+        try:
+            record_request(request, profile, time.perf_counter() - started)
+        except Exception as e:
+            # Profiling must never break the request
+            logger.error(f"Failed to record request profile: {e}")
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0011_add_resource_close_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="digest_frequency",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("daily_digest", "Daily Digest"),
+                    ("weekly_digest", "Weekly Digest"),
+                ],
+                default="",
+                help_text="Held for this digest instead of being sent individually",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["digest_frequency", "status"],
+                name="booking_not_digest__0b9cbe_idx",
+            ),
+        ),
+    ]
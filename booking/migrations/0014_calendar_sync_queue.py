@@ -0,0 +1,98 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0013_outboxevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="googlecalendarintegration",
+            name="next_sync_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Background sync is backed off until this time after errors",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="googlecalendarintegration",
+            name="sync_tokens",
+            field=models.FloatField(
+                blank=True,
+                help_text="Remaining background sync budget (empty means full)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="googlecalendarintegration",
+            name="sync_tokens_updated_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the sync budget was last refilled",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="CalendarSyncQueueItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Not synced before this time, following the user's sync timing",
+                    ),
+                ),
+                (
+                    "requested_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Time of the latest change merged into this item",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="calendar_sync_queue",
+                        to="booking.booking",
+                    ),
+                ),
+                (
+                    "integration",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_queue",
+                        to="booking.googlecalendarintegration",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Calendar Sync Queue Item",
+                "verbose_name_plural": "Calendar Sync Queue",
+                "indexes": [
+                    models.Index(
+                        fields=["available_at"], name="booking_cal_availab_b544f2_idx"
+                    )
+                ],
+                "unique_together": {("integration", "booking")},
+            },
+        ),
+    ]
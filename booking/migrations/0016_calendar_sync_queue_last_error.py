@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0015_user_import_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendarsyncqueueitem",
+            name="last_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name="calendarsyncqueueitem",
+            name="attempts",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Failed sync attempts; the item is left alone once this reaches GOOGLE_CALENDAR_SYNC_MAX_ATTEMPTS",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0016_calendar_sync_queue_last_error"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userimportjob",
+            name="progress_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Time of the last progress update", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="userimportjob",
+            name="warnings",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Rows imported without an unknown faculty, college or department, as {row, warning}",
+            ),
+        ),
+    ]
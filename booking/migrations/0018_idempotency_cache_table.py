@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:27
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """Create the tables of database-backed caches such as IDEMPOTENCY_CACHE."""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+def reverse_func(apps, schema_editor):
+    """No-op reverse function."""
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0017_user_import_job_warnings"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, reverse_func),
+    ]
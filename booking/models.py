@@ -19,6 +19,7 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
+import copy
 import uuid
 import json
 
@@ -214,6 +215,11 @@ class Notification(models.Model):
         ('read', 'Read'),
     ]
     
+    DIGEST_FREQUENCIES = [
+        ('daily_digest', 'Daily Digest'),
+        ('weekly_digest', 'Weekly Digest'),
+    ]
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     notification_type = models.CharField(max_length=30, choices=NotificationPreference.NOTIFICATION_TYPES)
     title = models.CharField(max_length=200)
@@ -221,6 +227,13 @@ class Notification(models.Model):
     priority = models.CharField(max_length=10, choices=PRIORITY_LEVELS, default='medium')
     delivery_method = models.CharField(max_length=20, choices=NotificationPreference.DELIVERY_METHODS)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    digest_frequency = models.CharField(
+        max_length=20,
+        choices=DIGEST_FREQUENCIES,
+        blank=True,
+        default='',
+        help_text="Held for this digest instead of being sent individually"
+    )
     
     # Related objects
     booking = models.ForeignKey('Booking', on_delete=models.CASCADE, null=True, blank=True)
@@ -248,6 +261,7 @@ class Notification(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['notification_type', 'status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['digest_frequency', 'status']),
         ]
     
     def __str__(self):
@@ -319,6 +333,43 @@ class Notification(models.Model):
         )
 
 
+class OutboxEvent(models.Model):
+    """
+    Side effect recorded in the same transaction as the change that caused it.
+    
+    Events are dispatched after commit by ``booking.outbox.dispatch_pending_events``,
+    so notifications only go out for changes that were actually saved.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('dispatched', 'Dispatched'),
+        ('failed', 'Failed'),
+    ]
+    
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'booking_outboxevent'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} ({self.status})"
+
+
+# Compiled EmailTemplate templates by pk, stored with the updated_at they were compiled from
+_compiled_email_templates = {}
+
+
 class EmailTemplate(models.Model):
     """Email templates for different notification types."""
     name = models.CharField(max_length=100, unique=True)
@@ -339,23 +390,36 @@ class EmailTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_notification_type_display()})"
     
+    def get_compiled_templates(self):
+        """Get compiled subject, HTML and text templates, cached per template version."""
+        from django.template import Template
+        cached = _compiled_email_templates.get(self.pk) if self.pk else None
+        if cached and cached[0] == self.updated_at:
+            return cached[1]
+        
+        compiled = (
+            Template(self.subject_template),
+            Template(self.html_template),
+            Template(self.text_template),
+        )
+        if self.pk and self.updated_at:
+            _compiled_email_templates[self.pk] = (self.updated_at, compiled)
+        return compiled
+    
     def render_subject(self, context):
         """Render subject with context variables."""
-        from django.template import Template, Context
-        template = Template(self.subject_template)
-        return template.render(Context(context))
+        from django.template import Context
+        return self.get_compiled_templates()[0].render(Context(context))
     
     def render_html(self, context):
         """Render HTML content with context variables."""
-        from django.template import Template, Context
-        template = Template(self.html_template)
-        return template.render(Context(context))
+        from django.template import Context
+        return self.get_compiled_templates()[1].render(Context(context))
     
     def render_text(self, context):
         """Render text content with context variables."""
-        from django.template import Template, Context
-        template = Template(self.text_template)
-        return template.render(Context(context))
+        from django.template import Context
+        return self.get_compiled_templates()[2].render(Context(context))
 
 
 class PasswordResetToken(models.Model):
@@ -1738,6 +1802,9 @@ class Booking(models.Model):
     check_in_reminder_sent = models.BooleanField(default=False)
     check_out_reminder_sent = models.BooleanField(default=False)
 
+    # Bookkeeping fields that don't warrant a history entry when they change
+    HISTORY_IGNORED_FIELDS = {'updated_at', 'check_in_reminder_sent', 'check_out_reminder_sent'}
+
     class Meta:
         db_table = 'booking_booking'
         ordering = ['start_time']
@@ -1794,9 +1861,71 @@ class Booking(models.Model):
                     if duration_hours > self.resource.max_booking_hours:
                         raise ValidationError(f"Booking exceeds maximum allowed hours ({self.resource.max_booking_hours}h).")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot straight from the loaded row; only JSON values need copying
+        # so in-place edits are seen as changes
+        instance._loaded_values = dict(zip(field_names, values))
+        for attname in cls._json_attnames().intersection(instance._loaded_values):
+            instance._loaded_values[attname] = copy.deepcopy(instance._loaded_values[attname])
+        return instance
+
+    @classmethod
+    def _json_attnames(cls):
+        """Attnames of fields holding mutable JSON values, worked out once per class."""
+        if '_json_attname_set' not in cls.__dict__:
+            cls._json_attname_set = frozenset(
+                field.attname for field in cls._meta.concrete_fields if isinstance(field, models.JSONField)
+            )
+        return cls._json_attname_set
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._snapshot_loaded_values()
+
+    def _snapshot_loaded_values(self, fields=None):
+        """Remember the current values of loaded concrete fields, keyed by attname."""
+        if getattr(self, '_loaded_values', None) is None:
+            self._loaded_values = {}
+        deferred = self.get_deferred_fields()
+        json_attnames = self._json_attnames()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred or (fields is not None and field.name not in fields):
+                continue
+            value = getattr(self, field.attname)
+            if field.attname in json_attnames:
+                # Copy JSON values so in-place edits are seen as changes
+                value = copy.deepcopy(value)
+            self._loaded_values[field.attname] = value
+
+    def get_dirty_fields(self, fields=None):
+        """
+        Return {attname: (old, new)} for fields changed since the booking was loaded or saved.
+
+        Unsaved bookings, and bookings not loaded from the database, report every
+        field with an old value of None.
+        """
+        loaded_values = getattr(self, '_loaded_values', None) or {}
+        deferred = self.get_deferred_fields()
+        dirty = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred or (fields is not None and field.name not in fields):
+                continue
+            new_value = getattr(self, field.attname)
+            if field.attname not in loaded_values:
+                dirty[field.attname] = (None, new_value)
+            elif loaded_values[field.attname] != new_value:
+                dirty[field.attname] = (loaded_values[field.attname], new_value)
+        return dirty
+
     def save(self, *args, **kwargs):
         self.full_clean()
+        update_fields = kwargs.get('update_fields')
+        # Read by the post_save signal to log changes without re-querying
+        self._changed_fields = self.get_dirty_fields(update_fields)
         super().save(*args, **kwargs)
+        self._snapshot_loaded_values(update_fields)
 
     @property
     def duration(self):
@@ -1968,7 +2097,7 @@ class Booking(models.Model):
     def has_conflicts(self):
         """Check for booking conflicts."""
         conflicts = Booking.objects.filter(
-            resource=self.resource,
+            resource_id=self.resource_id,
             status__in=['approved', 'pending'],
             start_time__lt=self.end_time,
             end_time__gt=self.start_time
@@ -2846,20 +2975,26 @@ class ApprovalStatistics(models.Model):
             return 0
         return (self.assessments_approved / total) * 100
     
-    @classmethod
-    def generate_statistics(cls, resource=None, approver=None, period_type='monthly', period_start=None):
-        """Generate statistics for a given period."""
-        from django.utils import timezone
-        from datetime import timedelta, date
-        from django.db.models import Avg, Min, Max
-        
+    STATISTIC_FIELDS = [
+        'access_requests_received', 'access_requests_approved',
+        'access_requests_rejected', 'access_requests_pending',
+        'training_requests_received', 'training_sessions_conducted',
+        'training_completions', 'training_failures',
+        'assessments_created', 'assessments_reviewed',
+        'assessments_approved', 'assessments_rejected',
+        'avg_response_time_hours', 'min_response_time_hours', 'max_response_time_hours',
+        'overdue_items',
+    ]
+    
+    @staticmethod
+    def get_period_bounds(period_type='monthly', period_start=None):
+        """Return the (start, end) dates of the period containing ``period_start``."""
         if period_start is None:
             period_start = timezone.now().date().replace(day=1)  # Start of current month
         
         # Calculate period end based on type
-        if period_type == 'daily':
-            period_end = period_start
-        elif period_type == 'weekly':
+        period_end = period_start
+        if period_type == 'weekly':
             period_end = period_start + timedelta(days=6)
         elif period_type == 'monthly':
             if period_start.month == 12:
@@ -2878,111 +3013,260 @@ class ApprovalStatistics(models.Model):
             period_start = period_start.replace(month=1, day=1)
             period_end = period_start.replace(year=period_start.year + 1, month=1, day=1) - timedelta(days=1)
         
-        # Filter queryset
-        queryset_filters = {
-            'created_at__date__range': [period_start, period_end]
+        return period_start, period_end
+    
+    @staticmethod
+    def _response_time_hours(value):
+        """Convert an aggregated response duration to hours."""
+        return value.total_seconds() / 3600 if isinstance(value, timedelta) else 0.0
+    
+    @staticmethod
+    def _access_aggregates():
+        """
+        Conditional aggregates over AccessRequest.
+        
+        Response times use database duration arithmetic, so the same
+        expressions work on SQLite, PostgreSQL and MySQL.
+        """
+        from django.db.models import Count, Avg, Min, Max, F, Q, ExpressionWrapper
+        
+        response_time = ExpressionWrapper(F('reviewed_at') - F('created_at'), output_field=models.DurationField())
+        reviewed = Q(reviewed_at__isnull=False)
+        
+        return {
+            'access_requests_received': Count('id'),
+            'access_requests_approved': Count('id', filter=Q(status='approved')),
+            'access_requests_rejected': Count('id', filter=Q(status='rejected')),
+            'access_requests_pending': Count('id', filter=Q(status='pending')),
+            'overdue_items': Count('id', filter=Q(status='pending', created_at__lt=timezone.now() - timedelta(days=3))),
+            'avg_response_time_hours': Avg(response_time, filter=reviewed),
+            'min_response_time_hours': Min(response_time, filter=reviewed),
+            'max_response_time_hours': Max(response_time, filter=reviewed),
         }
+    
+    @staticmethod
+    def _training_aggregates():
+        """Conditional aggregates over UserTraining."""
+        from django.db.models import Count, Q
         
+        return {
+            'training_requests_received': Count('id'),
+            'training_sessions_conducted': Count('id', filter=Q(session_date__isnull=False)),
+            'training_completions': Count('id', filter=Q(status='completed', passed=True)),
+            'training_failures': Count('id', filter=Q(status='completed', passed=False)),
+        }
+    
+    @staticmethod
+    def _review_aggregates(prefix='', condition=None):
+        """Conditional aggregates over UserRiskAssessment reviews."""
+        from django.db.models import Count, Q
+        
+        condition = condition if condition is not None else Q()
+        return {
+            'assessments_reviewed': Count(f'{prefix}id', filter=condition & Q(**{f'{prefix}status__in': ['approved', 'rejected']})),
+            'assessments_approved': Count(f'{prefix}id', filter=condition & Q(**{f'{prefix}status': 'approved'})),
+            'assessments_rejected': Count(f'{prefix}id', filter=condition & Q(**{f'{prefix}status': 'rejected'})),
+        }
+    
+    @staticmethod
+    def _pending_access_counts(period, resource=None):
+        """
+        Pending and overdue access requests, keyed by (resource_id, approver_id).
+        
+        Pending requests have no reviewer yet, so each resource's counts are
+        attributed to its first active access approver rather than grouped
+        by ``reviewed_by``. Resources without such an approver are skipped.
+        """
+        from django.db.models import Count, Q
+        
+        pending = AccessRequest.objects.filter(created_at__date__range=period, status='pending')
         if resource:
-            queryset_filters['resource'] = resource
-        if approver:
-            queryset_filters['reviewed_by'] = approver
+            pending = pending.filter(resource=resource)
+        counts = {
+            row.pop('resource_id'): row
+            for row in pending.values('resource_id').annotate(
+                access_requests_pending=Count('id'),
+                overdue_items=Count('id', filter=Q(created_at__lt=timezone.now() - timedelta(days=3))),
+            ).order_by()
+        }
+        if not counts:
+            return {}
+        
+        owners = {}
+        responsible = ResourceResponsible.objects.filter(
+            resource_id__in=counts, is_active=True, can_approve_access=True
+        ).order_by('resource_id', 'role_type', 'assigned_at').values_list('resource_id', 'user_id')
+        for resource_id, user_id in responsible:
+            owners.setdefault(resource_id, user_id)
+        
+        return {
+            (resource_id, owners[resource_id]): values
+            for resource_id, values in counts.items()
+            if resource_id in owners
+        }
+    
+    @classmethod
+    def generate_statistics(cls, resource=None, approver=None, period_type='monthly', period_start=None):
+        """Generate statistics for a given period in three aggregate queries."""
+        from django.db.models import Count, Q
+        
+        period_start, period_end = cls.get_period_bounds(period_type, period_start)
+        period = [period_start, period_end]
         
         # Access request statistics
-        access_requests = AccessRequest.objects.filter(**queryset_filters)
-        access_requests_received = access_requests.count()
-        access_requests_approved = access_requests.filter(status='approved').count()
-        access_requests_rejected = access_requests.filter(status='rejected').count()
-        access_requests_pending = access_requests.filter(status='pending').count()
+        access_requests = AccessRequest.objects.filter(created_at__date__range=period)
+        if resource:
+            access_requests = access_requests.filter(resource=resource)
+        if approver:
+            access_requests = access_requests.filter(reviewed_by=approver)
+        stats = access_requests.aggregate(**cls._access_aggregates())
+        if approver:
+            # Pending requests are not reviewed yet; count the approver's queue
+            stats['access_requests_pending'] = stats['overdue_items'] = 0
+            for (_, owner_id), values in cls._pending_access_counts(period, resource).items():
+                if owner_id == approver.pk:
+                    for field, value in values.items():
+                        stats[field] += value
         
         # Training statistics
-        training_filters = queryset_filters.copy()
-        if 'reviewed_by' in training_filters:
-            training_filters['instructor'] = training_filters.pop('reviewed_by')
-        
-        training_records = UserTraining.objects.filter(**training_filters)
-        training_requests_received = training_records.count()
-        training_completions = training_records.filter(status='completed', passed=True).count()
-        training_failures = training_records.filter(status='completed', passed=False).count()
-        training_sessions_conducted = training_records.filter(session_date__isnull=False).count()
-        
-        # Risk assessment statistics
-        assessment_filters = queryset_filters.copy()
-        if 'reviewed_by' in assessment_filters:
-            assessment_filters['reviewed_by'] = assessment_filters.pop('reviewed_by')
-        
-        risk_assessments = UserRiskAssessment.objects.filter(**assessment_filters)
-        assessments_reviewed = risk_assessments.filter(status__in=['approved', 'rejected']).count()
-        assessments_approved = risk_assessments.filter(status='approved').count()
-        assessments_rejected = risk_assessments.filter(status='rejected').count()
-        
-        # Created assessments (different filter)
-        created_filters = queryset_filters.copy()
-        if 'reviewed_by' in created_filters:
-            created_filters['created_by'] = created_filters.pop('reviewed_by')
-        assessments_created = RiskAssessment.objects.filter(**created_filters).count()
-        
-        # Response time calculations
-        response_times = access_requests.filter(
-            reviewed_at__isnull=False
-        ).extra(
-            select={
-                'response_hours': '(JULIANDAY(reviewed_at) - JULIANDAY(created_at)) * 24'
-            }
-        ).values_list('response_hours', flat=True)
+        training_records = UserTraining.objects.filter(enrolled_at__date__range=period)
+        if resource:
+            training_records = training_records.filter(training_course__resource_requirements__resource=resource)
+        if approver:
+            training_records = training_records.filter(instructor=approver)
+        stats.update(training_records.aggregate(**cls._training_aggregates()))
         
-        if response_times:
-            avg_response_time = sum(response_times) / len(response_times)
-            min_response_time = min(response_times)
-            max_response_time = max(response_times)
-        else:
-            avg_response_time = min_response_time = max_response_time = 0.0
+        # Risk assessment statistics: assessments created and user completions
+        # reviewed come from one join, each counted with its own filter.
+        created = Q(created_at__date__range=period)
+        completions = Q(user_completions__created_at__date__range=period)
+        if approver:
+            created &= Q(created_by=approver)
+            completions &= Q(user_completions__reviewed_by=approver)
         
-        # Overdue items
-        overdue_items = access_requests.filter(
-            status='pending',
-            created_at__lt=timezone.now() - timedelta(days=3)
-        ).count()
+        risk_assessments = RiskAssessment.objects.all()
+        if resource:
+            risk_assessments = risk_assessments.filter(resource=resource)
+        stats.update(risk_assessments.aggregate(
+            assessments_created=Count('id', distinct=True, filter=created),
+            **cls._review_aggregates(prefix='user_completions__', condition=completions)
+        ))
         
-        return {
+        for field in ('avg_response_time_hours', 'min_response_time_hours', 'max_response_time_hours'):
+            stats[field] = cls._response_time_hours(stats[field])
+        
+        stats.update({
             'period_start': period_start,
             'period_end': period_end,
             'period_type': period_type,
-            'access_requests_received': access_requests_received,
-            'access_requests_approved': access_requests_approved,
-            'access_requests_rejected': access_requests_rejected,
-            'access_requests_pending': access_requests_pending,
-            'training_requests_received': training_requests_received,
-            'training_sessions_conducted': training_sessions_conducted,
-            'training_completions': training_completions,
-            'training_failures': training_failures,
-            'assessments_created': assessments_created,
-            'assessments_reviewed': assessments_reviewed,
-            'assessments_approved': assessments_approved,
-            'assessments_rejected': assessments_rejected,
-            'avg_response_time_hours': avg_response_time,
-            'min_response_time_hours': min_response_time,
-            'max_response_time_hours': max_response_time,
-            'overdue_items': overdue_items,
+        })
+        return stats
+    
+    @classmethod
+    def generate_statistics_batch(cls, period_type='monthly', period_start=None):
+        """
+        Fill ApprovalStatistics rows for every (resource, approver) in a period.
+        
+        Each source table is read once with a GROUP BY on resource and
+        approver, and the rows are upserted with bulk operations. Pending
+        and overdue access requests are counted per resource (see
+        ``_pending_access_counts``). Existing rows for the period with no
+        activity left are reset to zero.
+        
+        Returns:
+            Number of statistics rows written
+        """
+        from collections import defaultdict
+        from django.db.models import Count, F
+        
+        period_start, period_end = cls.get_period_bounds(period_type, period_start)
+        period = [period_start, period_end]
+        rows = defaultdict(lambda: {field: 0 for field in cls.STATISTIC_FIELDS})
+        
+        sources = [
+            (AccessRequest.objects.filter(created_at__date__range=period),
+             'resource_id', 'reviewed_by_id', cls._access_aggregates()),
+            (UserTraining.objects.filter(enrolled_at__date__range=period),
+             'training_course__resource_requirements__resource_id', 'instructor_id', cls._training_aggregates()),
+            # Assessments created are attributed to their author, reviews to the reviewer
+            (RiskAssessment.objects.filter(created_at__date__range=period),
+             'resource_id', 'created_by_id', {'assessments_created': Count('id')}),
+            (UserRiskAssessment.objects.filter(created_at__date__range=period),
+             'risk_assessment__resource_id', 'reviewed_by_id', cls._review_aggregates()),
+        ]
+        
+        for queryset, resource_path, approver_path, aggregates in sources:
+            grouped = queryset.filter(**{f'{approver_path}__isnull': False}).values(
+                stat_resource=F(resource_path), stat_approver=F(approver_path)
+            ).annotate(**aggregates).order_by()
+            for row in grouped:
+                if row['stat_resource'] is None:
+                    continue
+                values = rows[(row['stat_resource'], row['stat_approver'])]
+                for field in aggregates:
+                    values[field] = row[field]
+        
+        for key, values in cls._pending_access_counts(period).items():
+            rows[key].update(values)
+        
+        existing = {
+            (stat.resource_id, stat.approver_id): stat
+            for stat in cls.objects.filter(period_type=period_type, period_start=period_start)
         }
+        now = timezone.now()
+        to_update = []
+        to_create = []
+        for key, stat in existing.items():
+            if key not in rows:
+                # No activity left for this pair; clear counts from earlier runs
+                for field in cls.STATISTIC_FIELDS:
+                    setattr(stat, field, 0.0 if field.endswith('_hours') else 0)
+                stat.period_end = period_end
+                stat.updated_at = now
+                to_update.append(stat)
+        for (resource_id, approver_id), values in rows.items():
+            for field in ('avg_response_time_hours', 'min_response_time_hours', 'max_response_time_hours'):
+                values[field] = cls._response_time_hours(values[field])
+            
+            stat = existing.get((resource_id, approver_id))
+            if stat is None:
+                stat = cls(resource_id=resource_id, approver_id=approver_id,
+                           period_type=period_type, period_start=period_start)
+                to_create.append(stat)
+            else:
+                to_update.append(stat)
+            stat.period_end = period_end
+            stat.updated_at = now
+            for field, value in values.items():
+                setattr(stat, field, value)
+        
+        if to_create:
+            cls.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            cls.objects.bulk_update(to_update, cls.STATISTIC_FIELDS + ['period_end', 'updated_at'], batch_size=500)
+        
+        return len(to_create) + len(to_update)
+    
+    def calculate_statistics(self):
+        """Recalculate and save this row's statistics."""
+        stats = self.generate_statistics(
+            resource=self.resource, approver=self.approver,
+            period_type=self.period_type, period_start=self.period_start
+        )
+        for field in self.STATISTIC_FIELDS + ['period_end']:
+            setattr(self, field, stats[field])
+        self.save()
     
     @classmethod
     def get_dashboard_data(cls, user=None, resource=None, days=30):
         """Get comprehensive dashboard data for approval workflows."""
-        from django.utils import timezone
-        from datetime import timedelta
-        from django.db.models import Count, Avg, Q
+        from django.db.models import Count, Avg, Q, F, ExpressionWrapper
         
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
         
-        # Base filters
-        base_filters = {
-            'created_at__date__range': [start_date, end_date]
-        }
-        
         # Access request summary
-        access_requests = AccessRequest.objects.filter(**base_filters)
+        access_requests = AccessRequest.objects.filter(created_at__date__range=[start_date, end_date])
         if user:
             access_requests = access_requests.filter(
                 Q(user=user) | Q(reviewed_by=user)
@@ -2990,61 +3274,54 @@ class ApprovalStatistics(models.Model):
         if resource:
             access_requests = access_requests.filter(resource=resource)
         
-        access_summary = {
-            'total': access_requests.count(),
-            'pending': access_requests.filter(status='pending').count(),
-            'approved': access_requests.filter(status='approved').count(),
-            'rejected': access_requests.filter(status='rejected').count(),
+        access_aggregates = {
+            'total': Count('id'),
+            'pending': Count('id', filter=Q(status='pending')),
+            'approved': Count('id', filter=Q(status='approved')),
+            'rejected': Count('id', filter=Q(status='rejected')),
         }
+        if user:
+            # Performance metrics
+            response_time = ExpressionWrapper(F('reviewed_at') - F('created_at'), output_field=models.DurationField())
+            access_aggregates['avg_response_time'] = Avg(
+                response_time, filter=Q(reviewed_by=user, reviewed_at__isnull=False)
+            )
+        access_summary = access_requests.aggregate(**access_aggregates)
+        avg_response_time = cls._response_time_hours(access_summary.pop('avg_response_time', None))
         
         # Training summary
-        training_records = UserTraining.objects.filter(**base_filters)
+        training_records = UserTraining.objects.filter(enrolled_at__date__range=[start_date, end_date])
         if user:
             training_records = training_records.filter(
                 Q(user=user) | Q(instructor=user)
             )
         
-        training_summary = {
-            'total': training_records.count(),
-            'completed': training_records.filter(status='completed', passed=True).count(),
-            'failed': training_records.filter(status='completed', passed=False).count(),
-            'in_progress': training_records.filter(status='in_progress').count(),
-        }
+        training_summary = training_records.aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed', passed=True)),
+            failed=Count('id', filter=Q(status='completed', passed=False)),
+            in_progress=Count('id', filter=Q(status='in_progress')),
+        )
         
         # Risk assessment summary
-        risk_assessments = UserRiskAssessment.objects.filter(**base_filters)
+        risk_assessments = UserRiskAssessment.objects.filter(created_at__date__range=[start_date, end_date])
         if user:
             risk_assessments = risk_assessments.filter(
                 Q(user=user) | Q(reviewed_by=user)
             )
         
-        assessment_summary = {
-            'total': risk_assessments.count(),
-            'approved': risk_assessments.filter(status='approved').count(),
-            'rejected': risk_assessments.filter(status='rejected').count(),
-            'pending': risk_assessments.filter(status='submitted').count(),
-        }
+        assessment_summary = risk_assessments.aggregate(
+            total=Count('id'),
+            approved=Count('id', filter=Q(status='approved')),
+            rejected=Count('id', filter=Q(status='rejected')),
+            pending=Count('id', filter=Q(status='submitted')),
+        )
         
         # Recent activity
         recent_access_requests = access_requests.order_by('-created_at')[:10]
         recent_training = training_records.order_by('-updated_at')[:10]
         recent_assessments = risk_assessments.order_by('-updated_at')[:10]
         
-        # Performance metrics
-        if user:
-            response_times = access_requests.filter(
-                reviewed_by=user,
-                reviewed_at__isnull=False
-            ).extra(
-                select={
-                    'response_hours': '(JULIANDAY(reviewed_at) - JULIANDAY(created_at)) * 24'
-                }
-            ).values_list('response_hours', flat=True)
-            
-            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        else:
-            avg_response_time = 0
-        
         return {
             'summary': {
                 'access_requests': access_summary,
@@ -3813,64 +4090,173 @@ class MaintenanceAnalytics(models.Model):
     def __str__(self):
         return f"Analytics for {self.resource.name}"
     
+    METRIC_FIELDS = [
+        'total_maintenance_cost', 'average_maintenance_cost', 'preventive_cost_ratio',
+        'total_downtime_hours', 'average_repair_time',
+        'total_maintenance_count', 'preventive_maintenance_count',
+        'corrective_maintenance_count', 'emergency_maintenance_count',
+        'first_time_fix_rate',
+    ]
+    
+    # Repeat maintenance of the same type within this window counts as a
+    # failed first-time fix.
+    REPEAT_ISSUE_WINDOW = timedelta(days=30)
+    
     def calculate_metrics(self):
         """Recalculate all maintenance metrics for this resource."""
-        maintenances = self.resource.maintenances.all()
-        completed_maintenances = maintenances.filter(status='completed')
-        
-        if not completed_maintenances.exists():
+        metrics = self.compute_metrics([self.resource_id]).get(self.resource_id)
+        if not metrics:
             return
         
-        # Cost metrics
-        costs = completed_maintenances.exclude(actual_cost__isnull=True).values_list('actual_cost', flat=True)
-        if costs:
-            self.total_maintenance_cost = sum(costs)
-            self.average_maintenance_cost = sum(costs) / len(costs)
-        
-        preventive_costs = completed_maintenances.filter(
-            maintenance_type='preventive'
-        ).exclude(actual_cost__isnull=True).aggregate(
-            total=models.Sum('actual_cost')
-        )['total'] or 0
-        
-        if self.total_maintenance_cost > 0:
-            self.preventive_cost_ratio = (preventive_costs / self.total_maintenance_cost) * 100
-        
-        # Frequency metrics
-        self.total_maintenance_count = maintenances.count()
-        self.preventive_maintenance_count = maintenances.filter(maintenance_type='preventive').count()
-        self.corrective_maintenance_count = maintenances.filter(maintenance_type='corrective').count()
-        self.emergency_maintenance_count = maintenances.filter(maintenance_type='emergency').count()
-        
-        # Time metrics
-        durations = []
-        for maintenance in completed_maintenances:
-            if maintenance.completed_at and maintenance.start_time:
-                duration = maintenance.completed_at - maintenance.start_time
-                durations.append(duration.total_seconds() / 3600)  # Convert to hours
-        
-        if durations:
-            self.total_downtime_hours = sum(durations)
-            avg_hours = sum(durations) / len(durations)
-            self.average_repair_time = timedelta(hours=avg_hours)
-        
-        # Performance metrics
-        # Simple first-time fix rate calculation
-        if completed_maintenances.count() > 0:
-            repeated_issues = 0
-            for maintenance in completed_maintenances:
-                # Check if there's another maintenance within 30 days for same type of issue
-                related = completed_maintenances.filter(
-                    maintenance_type=maintenance.maintenance_type,
-                    start_time__gt=maintenance.completed_at,
-                    start_time__lt=maintenance.completed_at + timedelta(days=30)
-                ).exists()
-                if related:
-                    repeated_issues += 1
+        for field, value in metrics.items():
+            setattr(self, field, value)
+        self.save()
+    
+    @classmethod
+    def calculate_metrics_bulk(cls, resource_ids=None, stale_before=None):
+        """
+        Recalculate metrics for many resources in a fixed number of queries.
+        
+        Missing analytics rows are created, and rows calculated after
+        ``stale_before`` are left untouched. Returns the number of rows updated.
+        """
+        if resource_ids is None:
+            resource_ids = list(Resource.objects.values_list('id', flat=True))
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return 0
+        
+        existing = {
+            analytics.resource_id: analytics
+            for analytics in cls.objects.filter(resource_id__in=resource_ids)
+        }
+        missing = [cls(resource_id=resource_id) for resource_id in resource_ids if resource_id not in existing]
+        if missing:
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            for analytics in cls.objects.filter(resource_id__in=[a.resource_id for a in missing]):
+                existing[analytics.resource_id] = analytics
+        
+        if stale_before is not None:
+            fresh_ids = {analytics.resource_id for analytics in missing}
+            target_ids = [
+                resource_id for resource_id, analytics in existing.items()
+                if resource_id in fresh_ids or not analytics.last_calculated
+                or analytics.last_calculated < stale_before
+            ]
+        else:
+            target_ids = list(existing)
+        
+        all_metrics = cls.compute_metrics(target_ids)
+        now = timezone.now()
+        to_update = []
+        for resource_id, metrics in all_metrics.items():
+            analytics = existing[resource_id]
+            for field, value in metrics.items():
+                setattr(analytics, field, value)
+            analytics.last_calculated = now
+            to_update.append(analytics)
+        
+        if to_update:
+            cls.objects.bulk_update(to_update, cls.METRIC_FIELDS + ['last_calculated'], batch_size=500)
+        return len(to_update)
+    
+    @classmethod
+    def compute_metrics(cls, resource_ids):
+        """
+        Compute metric values for the given resources.
+        
+        Counts, costs and downtime come from one grouped aggregate query; the
+        first-time fix rate uses a single ordered fetch of completed
+        maintenance and a sorted sweep per (resource, type). Resources without
+        completed maintenance are omitted, matching the per-resource behaviour.
+        """
+        from bisect import bisect_right
+        from collections import defaultdict
+        from decimal import Decimal
+        from django.db.models import Count, Sum, F, Q, ExpressionWrapper
+        
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return {}
+        
+        completed = Q(status='completed')
+        costed = completed & Q(actual_cost__isnull=False)
+        timed = completed & Q(completed_at__isnull=False)
+        duration = ExpressionWrapper(F('completed_at') - F('start_time'), output_field=models.DurationField())
+        
+        rows = Maintenance.objects.filter(resource_id__in=resource_ids).values('resource_id').annotate(
+            total_count=Count('id'),
+            preventive_count=Count('id', filter=Q(maintenance_type='preventive')),
+            corrective_count=Count('id', filter=Q(maintenance_type='corrective')),
+            emergency_count=Count('id', filter=Q(maintenance_type='emergency')),
+            completed_count=Count('id', filter=completed),
+            cost_total=Sum('actual_cost', filter=costed),
+            cost_count=Count('id', filter=costed),
+            preventive_cost=Sum('actual_cost', filter=costed & Q(maintenance_type='preventive')),
+            downtime_total=Sum(duration, filter=timed),
+            downtime_count=Count('id', filter=timed),
+        ).order_by()
+        
+        # Sorted sweep for repeat issues: within each (resource, type) group a
+        # maintenance is repeated if another one starts in (completed_at, completed_at + window).
+        starts_by_group = defaultdict(list)
+        completions_by_group = defaultdict(list)
+        completed_rows = Maintenance.objects.filter(
+            completed, resource_id__in=resource_ids
+        ).order_by('resource_id', 'maintenance_type', 'start_time').values_list(
+            'resource_id', 'maintenance_type', 'start_time', 'completed_at'
+        )
+        for resource_id, maintenance_type, start_time, completed_at in completed_rows.iterator(chunk_size=2000):
+            key = (resource_id, maintenance_type)
+            starts_by_group[key].append(start_time)
+            if completed_at:
+                completions_by_group[key].append(completed_at)
+        
+        repeated_by_resource = defaultdict(int)
+        for key, completions in completions_by_group.items():
+            starts = starts_by_group[key]
+            for completed_at in completions:
+                index = bisect_right(starts, completed_at)
+                if index < len(starts) and starts[index] < completed_at + cls.REPEAT_ISSUE_WINDOW:
+                    repeated_by_resource[key[0]] += 1
+        
+        metrics = {}
+        for row in rows:
+            if not row['completed_count']:
+                continue
+            
+            values = {
+                'total_maintenance_count': row['total_count'],
+                'preventive_maintenance_count': row['preventive_count'],
+                'corrective_maintenance_count': row['corrective_count'],
+                'emergency_maintenance_count': row['emergency_count'],
+            }
+            
+            # Cost metrics
+            if row['cost_count']:
+                values['total_maintenance_cost'] = row['cost_total']
+                values['average_maintenance_cost'] = (row['cost_total'] / row['cost_count']).quantize(Decimal('0.01'))
+                if row['cost_total'] > 0:
+                    preventive_cost = row['preventive_cost'] or Decimal('0')
+                    values['preventive_cost_ratio'] = (
+                        preventive_cost / row['cost_total'] * 100
+                    ).quantize(Decimal('0.01'))
+            
+            # Time metrics
+            if row['downtime_count'] and row['downtime_total'] is not None:
+                total_hours = row['downtime_total'].total_seconds() / 3600
+                values['total_downtime_hours'] = round(total_hours, 2)
+                values['average_repair_time'] = row['downtime_total'] / row['downtime_count']
+            
+            # Performance metrics
+            repeated_issues = repeated_by_resource.get(row['resource_id'], 0)
+            values['first_time_fix_rate'] = round(
+                (row['completed_count'] - repeated_issues) / row['completed_count'] * 100, 2
+            )
             
-            self.first_time_fix_rate = ((completed_maintenances.count() - repeated_issues) / completed_maintenances.count()) * 100
+            metrics[row['resource_id']] = values
         
-        self.save()
+        return metrics
 
 
 class BookingHistory(models.Model):
@@ -5990,6 +6376,21 @@ class GoogleCalendarIntegration(models.Model):
         blank=True,
         help_text="Last sync error message"
     )
+    next_sync_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Background sync is backed off until this time after errors"
+    )
+    sync_tokens = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Remaining background sync budget (empty means full)"
+    )
+    sync_tokens_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the sync budget was last refilled"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -6116,6 +6517,46 @@ class GoogleCalendarSyncLog(models.Model):
         return colors.get(self.status, 'secondary')
 
 
+class CalendarSyncQueueItem(models.Model):
+    """Booking change waiting to be pushed to Google Calendar in the background."""
+    
+    integration = models.ForeignKey(
+        GoogleCalendarIntegration,
+        on_delete=models.CASCADE,
+        related_name='sync_queue'
+    )
+    booking = models.ForeignKey(
+        'Booking',
+        on_delete=models.CASCADE,
+        related_name='calendar_sync_queue'
+    )
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Not synced before this time, following the user's sync timing"
+    )
+    requested_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Time of the latest change merged into this item"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Failed sync attempts; the item is left alone once this reaches GOOGLE_CALENDAR_SYNC_MAX_ATTEMPTS"
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Calendar Sync Queue Item"
+        verbose_name_plural = "Calendar Sync Queue"
+        unique_together = ['integration', 'booking']
+        indexes = [
+            models.Index(fields=['available_at']),
+        ]
+
+    def __str__(self):
+        return f"Sync booking #{self.booking_id} for integration #{self.integration_id}"
+
+
 class CalendarSyncPreferences(models.Model):
     """User preferences for calendar sync behavior."""
     
@@ -6202,9 +6643,99 @@ class CalendarSyncPreferences(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Fields that change which events are pushed to Google Calendar or what they contain
+    SYNCED_EVENT_FIELDS = (
+        'sync_cancelled_bookings',
+        'sync_pending_bookings',
+        'event_prefix',
+        'include_resource_in_title',
+        'include_description',
+        'set_event_location',
+    )
+
     class Meta:
         verbose_name = "Calendar Sync Preferences"
         verbose_name_plural = "Calendar Sync Preferences"
 
     def __str__(self):
-        return f"Calendar preferences for {self.user.get_full_name() or self.user.username}"
\ No newline at end of file
+        return f"Calendar preferences for {self.user.get_full_name() or self.user.username}"
+
+    def save(self, *args, **kwargs):
+        # Incremental sync only sends bookings changed since the last sync, so
+        # note changes here for the post_save signal to queue a full resync
+        previous = None
+        if self.pk:
+            previous = type(self).objects.filter(pk=self.pk).values(*self.SYNCED_EVENT_FIELDS).first()
+        self._synced_event_fields_changed = previous is None or any(
+            previous[name] != getattr(self, name) for name in self.SYNCED_EVENT_FIELDS
+        )
+        super().save(*args, **kwargs)
+
+
+class UserImportJob(models.Model):
+    """
+    CSV user import run in the background.
+    
+    The uploaded file is stored with the job and imported by
+    ``booking.user_import.process_import_jobs`` from the scheduler, which
+    records progress and per-row errors here as it goes.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    file = models.FileField(upload_to='user_imports/%Y/%m/')
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='user_import_jobs'
+    )
+    update_existing = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    # Progress
+    file_size = models.PositiveBigIntegerField(default=0)
+    bytes_processed = models.PositiveBigIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Row errors as {row, error}, capped at USER_IMPORT_MAX_ERRORS"
+    )
+    warnings = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Rows imported without an unknown faculty, college or department, as {row, warning}"
+    )
+    last_error = models.TextField(blank=True, help_text="Why the whole import failed")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    progress_at = models.DateTimeField(null=True, blank=True, help_text="Time of the last progress update")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"User import #{self.pk} ({self.status})"
+    
+    @property
+    def progress_percent(self):
+        if self.status == 'completed':
+            return 100
+        if not self.file_size:
+            return 0
+        return min(99, int(self.bytes_processed * 100 / self.file_size))
@@ -14,9 +14,11 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://aperature-booking.org/commercial
 """
 
+from django.core.cache import cache
 from django.db.models import Count, Q
+from django.db.models.functions import TruncDate, TruncHour, TruncWeek
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
 
@@ -28,70 +30,147 @@ logger = logging.getLogger(__name__)
 class NotificationAnalytics:
     """Analytics service for notification system."""
     
-    def get_notification_stats(self, days: int = 30) -> Dict:
-        """Get notification statistics for the specified period."""
-        start_date = timezone.now() - timedelta(days=days)
+    CACHE_TIMEOUT = 60  # Short TTL so dashboards stay close to live
+    CACHE_PREFIX = 'notification_analytics'
+    
+    GRANULARITIES = {
+        'hour': (TruncHour, timedelta(hours=1)),
+        'day': (TruncDate, timedelta(days=1)),
+        'week': (TruncWeek, timedelta(weeks=1)),
+    }
+    
+    def _cached(self, key_parts, builder):
+        """Return a cached result, building and caching it on a miss."""
+        cache_key = ':'.join([self.CACHE_PREFIX] + [str(part) for part in key_parts])
+        result = cache.get(cache_key)
+        if result is None:
+            result = builder()
+            cache.set(cache_key, result, self.CACHE_TIMEOUT)
+        return result
+    
+    def _status_counts(self, queryset) -> Dict:
+        """Count notifications by status in a single aggregate query."""
+        return queryset.aggregate(
+            total=Count('id'),
+            sent=Count('id', filter=Q(status='sent')),
+            failed=Count('id', filter=Q(status='failed')),
+            read=Count('id', filter=Q(status='read')),
+            pending=Count('id', filter=Q(status='pending')),
+        )
+    
+    def _bucket_start(self, moment: datetime, granularity: str):
+        """Align a datetime to the start of its bucket in the current timezone."""
+        local = timezone.localtime(moment)
+        if granularity == 'hour':
+            return local.replace(minute=0, second=0, microsecond=0)
+        day = local.date()
+        if granularity == 'week':
+            day -= timedelta(days=day.weekday())
+        return day
+    
+    def get_volume_series(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          granularity: str = 'day', **filters) -> List[Dict]:
+        """
+        Get notification volume per hour, day or week in one query.
+        
+        Buckets with no notifications are filled with zeros so the series is
+        continuous between ``start`` and ``end``.
+        """
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
         
-        # Basic stats
-        total_notifications = Notification.objects.filter(created_at__gte=start_date).count()
-        sent_notifications = Notification.objects.filter(
-            created_at__gte=start_date,
-            status='sent'
-        ).count()
-        failed_notifications = Notification.objects.filter(
-            created_at__gte=start_date,
-            status='failed'
-        ).count()
-        read_notifications = Notification.objects.filter(
-            created_at__gte=start_date,
-            status='read'
-        ).count()
+        end = end or timezone.now()
+        start = start or end - timedelta(days=30)
+        trunc, step = self.GRANULARITIES[granularity]
+        
+        rows = Notification.objects.filter(
+            created_at__gte=start, created_at__lt=end, **filters
+        ).annotate(
+            bucket=trunc('created_at')
+        ).values('bucket').annotate(
+            count=Count('id'),
+            sent=Count('id', filter=Q(status='sent')),
+            failed=Count('id', filter=Q(status='failed')),
+            read=Count('id', filter=Q(status='read')),
+        ).order_by('bucket')
+        
+        by_bucket = {}
+        for row in rows:
+            bucket = row.pop('bucket')
+            if granularity == 'week':
+                bucket = timezone.localtime(bucket).date() if isinstance(bucket, datetime) else bucket
+            elif granularity == 'hour':
+                bucket = timezone.localtime(bucket)
+            by_bucket[bucket] = row
+        
+        series = []
+        bucket = self._bucket_start(start, granularity)
+        last_bucket = self._bucket_start(end, granularity)
+        empty = {'count': 0, 'sent': 0, 'failed': 0, 'read': 0}
+        while bucket <= last_bucket:
+            series.append({'date': bucket, **by_bucket.get(bucket, empty)})
+            bucket += step
+        
+        return series
+    
+    def get_notification_stats(self, days: int = 30, start: Optional[datetime] = None,
+                               end: Optional[datetime] = None, granularity: str = 'day') -> Dict:
+        """
+        Get notification statistics for the specified period.
+        
+        The period defaults to the last ``days`` days; pass ``start``/``end``
+        for an arbitrary range and ``granularity`` (hour/day/week) for the
+        volume series.
+        """
+        if end is None:
+            # Round the default end up to the next minute so calls within the
+            # cache timeout share a cache key
+            end = timezone.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+        start = start or end - timedelta(days=days)
+        
+        return self._cached(
+            ['stats', start.isoformat(), end.isoformat(), granularity],
+            lambda: self._build_notification_stats(start, end, granularity)
+        )
+    
+    def _build_notification_stats(self, start: datetime, end: datetime, granularity: str) -> Dict:
+        """Build notification statistics in a fixed number of queries."""
+        notifications = Notification.objects.filter(created_at__gte=start, created_at__lt=end)
+        counts = self._status_counts(notifications)
         
         # Delivery success rate
+        total_notifications = counts['total']
+        sent_notifications = counts['sent']
+        read_notifications = counts['read']
         delivery_rate = (sent_notifications / total_notifications * 100) if total_notifications > 0 else 0
         read_rate = (read_notifications / sent_notifications * 100) if sent_notifications > 0 else 0
         
         # Notifications by type
-        type_stats = Notification.objects.filter(
-            created_at__gte=start_date
-        ).values('notification_type').annotate(
+        type_stats = notifications.values('notification_type').annotate(
             count=Count('id')
         ).order_by('-count')
         
         # Notifications by delivery method
-        method_stats = Notification.objects.filter(
-            created_at__gte=start_date
-        ).values('delivery_method').annotate(
+        method_stats = notifications.values('delivery_method').annotate(
             count=Count('id')
         ).order_by('-count')
         
-        # Daily notification volume
-        daily_stats = []
-        for i in range(days):
-            day = start_date + timedelta(days=i)
-            day_end = day + timedelta(days=1)
-            
-            daily_count = Notification.objects.filter(
-                created_at__gte=day,
-                created_at__lt=day_end
-            ).count()
-            
-            daily_stats.append({
-                'date': day.date(),
-                'count': daily_count
-            })
+        volume = self.get_volume_series(start, end, granularity)
         
         return {
-            'period_days': days,
+            'period_days': (end - start).days,
+            'period_start': start,
+            'period_end': end,
+            'granularity': granularity,
             'total_notifications': total_notifications,
             'sent_notifications': sent_notifications,
-            'failed_notifications': failed_notifications,
+            'failed_notifications': counts['failed'],
             'read_notifications': read_notifications,
             'delivery_rate': round(delivery_rate, 2),
             'read_rate': round(read_rate, 2),
             'type_breakdown': list(type_stats),
             'method_breakdown': list(method_stats),
-            'daily_volume': daily_stats
+            'daily_volume': volume
         }
     
     def get_user_notification_stats(self, user, days: int = 30) -> Dict:
@@ -103,10 +182,11 @@ class NotificationAnalytics:
             created_at__gte=start_date
         )
         
-        total = user_notifications.count()
-        sent = user_notifications.filter(status='sent').count()
-        read = user_notifications.filter(status='read').count()
-        failed = user_notifications.filter(status='failed').count()
+        counts = self._status_counts(user_notifications)
+        total = counts['total']
+        sent = counts['sent']
+        read = counts['read']
+        failed = counts['failed']
         
         # Most common notification types for this user
         type_stats = user_notifications.values('notification_type').annotate(
@@ -164,6 +244,10 @@ class NotificationAnalytics:
     
     def get_escalation_stats(self, days: int = 30) -> Dict:
         """Get escalation notification statistics."""
+        return self._cached(['escalations', days], lambda: self._build_escalation_stats(days))
+    
+    def _build_escalation_stats(self, days: int) -> Dict:
+        """Build escalation statistics with conditional aggregates."""
         start_date = timezone.now() - timedelta(days=days)
         
         escalation_notifications = Notification.objects.filter(
@@ -171,18 +255,16 @@ class NotificationAnalytics:
             created_at__gte=start_date
         )
         
-        total_escalations = escalation_notifications.count()
-        
-        # Escalations by level
-        level_stats = []
-        for level in [1, 2, 3]:
-            count = escalation_notifications.filter(
-                metadata__escalation_level=level
-            ).count()
-            level_stats.append({
-                'level': level,
-                'count': count
-            })
+        # Total and escalations by level in one query
+        levels = [1, 2, 3]
+        counts = escalation_notifications.aggregate(
+            total=Count('id'),
+            **{
+                f'level_{level}': Count('id', filter=Q(metadata__escalation_level=level))
+                for level in levels
+            }
+        )
+        level_stats = [{'level': level, 'count': counts[f'level_{level}']} for level in levels]
         
         # Escalations by request type
         type_stats = escalation_notifications.values(
@@ -193,44 +275,43 @@ class NotificationAnalytics:
         
         return {
             'period_days': days,
-            'total_escalations': total_escalations,
+            'total_escalations': counts['total'],
             'escalation_levels': level_stats,
             'request_types': list(type_stats)
         }
     
     def get_performance_metrics(self) -> Dict:
         """Get notification system performance metrics."""
-        # Average notification processing time (if we had timestamps)
-        # For now, basic metrics
+        recent_cutoff = timezone.now() - timedelta(hours=24)
+        recent = Q(created_at__gte=recent_cutoff)
         
-        pending_count = Notification.objects.filter(status='pending').count()
-        failed_count = Notification.objects.filter(status='failed').count()
-        
-        # Recent failure rate
-        recent_notifications = Notification.objects.filter(
-            created_at__gte=timezone.now() - timedelta(hours=24)
+        counts = Notification.objects.aggregate(
+            pending=Count('id', filter=Q(status='pending')),
+            failed=Count('id', filter=Q(status='failed')),
+            recent_total=Count('id', filter=recent),
+            recent_failed=Count('id', filter=recent & Q(status='failed')),
         )
         
-        recent_total = recent_notifications.count()
-        recent_failed = recent_notifications.filter(status='failed').count()
-        recent_failure_rate = (recent_failed / recent_total * 100) if recent_total > 0 else 0
+        # Recent failure rate
+        recent_total = counts['recent_total']
+        recent_failure_rate = (counts['recent_failed'] / recent_total * 100) if recent_total > 0 else 0
         
         return {
-            'pending_notifications': pending_count,
-            'failed_notifications': failed_count,
+            'pending_notifications': counts['pending'],
+            'failed_notifications': counts['failed'],
             'recent_failure_rate': round(recent_failure_rate, 2),
             'system_health': 'good' if recent_failure_rate < 5 else 'warning' if recent_failure_rate < 15 else 'critical'
         }
     
     def generate_analytics_report(self, days: int = 30) -> Dict:
         """Generate comprehensive analytics report."""
-        return {
+        return self._cached(['report', days], lambda: {
             'generated_at': timezone.now(),
             'notification_stats': self.get_notification_stats(days),
             'preference_stats': self.get_notification_preferences_stats(),
             'escalation_stats': self.get_escalation_stats(days),
             'performance_metrics': self.get_performance_metrics()
-        }
+        })
 
 
 # Global analytics instance
@@ -15,9 +15,11 @@ https://aperature-booking.org/commercial
 """
 
 import logging
+from functools import partial
+from itertools import groupby
 from typing import Dict, List, Optional, Any
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.db.models import Q
@@ -33,6 +35,11 @@ logger = logging.getLogger(__name__)
 class NotificationService:
     """Service for creating and sending notifications."""
     
+    DIGEST_FREQUENCIES = ('daily_digest', 'weekly_digest')
+    
+    # Always delivered immediately, whatever the user's digest preference
+    DIGEST_EXEMPT_TYPES = {'emergency_alert', 'safety_alert', 'evacuation_notice', 'emergency_maintenance'}
+    
     def __init__(self):
         self.default_preferences = {
             'booking_confirmed': {'email': True, 'in_app': True, 'push': True, 'sms': False},
@@ -90,68 +97,98 @@ class NotificationService:
         training_request: Optional[TrainingRequest] = None,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Notification]:
-        """Create notifications based on user preferences."""
+        """
+        Create notifications based on user preferences.
+        
+        Notifications for methods the user receives as a daily or weekly
+        digest are held until ``send_digest_notifications`` runs. In-app,
+        urgent and emergency notifications are never held.
+        """
         notifications = []
         
         # Get user preferences or use defaults
-        preferences = self._get_user_preferences(user, notification_type)
-        
-        for delivery_method, is_enabled in preferences.items():
-            if is_enabled:
-                notification = Notification.objects.create(
-                    user=user,
-                    notification_type=notification_type,
-                    title=title,
-                    message=message,
-                    priority=priority,
-                    delivery_method=delivery_method,
-                    booking=booking,
-                    resource=resource,
-                    maintenance=maintenance,
-                    access_request=access_request,
-                    training_request=training_request,
-                    metadata=metadata or {}
-                )
-                notifications.append(notification)
+        frequencies = self._get_delivery_frequencies(user, notification_type)
+        can_digest = priority != 'urgent' and notification_type not in self.DIGEST_EXEMPT_TYPES
+        
+        for delivery_method, frequency in frequencies.items():
+            if frequency is None:
+                continue
+            
+            digest_frequency = ''
+            if can_digest and delivery_method != 'in_app' and frequency in self.DIGEST_FREQUENCIES:
+                digest_frequency = frequency
+            
+            notification = Notification.objects.create(
+                user=user,
+                notification_type=notification_type,
+                title=title,
+                message=message,
+                priority=priority,
+                delivery_method=delivery_method,
+                digest_frequency=digest_frequency,
+                booking=booking,
+                resource=resource,
+                maintenance=maintenance,
+                access_request=access_request,
+                training_request=training_request,
+                metadata=metadata or {}
+            )
+            notifications.append(notification)
         
         return notifications
     
     def _get_user_preferences(self, user, notification_type: str) -> Dict[str, bool]:
         """Get user notification preferences for a specific type."""
-        preferences = {}
+        return {
+            method: frequency is not None
+            for method, frequency in self._get_delivery_frequencies(user, notification_type).items()
+        }
+    
+    def _get_delivery_frequencies(self, user, notification_type: str) -> Dict[str, Optional[str]]:
+        """Get the delivery frequency for each method, or None where the method is off."""
+        frequencies = {}
         
         # Query user's explicit preferences
         user_prefs = NotificationPreference.objects.filter(
             user=user,
             notification_type=notification_type,
             is_enabled=True
-        )
+        ).values_list('delivery_method', 'frequency')
         
-        for pref in user_prefs:
-            preferences[pref.delivery_method] = True
+        for delivery_method, frequency in user_prefs:
+            frequencies[delivery_method] = frequency or 'immediate'
         
         # Fill in defaults for missing preferences
         defaults = self.default_preferences.get(notification_type, {})
         for method, enabled in defaults.items():
-            if method not in preferences:
-                preferences[method] = enabled
+            if method not in frequencies:
+                frequencies[method] = 'immediate' if enabled else None
         
-        return preferences
+        return frequencies
     
-    def send_pending_notifications(self) -> int:
-        """Send all pending notifications."""
+    def send_pending_notifications(self, limit: Optional[int] = None) -> int:
+        """Send all pending notifications, or the oldest ``limit`` of them."""
         pending_notifications = Notification.objects.filter(
-            Q(status='pending') &
+            Q(status='pending') & Q(digest_frequency='') &
             (Q(next_retry_at__isnull=True) | Q(next_retry_at__lte=timezone.now()))
-        ).select_related('user', 'booking', 'resource', 'maintenance')
+        ).select_related(
+            'user__userprofile', 'booking__resource', 'resource', 'maintenance__resource',
+            'access_request__resource', 'training_request__resource'
+        ).order_by('created_at')
+        if limit:
+            pending_notifications = pending_notifications[:limit]
         
         sent_count = 0
+        email_notifications = []
         
         for notification in pending_notifications:
+            if notification.delivery_method == 'email':
+                # Emails are sent together over a shared connection below
+                email_notifications.append(notification)
+                continue
+            
             try:
-                if notification.delivery_method == 'email':
-                    self._send_email_notification(notification)
-                elif notification.delivery_method == 'sms':
+                if notification.delivery_method == 'sms':
                     self._send_sms_notification(notification)
                 elif notification.delivery_method == 'in_app':
                     # In-app notifications are already "sent" when created
@@ -166,17 +203,192 @@ class NotificationService:
                 logger.error(f"Failed to send notification {notification.id}: {str(e)}")
                 notification.mark_as_failed()
         
+        sent_count += self._send_email_batch(email_notifications)
+        return sent_count
+    
+    def _send_email_batch(self, notifications: List[Notification]) -> int:
+        """Send individual email notifications, looking up templates once for the run."""
+        if not notifications:
+            return 0
+        
+        templates = self._get_email_templates({n.notification_type for n in notifications})
+        return self._send_email_jobs([
+            ([notification], partial(
+                self._build_email_message, notification, templates.get(notification.notification_type)
+            ))
+            for notification in notifications
+        ])
+    
+    def _send_email_jobs(self, jobs) -> int:
+        """
+        Send emails over one reused backend connection per batch.
+        
+        Each job is a ``(notifications, build_message)`` pair, where
+        ``build_message(connection=...)`` returns the email covering those
+        notifications. Messages are sent one at a time so a failure is
+        recorded against its own notifications without affecting the rest
+        of the batch, and each job is marked sent as soon as its email goes
+        out so a worker stopped mid-batch doesn't resend it on the next run.
+        Returns the number of emails sent.
+        """
+        batch_size = getattr(settings, 'NOTIFICATION_EMAIL_BATCH_SIZE', 100)
+        sent_count = 0
+        
+        for start in range(0, len(jobs), batch_size):
+            batch = jobs[start:start + batch_size]
+            connection = get_connection()
+            
+            try:
+                connection.open()
+            except Exception as e:
+                logger.error(f"Failed to open email connection: {str(e)}")
+                for notifications, _ in batch:
+                    for notification in notifications:
+                        notification.mark_as_failed(f"Email connection failed: {str(e)}")
+                continue
+            
+            try:
+                for notifications, build_message in batch:
+                    try:
+                        build_message(connection=connection).send()
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to send notification {', '.join(str(n.id) for n in notifications)}: {str(e)}"
+                        )
+                        for notification in notifications:
+                            notification.mark_as_failed(str(e))
+                        # The SMTP session may be unusable after an error
+                        connection.close()
+                        try:
+                            connection.open()
+                        except Exception:
+                            pass
+                        continue
+                    
+                    self._mark_sent([notification.pk for notification in notifications])
+                    sent_count += 1
+                    logger.info(f"Sent email notification to {notifications[0].user.username}")
+            finally:
+                connection.close()
+        
         return sent_count
     
+    def _mark_sent(self, notification_ids: List[int]):
+        """Mark several notifications as sent in one query."""
+        if notification_ids:
+            now = timezone.now()
+            Notification.objects.filter(pk__in=notification_ids).update(
+                status='sent', sent_at=now, updated_at=now
+            )
+    
+    def send_digest_notifications(self, frequency: str = 'daily_digest') -> int:
+        """
+        Send held notifications as one summary per user and delivery method.
+        
+        Returns the number of digests sent. Notifications in a digest that
+        fails are marked failed and stay held for the next run.
+        """
+        if frequency not in self.DIGEST_FREQUENCIES:
+            raise ValueError(f"Unknown digest frequency: {frequency}")
+        
+        held = Notification.objects.filter(
+            status='pending',
+            digest_frequency=frequency
+        ).select_related('user').order_by('user_id', 'delivery_method', 'created_at')
+        
+        sent_count = 0
+        email_jobs = []
+        
+        for (_, delivery_method), group in groupby(held.iterator(), key=lambda n: (n.user_id, n.delivery_method)):
+            notifications = list(group)
+            
+            if delivery_method == 'email':
+                email_jobs.append((notifications, partial(self._build_digest_email, notifications, frequency)))
+                continue
+            
+            try:
+                self._send_digest_summary(delivery_method, notifications, frequency)
+                self._mark_sent([notification.pk for notification in notifications])
+                sent_count += 1
+            except Exception as e:
+                logger.error(f"Failed to send {frequency} to {notifications[0].user.username}: {str(e)}")
+                for notification in notifications:
+                    notification.mark_as_failed(str(e))
+        
+        sent_count += self._send_email_jobs(email_jobs)
+        return sent_count
+    
+    def _get_digest_context(self, notifications: List[Notification], frequency: str) -> Dict[str, Any]:
+        """Build context shared by digest emails and summaries."""
+        return {
+            'user': notifications[0].user,
+            'notifications': notifications,
+            'count': len(notifications),
+            'period': 'daily' if frequency == 'daily_digest' else 'weekly',
+            'site_name': getattr(settings, 'SITE_NAME', 'Aperature Booking'),
+            'site_url': getattr(settings, 'SITE_URL', 'http://localhost:8000'),
+        }
+    
+    def _build_digest_email(self, notifications: List[Notification], frequency: str,
+                            connection=None) -> EmailMultiAlternatives:
+        """Build a single summary email for a user's held notifications."""
+        context = self._get_digest_context(notifications, frequency)
+        subject = (
+            f"Your {context['period']} digest: {context['count']} "
+            f"notification{'s' if context['count'] != 1 else ''}"
+        )
+        
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=render_to_string('booking/emails/notification_digest.txt', context),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[notifications[0].user.email],
+            connection=connection
+        )
+        email.attach_alternative(
+            render_to_string('booking/emails/notification_digest.html', context), "text/html"
+        )
+        return email
+    
+    def _send_digest_summary(self, delivery_method: str, notifications: List[Notification], frequency: str):
+        """Send a short SMS or push summary of held notifications, raising on failure."""
+        context = self._get_digest_context(notifications, frequency)
+        user = context['user']
+        title = f"{context['period'].capitalize()} digest"
+        titles = [notification.title for notification in notifications[:3]]
+        if len(notifications) > len(titles):
+            titles.append(f"and {len(notifications) - len(titles)} more")
+        message = f"{context['count']} notifications: " + '; '.join(titles)
+        
+        if delivery_method == 'sms':
+            from .sms_service import sms_service
+            phone_number = sms_service.get_user_phone_number(user)
+            if not phone_number:
+                raise ValueError("No phone number available")
+            if not sms_service.send_sms(phone_number, f"{title}: {message}"):
+                raise RuntimeError("SMS delivery failed")
+        elif delivery_method == 'push':
+            from .push_service import push_service
+            if not push_service.send_to_user(user=user, title=title, message=message):
+                raise RuntimeError("No active push subscriptions")
+    
     def _send_email_notification(self, notification: Notification):
         """Send email notification."""
-        # Get email template
         template = self._get_email_template(notification.notification_type)
-        
+        self._build_email_message(notification, template).send()
+        notification.mark_as_sent()
+    
+    def _build_email_message(self, notification: Notification, template: Optional[EmailTemplate],
+                             connection=None) -> EmailMultiAlternatives:
+        """Build the email for a notification, falling back to a basic email without a template."""
         if not template:
-            # Fallback to basic email
-            self._send_basic_email(notification)
-            return
+            return EmailMultiAlternatives(
+                subject=notification.title,
+                body=notification.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[notification.user.email],
+                connection=connection
+            )
         
         # Build context for template
         context = self._build_email_context(notification)
@@ -186,31 +398,15 @@ class NotificationService:
         html_content = template.render_html(context)
         text_content = template.render_text(context)
         
-        # Send email
         email = EmailMultiAlternatives(
             subject=subject,
             body=text_content,
             from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[notification.user.email]
+            to=[notification.user.email],
+            connection=connection
         )
         email.attach_alternative(html_content, "text/html")
-        email.send()
-        
-        notification.mark_as_sent()
-    
-    def _send_basic_email(self, notification: Notification):
-        """Send basic email without template."""
-        from django.core.mail import send_mail
-        
-        send_mail(
-            subject=notification.title,
-            message=notification.message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[notification.user.email],
-            fail_silently=False
-        )
-        
-        notification.mark_as_sent()
+        return email
     
     def _send_sms_notification(self, notification: Notification):
         """Send SMS notification using Twilio service."""
@@ -269,6 +465,20 @@ class NotificationService:
         except Exception:
             return None
     
+    def _get_email_templates(self, notification_types) -> Dict[str, EmailTemplate]:
+        """Get active email templates for several notification types in one query."""
+        templates = {}
+        try:
+            # Lowest pk wins, matching _get_email_template
+            for template in EmailTemplate.objects.filter(
+                notification_type__in=notification_types,
+                is_active=True
+            ).order_by('-pk'):
+                templates[template.notification_type] = template
+        except Exception:
+            pass
+        return templates
+    
     def _build_email_context(self, notification: Notification) -> Dict[str, Any]:
         """Build context variables for email template rendering."""
         context = {
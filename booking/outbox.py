@@ -0,0 +1,205 @@
+# booking/outbox.py
+"""
+Transactional outbox for deferred side effects.
+
+Signal handlers record an OutboxEvent in the same transaction as the change
+that caused it. The event is dispatched in-process once that transaction
+commits; the scheduler or the ``dispatch_outbox`` management command picks
+up anything left pending, such as retries after a failed handler.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import logging
+from datetime import timedelta
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Handlers by event type; each takes the event payload
+OUTBOX_HANDLERS: Dict[str, Callable[[dict], None]] = {}
+
+
+def register_handler(event_type: str):
+    """Register the handler that dispatches an outbox event type."""
+    def decorator(func):
+        OUTBOX_HANDLERS[event_type] = func
+        return func
+    return decorator
+
+
+def record_event(event_type: str, **payload) -> OutboxEvent:
+    """
+    Record an event to be dispatched once the current transaction commits.
+
+    Unless OUTBOX_DISPATCH_ON_COMMIT is False, the event is also dispatched
+    straight after commit, so notifications don't depend on a dispatcher
+    process running. If that attempt fails, the event stays pending for
+    dispatch_pending_events to retry.
+    """
+    event = OutboxEvent.objects.create(event_type=event_type, payload=payload)
+    if getattr(settings, 'OUTBOX_DISPATCH_ON_COMMIT', True):
+        transaction.on_commit(lambda: _dispatch_after_commit(event.pk))
+    return event
+
+
+def _dispatch_after_commit(event_id: int):
+    """Dispatch a just-committed event without failing the request that recorded it."""
+    try:
+        _dispatch_event(event_id)
+    except Exception as e:
+        logger.error(f"Outbox event {event_id} could not be dispatched after commit: {e}")
+
+
+def dispatch_pending_events(limit: int = None) -> Dict[str, int]:
+    """
+    Dispatch pending outbox events in the order they were recorded.
+
+    Each event is claimed and handled in its own transaction, so concurrent
+    dispatchers skip rows another one holds. A failing handler is retried
+    with exponential backoff until OUTBOX_MAX_ATTEMPTS is reached.
+    """
+    limit = limit or getattr(settings, 'OUTBOX_BATCH_SIZE', 500)
+    event_ids = list(
+        OutboxEvent.objects.filter(
+            status='pending',
+            available_at__lte=timezone.now()
+        ).order_by('id').values_list('id', flat=True)[:limit]
+    )
+
+    results = {'dispatched': 0, 'retried': 0, 'failed': 0}
+    for event_id in event_ids:
+        outcome = _dispatch_event(event_id)
+        if outcome:
+            results[outcome] += 1
+
+    return results
+
+
+def _dispatch_event(event_id: int):
+    """Claim and dispatch a single event, returning its outcome."""
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+    with transaction.atomic():
+        event = OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+            pk=event_id, status='pending'
+        ).first()
+        if event is None:
+            return None
+
+        handler = OUTBOX_HANDLERS.get(event.event_type)
+        event.attempts += 1
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler for {event.event_type}")
+            # Savepoint so a failing handler doesn't break the claim transaction
+            with transaction.atomic():
+                handler(event.payload)
+        except Exception as e:
+            logger.error(f"Outbox event {event.id} ({event.event_type}) failed: {e}")
+            event.last_error = str(e)
+            if event.attempts >= max_attempts:
+                event.status = 'failed'
+                outcome = 'failed'
+            else:
+                # Exponential backoff: 1, 2, 4, 8 minutes
+                event.available_at = timezone.now() + timedelta(minutes=2 ** (event.attempts - 1))
+                outcome = 'retried'
+        else:
+            event.status = 'dispatched'
+            event.dispatched_at = timezone.now()
+            event.last_error = ''
+            outcome = 'dispatched'
+
+        event.save(update_fields=['status', 'attempts', 'last_error', 'available_at', 'dispatched_at'])
+        return outcome
+
+
+def purge_dispatched_events(days: int = None) -> int:
+    """Delete dispatched events older than OUTBOX_RETENTION_DAYS."""
+    days = days if days is not None else getattr(settings, 'OUTBOX_RETENTION_DAYS', 7)
+    deleted_count, _ = OutboxEvent.objects.filter(
+        status='dispatched',
+        dispatched_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted_count
+
+
+@register_handler('booking_created')
+def handle_booking_created(payload):
+    """Send booking creation notifications."""
+    from .models import Booking
+    from .notifications import booking_notifications
+
+    booking = Booking.objects.select_related('user', 'resource').filter(pk=payload['booking_id']).first()
+    if booking:
+        booking_notifications.booking_created(booking)
+
+
+@register_handler('bookings_created')
+def handle_bookings_created(payload):
+    """Send creation notifications for bookings created in bulk."""
+    from .models import Booking
+    from .notifications import booking_notifications
+
+    for booking in Booking.objects.select_related('user', 'resource').filter(pk__in=payload['booking_ids']):
+        booking_notifications.booking_created(booking)
+
+
+@register_handler('booking_status_changed')
+def handle_booking_status_changed(payload):
+    """Send notifications for a booking's new status."""
+    from .models import Booking
+    from .notifications import booking_notifications
+
+    booking = Booking.objects.select_related('user', 'resource').filter(pk=payload['booking_id']).first()
+    if not booking:
+        return
+
+    if payload['new_status'] == 'confirmed':
+        booking_notifications.booking_confirmed(booking)
+    elif payload['new_status'] == 'cancelled':
+        # Note: We'd need to track who cancelled it for proper notification
+        booking_notifications.booking_cancelled(booking, booking.user)
+
+
+@register_handler('maintenance_scheduled')
+def handle_maintenance_scheduled(payload):
+    """Send maintenance scheduled notifications."""
+    from .models import Maintenance
+    from .notifications import maintenance_notifications
+
+    maintenance = Maintenance.objects.select_related('resource').filter(pk=payload['maintenance_id']).first()
+    if maintenance:
+        maintenance_notifications.maintenance_scheduled(maintenance)
+
+
+@register_handler('bookings_marked_no_show')
+def handle_bookings_marked_no_show(payload):
+    """Notify owners of bookings marked as no-show in bulk."""
+    from .checkin_service import checkin_service
+
+    checkin_service.notify_no_shows(payload['booking_ids'])
+
+
+@register_handler('bookings_auto_checked_out')
+def handle_bookings_auto_checked_out(payload):
+    """Notify owners of bookings checked out automatically in bulk."""
+    from .checkin_service import checkin_service
+
+    checkin_service.notify_auto_checkouts(payload['booking_ids'])
@@ -0,0 +1,83 @@
+# booking/pagination.py
+"""
+REST API pagination for Aperature Booking.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a unique, indexed key.
+
+    Each page filters past the last key seen instead of using OFFSET and runs
+    no COUNT, so deep pages cost the same as the first. Views choose the key
+    with ``cursor_ordering`` (default newest first by primary key).
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'API_CURSOR_MAX_PAGE_SIZE', 200)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination, with keyset pagination for clients that opt in.
+
+    Clients request keyset mode with ``?pagination=cursor`` and then follow
+    the ``next``/``previous`` links, which carry a ``cursor`` parameter.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.keyset_paginator = None
+
+    def wants_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_keyset(request):
+            self.keyset_paginator = self.keyset_class()
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': "Set to 'cursor' for keyset pagination.",
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+        ] + self.keyset_class().get_schema_operation_parameters(view)
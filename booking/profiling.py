@@ -0,0 +1,231 @@
+# booking/profiling.py
+"""
+Per-request profiling for Aperature Booking.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import logging
+import math
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import Template as DjangoTemplate
+from django.utils import timezone
+
+logger = logging.getLogger('booking.performance')
+
+VIEWS_INDEX_KEY = 'request_profile:views'
+VIEW_SAMPLES_KEY = 'request_profile:view:{}'
+SLOW_REQUESTS_KEY = 'request_profile:slow'
+MAX_SLOW_REQUESTS = 50
+# Stats shown on the performance page, and the sample fields they summarise
+SAMPLE_FIELDS = ('wall_ms', 'queries', 'db_ms', 'template_ms')
+
+# The profile of the request being handled in this thread or task
+_current_profile = ContextVar('request_profile', default=None)
+_template_timer_installed = False
+
+
+def get_profile_cache():
+    """Return the cache holding samples, REQUEST_PROFILING_CACHE (default 'default')."""
+    return caches[getattr(settings, 'REQUEST_PROFILING_CACHE', 'default')]
+
+
+def get_slow_request_ms():
+    """Return the wall time above which requests are logged as slow."""
+    return getattr(settings, 'REQUEST_PROFILING_SLOW_MS', 1000)
+
+
+def get_slow_request_queries():
+    """Return the query count above which requests are logged as slow."""
+    return getattr(settings, 'REQUEST_PROFILING_SLOW_QUERIES', 100)
+
+
+class RequestProfile:
+    """Database and template time collected while one request is handled."""
+    
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        # {sql: [count, seconds]}, to summarise slow requests
+        self.queries = {}
+    
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper that times each query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.query_count += 1
+            self.db_time += duration
+            entry = self.queries.setdefault(sql, [0, 0.0])
+            entry[0] += 1
+            entry[1] += duration
+    
+    def top_queries(self, limit=5):
+        """Return the statements that took longest in total, with how often they ran."""
+        ranked = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'sql': sql[:500], 'count': count, 'time_ms': round(seconds * 1000, 1)}
+            for sql, (count, seconds) in ranked[:limit]
+        ]
+
+
+@contextmanager
+def profile_request():
+    """Profile database queries and template rendering inside the block."""
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile.execute_wrapper))
+            yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def install_template_timer():
+    """
+    Time template rendering for profiled requests.
+
+    Django has no hook for render timing outside tests, so the Django template
+    backend's render() is wrapped once. Only the outermost render of a request
+    is timed, so included and nested templates aren't counted twice.
+    """
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+    
+    original_render = DjangoTemplate.render
+    
+    @wraps(original_render)
+    def render(self, context=None, request=None):
+        profile = _current_profile.get()
+        if profile is None or profile.rendering:
+            return original_render(self, context, request)
+        profile.rendering = True
+        started = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            profile.template_time += time.perf_counter() - started
+            profile.rendering = False
+    
+    DjangoTemplate.render = render
+    _template_timer_installed = True
+
+
+def record_request(request, profile, wall_time):
+    """Add a request's timings to its view's rolling window and log it if slow."""
+    match = getattr(request, 'resolver_match', None)
+    view_name = (match.view_name if match else None) or 'unresolved'
+    sample = (
+        round(wall_time * 1000, 1),
+        profile.query_count,
+        round(profile.db_time * 1000, 1),
+        round(profile.template_time * 1000, 1),
+    )
+    
+    cache = get_profile_cache()
+    timeout = getattr(settings, 'REQUEST_PROFILING_TTL', 24 * 60 * 60)
+    window = getattr(settings, 'REQUEST_PROFILING_WINDOW', 200)
+    key = VIEW_SAMPLES_KEY.format(view_name)
+    # Samples from concurrent workers can occasionally overwrite each other;
+    # that's acceptable for a rolling window
+    samples = cache.get(key, [])
+    samples.append(sample)
+    cache.set(key, samples[-window:], timeout)
+    views = cache.get(VIEWS_INDEX_KEY, set())
+    if view_name not in views:
+        views.add(view_name)
+        cache.set(VIEWS_INDEX_KEY, views, timeout)
+    
+    wall_ms, query_count, db_ms, template_ms = sample
+    if wall_ms < get_slow_request_ms() and query_count < get_slow_request_queries():
+        return
+    
+    top_queries = profile.top_queries()
+    logger.warning(
+        f"Slow request {request.method} {request.path} ({view_name}): {wall_ms:.0f} ms, "
+        f"{query_count} queries in {db_ms:.0f} ms, templates {template_ms:.0f} ms\n" +
+        "\n".join(f"  {q['count']}x {q['time_ms']} ms: {q['sql']}" for q in top_queries)
+    )
+    slow_requests = cache.get(SLOW_REQUESTS_KEY, [])
+    slow_requests.insert(0, {
+        'recorded_at': timezone.now().isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'view_name': view_name,
+        'wall_ms': wall_ms,
+        'queries': query_count,
+        'db_ms': db_ms,
+        'template_ms': template_ms,
+        'top_queries': top_queries,
+    })
+    cache.set(SLOW_REQUESTS_KEY, slow_requests[:MAX_SLOW_REQUESTS], timeout)
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a non-empty list of numbers."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def get_view_stats(order_by='p95_ms'):
+    """Return per-view request counts, wall time percentiles and averages, worst first."""
+    cache = get_profile_cache()
+    views = sorted(cache.get(VIEWS_INDEX_KEY, set()))
+    samples_by_key = cache.get_many([VIEW_SAMPLES_KEY.format(view_name) for view_name in views])
+    
+    stats = []
+    for view_name in views:
+        samples = samples_by_key.get(VIEW_SAMPLES_KEY.format(view_name))
+        if not samples:
+            continue
+        columns = dict(zip(SAMPLE_FIELDS, zip(*samples)))
+        stats.append({
+            'view_name': view_name,
+            'count': len(samples),
+            'p50_ms': percentile(columns['wall_ms'], 50),
+            'p95_ms': percentile(columns['wall_ms'], 95),
+            'p99_ms': percentile(columns['wall_ms'], 99),
+            'max_ms': max(columns['wall_ms']),
+            'avg_queries': round(sum(columns['queries']) / len(samples), 1),
+            'max_queries': max(columns['queries']),
+            'avg_db_ms': round(sum(columns['db_ms']) / len(samples), 1),
+            'avg_template_ms': round(sum(columns['template_ms']) / len(samples), 1),
+        })
+    return sorted(stats, key=lambda row: row[order_by], reverse=True)
+
+
+def get_slow_requests():
+    """Return the most recent slow requests, newest first."""
+    return get_profile_cache().get(SLOW_REQUESTS_KEY, [])
+
+
+def clear_profiles():
+    """Forget all recorded samples and slow requests."""
+    cache = get_profile_cache()
+    views = cache.get(VIEWS_INDEX_KEY, set())
+    cache.delete_many(
+        [VIEW_SAMPLES_KEY.format(view_name) for view_name in views] + [VIEWS_INDEX_KEY, SLOW_REQUESTS_KEY]
+    )
@@ -63,6 +63,88 @@ def cleanup_old_job_executions(max_age_days=7):
         logger.error(f"Error cleaning up job executions: {e}")
 
 
+def generate_approval_statistics():
+    """Refresh the current period's approval statistics for the dashboard."""
+    try:
+        from datetime import timedelta
+        from .models import ApprovalStatistics
+        
+        for period_type in ('weekly', 'monthly'):
+            today = timezone.localdate()
+            if period_type == 'weekly':
+                period_start = today - timedelta(days=today.weekday())
+            else:
+                period_start = today.replace(day=1)
+            written = ApprovalStatistics.generate_statistics_batch(period_type, period_start)
+            logger.info(f"Generated {written} {period_type} approval statistics rows")
+            
+    except Exception as e:
+        logger.error(f"Error generating approval statistics: {e}")
+
+
+def send_notification_digests(frequency='daily_digest'):
+    """Send held notifications as one digest per user and delivery method."""
+    try:
+        from .notifications import notification_service
+        
+        sent = notification_service.send_digest_notifications(frequency)
+        logger.info(f"Sent {sent} {frequency} notifications")
+        
+    except Exception as e:
+        logger.error(f"Error sending {frequency} notifications: {e}")
+
+
+def dispatch_outbox_events():
+    """Dispatch side effects recorded by committed booking and maintenance changes."""
+    try:
+        from .outbox import dispatch_pending_events, purge_dispatched_events
+        
+        results = dispatch_pending_events()
+        if any(results.values()):
+            logger.info(f"Outbox dispatch: {results}")
+        purge_dispatched_events()
+        
+    except Exception as e:
+        logger.error(f"Error dispatching outbox events: {e}")
+
+
+def process_calendar_sync_queue():
+    """Push queued booking changes to Google Calendar."""
+    try:
+        from .services.google_calendar import process_sync_queue
+        
+        results = process_sync_queue()
+        if results['integrations']:
+            logger.info(f"Calendar sync queue: {results}")
+        
+    except Exception as e:
+        logger.error(f"Error processing calendar sync queue: {e}")
+
+
+def process_user_imports():
+    """Run CSV user imports uploaded from the lab admin pages."""
+    try:
+        from .user_import import process_import_jobs
+        
+        results = process_import_jobs()
+        if any(results.values()):
+            logger.info(f"User imports: {results}")
+        
+    except Exception as e:
+        logger.error(f"Error processing user imports: {e}")
+
+
+def sample_system_health():
+    """Record the latest system resource and database latency readings."""
+    try:
+        from .health import record_system_sample
+        
+        record_system_sample()
+        
+    except Exception as e:
+        logger.error(f"Error sampling system health: {e}")
+
+
 def run_specific_schedule(schedule_id):
     """Run a specific backup schedule."""
     try:
@@ -124,6 +206,85 @@ class BackupScheduler:
                 replace_existing=True
             )
             
+            # Drain the outbox of notifications from committed changes
+            self.scheduler.add_job(
+                dispatch_outbox_events,
+                'interval',
+                seconds=getattr(settings, 'OUTBOX_DISPATCH_INTERVAL', 30),
+                id='outbox_dispatcher',
+                max_instances=1,
+                replace_existing=True,
+                misfire_grace_time=60
+            )
+            
+            # Sample system health so health checks never block on psutil
+            self.scheduler.add_job(
+                sample_system_health,
+                'interval',
+                seconds=getattr(settings, 'HEALTH_SAMPLE_INTERVAL', 15),
+                id='health_sampler',
+                max_instances=1,
+                replace_existing=True,
+                misfire_grace_time=30
+            )
+            
+            # Push booking changes to connected Google Calendars
+            self.scheduler.add_job(
+                process_calendar_sync_queue,
+                'interval',
+                seconds=getattr(settings, 'GOOGLE_CALENDAR_SYNC_INTERVAL', 60),
+                id='calendar_sync_queue',
+                max_instances=1,
+                replace_existing=True,
+                misfire_grace_time=60
+            )
+            
+            # Import uploaded user CSV files outside the request
+            self.scheduler.add_job(
+                process_user_imports,
+                'interval',
+                seconds=getattr(settings, 'USER_IMPORT_POLL_INTERVAL', 10),
+                id='user_imports',
+                max_instances=1,
+                replace_existing=True,
+                misfire_grace_time=60
+            )
+            
+            # Refresh approval statistics nightly
+            self.scheduler.add_job(
+                generate_approval_statistics,
+                'cron',
+                hour=1,
+                minute=15,
+                id='approval_statistics',
+                max_instances=1,
+                replace_existing=True
+            )
+            
+            # Send notification digests at the configured hour; weekly on Mondays
+            digest_hour = getattr(settings, 'NOTIFICATION_DIGEST_HOUR', 7)
+            self.scheduler.add_job(
+                send_notification_digests,
+                'cron',
+                hour=digest_hour,
+                minute=0,
+                args=['daily_digest'],
+                id='daily_digest',
+                max_instances=1,
+                replace_existing=True
+            )
+            self.scheduler.add_job(
+                send_notification_digests,
+                'cron',
+                day_of_week='mon',
+                hour=digest_hour,
+                minute=0,
+                args=['weekly_digest'],
+                id='weekly_digest',
+                max_instances=1,
+                replace_existing=True
+            )
+            
             self.scheduler.start()
             self.started = True
             logger.info("Backup scheduler started successfully")
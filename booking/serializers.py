@@ -14,8 +14,9 @@ For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
 https://aperature-booking.org/commercial
 """
 
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 from django.contrib.auth.models import User
+from django.db.models import Exists, OuterRef
 from .models import (
     UserProfile, Resource, Booking, BookingAttendee, ApprovalRule, Maintenance, 
     WaitingListEntry, ResourceResponsible, RiskAssessment, UserRiskAssessment,
@@ -23,7 +24,103 @@ from .models import (
 )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Let read requests choose fields with ``?fields=`` and nested objects with ``?expand=``.
+
+    Both take comma-separated field names. A dotted name in ``fields`` such as
+    ``resource.name`` picks fields of a nested object and expands it. Once
+    either parameter is given, relations in ``expandable_fields`` that aren't
+    expanded are returned as primary keys. Fields that aren't returned are
+    removed before serialization, so their method fields never run.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    expandable_fields = ()
+    # Model columns read by each field, where they differ from the field name
+    field_columns = {}
+    # Relations to prefetch whenever a field is returned
+    field_prefetch_related = {}
+    # Relations to select or prefetch when an expandable field is expanded
+    expanded_select_related = {}
+    expanded_prefetch_related = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = self.get_requested_fields(self.context.get('request'))
+        if fields is not None or expand is not None:
+            self.restrict_fields(fields, expand)
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Return the (fields, expand) sets a read request asks for, or None for each one not given."""
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None, None
+        params = getattr(request, 'query_params', request.GET)
+        return tuple(
+            {name.strip() for name in params[param].split(',') if name.strip()} if param in params else None
+            for param in (cls.fields_query_param, cls.expand_query_param)
+        )
+
+    @staticmethod
+    def _split_nested(fields, expand):
+        """Split dotted names into top-level names and the nested names under each."""
+        expand = set(expand or ())
+        top_level, nested = set(), {}
+        for name in fields or ():
+            name, _, nested_name = name.partition('.')
+            top_level.add(name)
+            if nested_name:
+                nested.setdefault(name, set()).add(nested_name)
+                expand.add(name)
+        return top_level, nested, expand
+
+    def restrict_fields(self, fields=None, expand=None):
+        """Drop fields that weren't requested and collapse relations that weren't expanded."""
+        top_level, nested, expand = self._split_nested(fields, expand)
+        if fields is not None:
+            for name in set(self.fields) - top_level:
+                self.fields.pop(name)
+
+        for name in self.expandable_fields:
+            field = self.fields.get(name)
+            if field is None:
+                continue
+            if name not in expand:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    source=None if field.source == name else field.source,
+                    many=isinstance(field, serializers.ListSerializer),
+                    read_only=True
+                )
+            elif name in nested:
+                serializer = getattr(field, 'child', field)
+                if isinstance(serializer, SparseFieldsMixin):
+                    serializer.restrict_fields(nested[name])
+
+    @classmethod
+    def select_for_fields(cls, queryset, fields=None, expand=None):
+        """Narrow ``queryset`` to the columns and relations the requested fields read."""
+        top_level, nested, expand = cls._split_nested(fields, expand)
+        if fields is None:
+            top_level = set(cls.Meta.fields)
+
+        columns, select_related, prefetch_related = set(), set(), set()
+        for name in top_level:
+            columns.update(cls.field_columns.get(name, [name]))
+            prefetch_related.update(cls.field_prefetch_related.get(name, ()))
+            if name in cls.expandable_fields and name in expand:
+                select_related.update(cls.expanded_select_related.get(name, ()))
+                prefetch_related.update(cls.expanded_prefetch_related.get(name, ()))
+
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        queryset = queryset.only(*sorted((columns & concrete) | select_related))
+        if select_related:
+            # select_related() with no arguments would follow every foreign key
+            queryset = queryset.select_related(*sorted(select_related))
+        return queryset.prefetch_related(*sorted(prefetch_related))
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
@@ -44,9 +141,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class ResourceSerializer(serializers.ModelSerializer):
+class ResourceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     available_for_user = serializers.SerializerMethodField()
     
+    field_columns = {
+        'available_for_user': ['is_active', 'requires_induction', 'required_training_level'],
+    }
+    
     class Meta:
         model = Resource
         fields = [
@@ -78,7 +179,7 @@ class BookingAttendeeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'added_at']
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     resource = ResourceSerializer(read_only=True)
     resource_id = serializers.IntegerField(write_only=True)
@@ -90,6 +191,25 @@ class BookingSerializer(serializers.ModelSerializer):
     dependency_status = serializers.SerializerMethodField()
     prerequisite_bookings = serializers.PrimaryKeyRelatedField(queryset=Booking.objects.all(), many=True, required=False)
     
+    expandable_fields = ('resource', 'user', 'attendees')
+    field_columns = {
+        'resource_id': [],
+        'attendees': [],
+        'duration_hours': ['start_time', 'end_time'],
+        'can_cancel': ['status', 'start_time'],
+        'has_conflicts': ['resource', 'start_time', 'end_time'],
+        'can_start': ['dependency_type', 'dependency_conditions'],
+        'dependency_status': ['dependency_type', 'dependency_conditions'],
+    }
+    field_prefetch_related = {
+        'attendees': ['bookingattendee_set'],
+        'prerequisite_bookings': ['prerequisite_bookings'],
+        'can_start': ['prerequisite_bookings'],
+        'dependency_status': ['prerequisite_bookings'],
+    }
+    expanded_select_related = {'resource': ['resource'], 'user': ['user']}
+    expanded_prefetch_related = {'attendees': ['bookingattendee_set__user']}
+    
     class Meta:
         model = Booking
         fields = [
@@ -106,6 +226,32 @@ class BookingSerializer(serializers.ModelSerializer):
             'approved_by', 'approved_at'
         ]
     
+    @staticmethod
+    def annotate_conflicts(queryset):
+        """Annotate ``conflict_exists`` so has_conflicts isn't a query per booking."""
+        conflicts = Booking.objects.filter(
+            resource_id=OuterRef('resource_id'),
+            status__in=['approved', 'pending'],
+            start_time__lt=OuterRef('end_time'),
+            end_time__gt=OuterRef('start_time')
+        ).exclude(pk=OuterRef('pk'))
+        return queryset.annotate(conflict_exists=Exists(conflicts))
+    
+    @classmethod
+    def select_for_all_fields(cls, queryset):
+        """Fetch everything the full representation reads, with nested objects expanded."""
+        queryset = queryset.select_related('resource', 'user', 'approved_by').prefetch_related(
+            'bookingattendee_set__user', 'prerequisite_bookings'
+        )
+        return cls.annotate_conflicts(queryset)
+    
+    @classmethod
+    def select_for_fields(cls, queryset, fields=None, expand=None):
+        queryset = super().select_for_fields(queryset, fields, expand)
+        if fields is None or 'has_conflicts' in fields:
+            queryset = cls.annotate_conflicts(queryset)
+        return queryset
+    
     def get_duration_hours(self, obj):
         """Calculate booking duration in hours."""
         return obj.duration.total_seconds() / 3600
@@ -116,6 +262,8 @@ class BookingSerializer(serializers.ModelSerializer):
     
     def get_has_conflicts(self, obj):
         """Check if booking has conflicts."""
+        if hasattr(obj, 'conflict_exists'):
+            return obj.conflict_exists
         return obj.has_conflicts()
     
     def get_can_start(self, obj):
@@ -224,6 +372,24 @@ class BookingSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class BulkBookingItemSerializer(serializers.ModelSerializer):
+    """One booking in a bulk create request; checks needing the database run per batch."""
+    resource_id = serializers.IntegerField()
+    
+    class Meta:
+        model = Booking
+        fields = [
+            'resource_id', 'title', 'description', 'start_time', 'end_time',
+            'shared_with_group', 'notes'
+        ]
+    
+    def validate(self, data):
+        """Validate time order."""
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError("End time must be after start time.")
+        return data
+
+
 class ApprovalRuleSerializer(serializers.ModelSerializer):
     resource = ResourceSerializer(read_only=True)
     approvers = UserSerializer(many=True, read_only=True)
@@ -16,6 +16,9 @@ https://aperature-booking.org/commercial
 
 import os
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import json
@@ -24,6 +27,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, Min, Q
 from django.urls import reverse
 
 try:
@@ -36,10 +40,23 @@ try:
 except ImportError:
     GOOGLE_LIBRARIES_AVAILABLE = False
 
-from ..models import GoogleCalendarIntegration, GoogleCalendarSyncLog, CalendarSyncPreferences, Booking
+from ..models import (
+    GoogleCalendarIntegration, GoogleCalendarSyncLog, CalendarSyncPreferences, CalendarSyncQueueItem, Booking
+)
 
 logger = logging.getLogger(__name__)
 
+# Booking statuses that have an event in Google Calendar
+SYNC_STATUSES = ('pending', 'approved')
+# Booking statuses whose event is removed from Google Calendar
+REMOVED_STATUSES = ('cancelled', 'rejected')
+# How long queued changes wait before background sync, by CalendarSyncPreferences.auto_sync_timing
+SYNC_TIMING_DELAYS = {
+    'immediate': timedelta(0),
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
 
 class GoogleCalendarService:
     """Service for Google Calendar OAuth integration and synchronization."""
@@ -250,6 +267,24 @@ class GoogleCalendarService:
         
         return build('calendar', 'v3', credentials=credentials)
     
+    def get_batch_client(self, integration: GoogleCalendarIntegration) -> 'GoogleCalendarClient':
+        """Get a batch client for the integration, refreshing its token first."""
+        if integration.needs_refresh():
+            if not self.refresh_access_token(integration):
+                raise ValueError("Unable to refresh access token")
+        
+        credentials = Credentials(
+            token=integration.access_token,
+            refresh_token=integration.refresh_token,
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=self.client_id,
+            client_secret=self.client_secret
+        )
+        
+        return GoogleCalendarClient(
+            lambda: build('calendar', 'v3', credentials=credentials, cache_discovery=False)
+        )
+    
     def create_calendar_event(self, integration: GoogleCalendarIntegration, booking: Booking) -> Optional[str]:
         """Create a Google Calendar event for a booking."""
         try:
@@ -441,61 +476,7 @@ class GoogleCalendarService:
     
     def _build_event_data(self, booking: Booking, preferences: CalendarSyncPreferences = None) -> dict:
         """Build Google Calendar event data from booking."""
-        # Build title
-        title_parts = []
-        if preferences and preferences.event_prefix:
-            title_parts.append(preferences.event_prefix.strip())
-        
-        title_parts.append(booking.title)
-        
-        if preferences and preferences.include_resource_in_title:
-            title_parts.append(f"({booking.resource.name})")
-        
-        title = " ".join(title_parts)
-        
-        # Build description
-        description_parts = []
-        if preferences and preferences.include_description and booking.description:
-            description_parts.append(booking.description)
-        
-        description_parts.extend([
-            f"\nResource: {booking.resource.name}",
-            f"Booked by: {booking.user.get_full_name() or booking.user.username}",
-            f"Status: {booking.get_status_display()}",
-            f"\nManaged by Aperature Booking System"
-        ])
-        
-        description = "\n".join(description_parts)
-        
-        # Build location
-        location = ""
-        if preferences and preferences.set_event_location:
-            location = getattr(booking.resource, 'location', '') or booking.resource.name
-        
-        # Convert datetime to RFC3339 format
-        start_time = booking.start_time.isoformat()
-        end_time = booking.end_time.isoformat()
-        
-        return {
-            'summary': title,
-            'description': description,
-            'location': location,
-            'start': {
-                'dateTime': start_time,
-                'timeZone': str(booking.start_time.tzinfo) or 'UTC',
-            },
-            'end': {
-                'dateTime': end_time,
-                'timeZone': str(booking.end_time.tzinfo) or 'UTC',
-            },
-            'reminders': {
-                'useDefault': True,
-            },
-            'source': {
-                'title': 'Aperature Booking',
-                'url': f"{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/booking/{booking.id}/"
-            }
-        }
+        return build_event_data(booking, preferences)
     
     def disconnect_integration(self, user: User) -> bool:
         """Disconnect Google Calendar integration for a user."""
@@ -528,5 +509,529 @@ class GoogleCalendarService:
             return False
 
 
+def build_event_data(booking: Booking, preferences: CalendarSyncPreferences = None) -> dict:
+    """Build Google Calendar event data from booking."""
+    # Build title
+    title_parts = []
+    if preferences and preferences.event_prefix:
+        title_parts.append(preferences.event_prefix.strip())
+
+    title_parts.append(booking.title)
+
+    if preferences and preferences.include_resource_in_title:
+        title_parts.append(f"({booking.resource.name})")
+
+    title = " ".join(title_parts)
+
+    # Build description
+    description_parts = []
+    if preferences and preferences.include_description and booking.description:
+        description_parts.append(booking.description)
+
+    description_parts.extend([
+        f"\nResource: {booking.resource.name}",
+        f"Booked by: {booking.user.get_full_name() or booking.user.username}",
+        f"Status: {booking.get_status_display()}",
+        f"\nManaged by Aperature Booking System"
+    ])
+
+    description = "\n".join(description_parts)
+
+    # Build location
+    location = ""
+    if preferences and preferences.set_event_location:
+        location = getattr(booking.resource, 'location', '') or booking.resource.name
+
+    # Convert datetime to RFC3339 format
+    start_time = booking.start_time.isoformat()
+    end_time = booking.end_time.isoformat()
+
+    return {
+        'summary': title,
+        'description': description,
+        'location': location,
+        'start': {
+            'dateTime': start_time,
+            'timeZone': str(booking.start_time.tzinfo) or 'UTC',
+        },
+        'end': {
+            'dateTime': end_time,
+            'timeZone': str(booking.end_time.tzinfo) or 'UTC',
+        },
+        'reminders': {
+            'useDefault': True,
+        },
+        'source': {
+            'title': 'Aperature Booking',
+            'url': f"{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/booking/{booking.id}/"
+        }
+    }
+
+
+class GoogleCalendarClient:
+    """
+    Send batched Calendar API requests.
+
+    Each operation is a dict with 'action' ('created', 'updated' or 'deleted'),
+    'event_id' and 'body'. Results are (event, error) pairs in operation order.
+    Discovery services aren't thread-safe, so each worker thread builds its own.
+    """
+
+    def __init__(self, service_factory):
+        self.service_factory = service_factory
+        self._local = threading.local()
+
+    def _get_service(self):
+        if not hasattr(self._local, 'service'):
+            self._local.service = self.service_factory()
+        return self._local.service
+
+    def execute_batch(self, calendar_id: str, operations: List[dict]) -> List[Tuple[Optional[dict], Optional[str]]]:
+        """Send the operations as a single batch request."""
+        service = self._get_service()
+        results = [(None, 'No response')] * len(operations)
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            if exception is None:
+                results[index] = (response or {}, None)
+            elif (
+                isinstance(exception, HttpError) and exception.resp.status in (404, 410)
+                and operations[index]['action'] == 'deleted'
+            ):
+                # Already gone from the calendar
+                results[index] = ({}, None)
+            elif isinstance(exception, HttpError):
+                results[index] = (None, f"Google API error: {exception.resp.status} {exception.content.decode()}")
+            else:
+                results[index] = (None, str(exception))
+
+        batch = service.new_batch_http_request()
+        events = service.events()
+        for index, operation in enumerate(operations):
+            if operation['action'] == 'created':
+                request = events.insert(calendarId=calendar_id, body=operation['body'])
+            elif operation['action'] == 'updated':
+                request = events.update(
+                    calendarId=calendar_id, eventId=operation['event_id'], body=operation['body']
+                )
+            else:
+                request = events.delete(calendarId=calendar_id, eventId=operation['event_id'])
+            batch.add(request, callback=callback, request_id=str(index))
+
+        batch.execute()
+        return results
+
+
+class CalendarSyncEngine:
+    """
+    Push a user's booking changes to Google Calendar.
+
+    Only bookings changed since the integration's last successful sync are sent,
+    as batched requests run with bounded concurrency. Sync logs are written in
+    one bulk insert once all batches have returned.
+    """
+
+    def __init__(self, client, batch_size: int = None, max_workers: int = None):
+        self.client = client
+        # Google allows up to 50 calls per Calendar batch request
+        self.batch_size = batch_size or getattr(settings, 'GOOGLE_CALENDAR_BATCH_SIZE', 50)
+        self.max_workers = max_workers or getattr(settings, 'GOOGLE_CALENDAR_SYNC_MAX_WORKERS', 4)
+
+    def sync(self, integration: GoogleCalendarIntegration, full: bool = False,
+             booking_ids: List[int] = None) -> Dict[str, int]:
+        """Sync the integration's bookings, returning counts by outcome."""
+        operations, skipped = self.plan(integration, full=full, booking_ids=booking_ids)
+        counts, _ = self.apply(integration, operations, skipped)
+        return counts
+
+    def apply(self, integration: GoogleCalendarIntegration, operations: List[dict],
+              skipped: int = 0) -> Tuple[Dict[str, int], Dict[int, str]]:
+        """Send planned operations, returning counts by outcome and the errors of failed bookings by ID."""
+        started_at = timezone.now()
+        results = self._execute(integration.google_calendar_id or 'primary', operations)
+
+        counts = {'created': 0, 'updated': 0, 'deleted': 0, 'skipped': skipped, 'errors': 0}
+        failed_booking_ids = {}
+        logs = []
+        first_error = ''
+        for operation, (event, error, duration_ms) in zip(operations, results):
+            if error:
+                counts['errors'] += 1
+                failed_booking_ids[operation['booking'].id] = error
+                first_error = first_error or error
+            else:
+                counts[operation['action']] += 1
+            event_id = (event or {}).get('id') or operation['event_id'] or ''
+            logs.append(GoogleCalendarSyncLog(
+                user=integration.user,
+                booking=operation['booking'],
+                google_event_id=event_id,
+                action=operation['action'],
+                status='error' if error else 'success',
+                error_message=error or '',
+                request_data=operation['body'],
+                response_data=None if error or not event else {
+                    'event_id': event_id, 'html_link': event.get('htmlLink')
+                },
+                duration_ms=duration_ms
+            ))
+        GoogleCalendarSyncLog.objects.bulk_create(logs)
+
+        if counts['errors']:
+            # Leave last_sync alone so failed changes are picked up next time
+            integration.sync_error_count += 1
+            integration.last_error = first_error
+        else:
+            integration.last_sync = started_at
+            integration.sync_error_count = 0
+            integration.last_error = ''
+        integration.save(update_fields=['last_sync', 'sync_error_count', 'last_error', 'updated_at'])
+
+        logger.info(f"Google Calendar sync for user {integration.user.username}: {counts}")
+        return counts, failed_booking_ids
+
+    def plan(self, integration: GoogleCalendarIntegration, full: bool = False,
+             booking_ids: List[int] = None) -> Tuple[List[dict], int]:
+        """
+        Work out the operations needed, returning them with the count of unchanged bookings.
+
+        With booking_ids, only those bookings are considered and all of them
+        are treated as changed.
+        """
+        user = integration.user
+        preferences = getattr(user, 'calendar_sync_preferences', None)
+        bookings = Booking.objects.filter(
+            user=user,
+            start_time__gte=timezone.now(),
+            status__in=SYNC_STATUSES + REMOVED_STATUSES
+        )
+        if booking_ids is not None:
+            bookings = bookings.filter(id__in=booking_ids)
+        bookings = list(bookings.select_related('user', 'resource').order_by('start_time'))
+        event_ids = self._get_event_ids(user, bookings)
+        since = None if full or booking_ids is not None else integration.last_sync
+
+        operations = []
+        skipped = 0
+        for booking in bookings:
+            event_id = event_ids.get(booking.id)
+            if not self._should_sync(booking, preferences):
+                if event_id:
+                    operations.append(self._operation('deleted', booking, event_id))
+                continue
+
+            if event_id is None:
+                operations.append(self._operation('created', booking, None, preferences))
+            elif since is None or booking.updated_at >= since:
+                operations.append(self._operation('updated', booking, event_id, preferences))
+            else:
+                skipped += 1
+
+        return operations, skipped
+
+    def _should_sync(self, booking: Booking, preferences: CalendarSyncPreferences = None) -> bool:
+        if booking.status in REMOVED_STATUSES:
+            return bool(preferences and preferences.sync_cancelled_bookings and booking.status == 'cancelled')
+        if booking.status == 'pending':
+            return not preferences or preferences.sync_pending_bookings
+        return True
+
+    def _operation(self, action: str, booking: Booking, event_id: Optional[str],
+                   preferences: CalendarSyncPreferences = None) -> dict:
+        return {
+            'action': action,
+            'booking': booking,
+            'event_id': event_id,
+            'body': None if action == 'deleted' else build_event_data(booking, preferences),
+        }
+
+    def _get_event_ids(self, user: User, bookings: List[Booking]) -> Dict[int, str]:
+        """Map booking IDs to their live Google event ID from the sync log."""
+        event_ids = {}
+        logs = GoogleCalendarSyncLog.objects.filter(
+            user=user,
+            booking__in=[booking.id for booking in bookings],
+            action__in=['created', 'deleted'],
+            status='success'
+        ).order_by('timestamp', 'id').values_list('booking_id', 'action', 'google_event_id')
+        for booking_id, action, google_event_id in logs:
+            if action == 'created':
+                event_ids[booking_id] = google_event_id
+            else:
+                event_ids.pop(booking_id, None)
+        return event_ids
+
+    def _execute(self, calendar_id: str, operations: List[dict]) -> List[Tuple[Optional[dict], Optional[str], int]]:
+        """Run the operations in batches across worker threads."""
+        batches = [
+            operations[start:start + self.batch_size]
+            for start in range(0, len(operations), self.batch_size)
+        ]
+        if not batches:
+            return []
+
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            for batch_results in executor.map(lambda batch: self._execute_batch(calendar_id, batch), batches):
+                results.extend(batch_results)
+        return results
+
+    def _execute_batch(self, calendar_id: str, batch: List[dict]) -> List[Tuple[Optional[dict], Optional[str], int]]:
+        started = time.monotonic()
+        try:
+            batch_results = self.client.execute_batch(calendar_id, batch)
+        except Exception as e:
+            logger.error(f"Google Calendar batch request failed: {e}")
+            batch_results = [(None, str(e))] * len(batch)
+        duration_ms = int((time.monotonic() - started) * 1000)
+        return [(event, error, duration_ms) for event, error in batch_results]
+
+
+def queue_booking_sync(booking: Booking) -> Optional[CalendarSyncQueueItem]:
+    """
+    Queue a booking change for background sync if its user has an active integration.
+
+    Repeated changes to the same booking merge into one queue item, which keeps
+    its original available_at so frequent edits can't postpone the sync. A new
+    change also gives an item that ran out of attempts another try.
+    """
+    target = _get_queue_target(booking.user_id)
+    if target is None:
+        return None
+
+    integration_id, delay = target
+    now = timezone.now()
+    item, created = CalendarSyncQueueItem.objects.get_or_create(
+        integration_id=integration_id,
+        booking=booking,
+        defaults={
+            'available_at': now + delay,
+            'requested_at': now,
+        }
+    )
+    if not created:
+        CalendarSyncQueueItem.objects.filter(pk=item.pk).update(requested_at=now, attempts=0, last_error='')
+    return item
+
+
+def queue_bookings_sync(user_id: int, booking_ids: List[int]) -> int:
+    """Queue many of one user's bookings for background sync in a single insert."""
+    return queue_users_bookings_sync({user_id: booking_ids})
+
+
+def queue_users_bookings_sync(booking_ids_by_user: Dict[int, List[int]]) -> int:
+    """
+    Queue bookings changed in bulk for background sync, grouped by user.
+
+    Integrations for all the users are looked up in one query and the queue
+    items written in one insert. Returns the number of bookings queued.
+    """
+    targets = _get_queue_targets(user_id for user_id, booking_ids in booking_ids_by_user.items() if booking_ids)
+    if not targets:
+        return 0
+
+    now = timezone.now()
+    items = [
+        CalendarSyncQueueItem(
+            integration_id=integration_id, booking_id=booking_id,
+            available_at=now + delay, requested_at=now
+        )
+        for user_id, (integration_id, delay) in targets.items()
+        for booking_id in booking_ids_by_user[user_id]
+    ]
+    CalendarSyncQueueItem.objects.bulk_create(items, ignore_conflicts=True)
+    # Merge into items that were already queued, as queue_booking_sync does
+    CalendarSyncQueueItem.objects.filter(
+        integration_id__in=[integration_id for integration_id, _ in targets.values()],
+        booking_id__in=[item.booking_id for item in items],
+        requested_at__lt=now
+    ).update(requested_at=now, attempts=0, last_error='')
+    return len(items)
+
+
+def queue_user_resync(user_id: int) -> int:
+    """
+    Queue all of a user's upcoming bookings so their Google events are rebuilt.
+
+    Used when sync preferences change, since those don't touch the bookings
+    themselves. last_sync is cleared too so the next manual sync is a full one.
+    Returns the number of bookings queued.
+    """
+    GoogleCalendarIntegration.objects.filter(user_id=user_id).update(last_sync=None)
+    booking_ids = list(
+        Booking.objects.filter(
+            user_id=user_id,
+            start_time__gte=timezone.now(),
+            status__in=SYNC_STATUSES + REMOVED_STATUSES
+        ).values_list('id', flat=True)
+    )
+    return queue_bookings_sync(user_id, booking_ids)
+
+
+def _get_queue_target(user_id: int) -> Optional[Tuple[int, timedelta]]:
+    """Return the (integration id, sync delay) for a user's queued changes, or None if they aren't queued."""
+    return _get_queue_targets([user_id]).get(user_id)
+
+
+def _get_queue_targets(user_ids) -> Dict[int, Tuple[int, timedelta]]:
+    """Map user IDs to the (integration id, sync delay) for their queued changes, leaving out users who aren't queued."""
+    rows = GoogleCalendarIntegration.objects.filter(
+        user_id__in=list(user_ids), is_active=True, sync_enabled=True
+    ).values_list('user_id', 'id', 'user__calendar_sync_preferences__auto_sync_timing')
+    return {
+        user_id: (integration_id, SYNC_TIMING_DELAYS.get(timing, timedelta(0)))
+        for user_id, integration_id, timing in rows
+        if timing != 'manual'
+    }
+
+
+def queue_manual_sync(integration: GoogleCalendarIntegration, full: bool = False) -> int:
+    """
+    Queue the integration's outstanding changes for immediate background sync.
+
+    Upcoming bookings changed since the last successful sync, or without a
+    Google event yet, are queued along with anything already waiting,
+    including items that ran out of attempts. With ``full`` every upcoming
+    booking is queued.
+    """
+    now = timezone.now()
+    operations, _ = CalendarSyncEngine(client=None).plan(integration, full=full)
+    booking_ids = [operation['booking'].id for operation in operations]
+    CalendarSyncQueueItem.objects.bulk_create(
+        [
+            CalendarSyncQueueItem(integration=integration, booking_id=booking_id, available_at=now, requested_at=now)
+            for booking_id in booking_ids
+        ],
+        ignore_conflicts=True
+    )
+    queued = integration.sync_queue.update(available_at=now, requested_at=now, attempts=0, last_error='')
+
+    # A manual request overrides any error backoff
+    integration.next_sync_at = None
+    integration.save(update_fields=['next_sync_at', 'updated_at'])
+    return queued
+
+
+def process_sync_queue(client_factory=None) -> Dict[str, int]:
+    """
+    Push queued booking changes to Google Calendar.
+
+    Integrations are served oldest change first. Each one spends from its own
+    token bucket (GOOGLE_CALENDAR_SYNC_BURST operations, refilled at
+    GOOGLE_CALENDAR_SYNC_RATE per minute) and backs off exponentially while
+    its sync_error_count is non-zero, so a failing integration can't hold up
+    the others. Items that fail GOOGLE_CALENDAR_SYNC_MAX_ATTEMPTS times are
+    kept with their last error but no longer sent until the booking changes
+    or the user syncs manually.
+    """
+    if client_factory is None:
+        if not google_calendar_service:
+            return {'integrations': 0, 'synced': 0, 'errors': 0}
+        client_factory = google_calendar_service.get_batch_client
+
+    now = timezone.now()
+    oldest = (
+        CalendarSyncQueueItem.objects.filter(
+            available_at__lte=now,
+            attempts__lt=_max_sync_attempts(),
+            integration__is_active=True,
+            integration__sync_enabled=True
+        ).filter(
+            Q(integration__next_sync_at__isnull=True) | Q(integration__next_sync_at__lte=now)
+        ).values('integration_id').annotate(oldest=Min('requested_at')).order_by('oldest')
+    )
+    integration_ids = [row['integration_id'] for row in oldest]
+    integrations = GoogleCalendarIntegration.objects.select_related('user').in_bulk(integration_ids)
+
+    results = {'integrations': 0, 'synced': 0, 'errors': 0}
+    for integration_id in integration_ids:
+        integration = integrations[integration_id]
+        results['integrations'] += 1
+        try:
+            synced, errors = _process_integration_queue(integration, client_factory, now)
+        except Exception as e:
+            logger.error(f"Background calendar sync failed for user {integration.user.username}: {e}")
+            integration.sync_error_count += 1
+            integration.last_error = str(e)
+            integration.next_sync_at = timezone.now() + _sync_backoff(integration.sync_error_count)
+            integration.save(update_fields=['sync_error_count', 'last_error', 'next_sync_at', 'updated_at'])
+            results['errors'] += 1
+            continue
+        results['synced'] += synced
+        results['errors'] += errors
+
+    return results
+
+
+def _process_integration_queue(integration: GoogleCalendarIntegration, client_factory, now) -> Tuple[int, int]:
+    """Sync as many of one integration's queued bookings as its budget allows."""
+    budget = _refill_sync_budget(integration, now)
+    max_attempts = _max_sync_attempts()
+    items = list(
+        integration.sync_queue.filter(
+            available_at__lte=now, attempts__lt=max_attempts
+        ).order_by('requested_at')[:int(budget)]
+    )
+    if not items:
+        integration.save(update_fields=['sync_tokens', 'sync_tokens_updated_at'])
+        return 0, 0
+
+    engine = CalendarSyncEngine(client_factory(integration))
+    operations, skipped = engine.plan(integration, booking_ids=[item.booking_id for item in items])
+    counts, failed_booking_ids = engine.apply(integration, operations, skipped)
+
+    # Keep failed items, and any changed again while the sync was running
+    done = [item.id for item in items if item.booking_id not in failed_booking_ids]
+    integration.sync_queue.filter(id__in=done, requested_at__lte=now).delete()
+    for item in items:
+        error = failed_booking_ids.get(item.booking_id)
+        if error is None:
+            continue
+        integration.sync_queue.filter(id=item.id).update(attempts=F('attempts') + 1, last_error=error)
+        if item.attempts + 1 >= max_attempts:
+            logger.warning(
+                f"Giving up on calendar sync of booking #{item.booking_id} for user "
+                f"{integration.user.username} after {max_attempts} attempts: {error}"
+            )
+
+    integration.sync_tokens = budget - len(items)
+    if counts['errors']:
+        integration.next_sync_at = timezone.now() + _sync_backoff(integration.sync_error_count)
+    else:
+        integration.next_sync_at = None
+    integration.save(update_fields=['sync_tokens', 'sync_tokens_updated_at', 'next_sync_at'])
+
+    return len(items) - counts['errors'], counts['errors']
+
+
+def _refill_sync_budget(integration: GoogleCalendarIntegration, now) -> float:
+    """Top up the integration's token bucket for the time elapsed since the last refill."""
+    capacity = getattr(settings, 'GOOGLE_CALENDAR_SYNC_BURST', 50)
+    rate_per_minute = getattr(settings, 'GOOGLE_CALENDAR_SYNC_RATE', 30)
+
+    if integration.sync_tokens is None or integration.sync_tokens_updated_at is None:
+        tokens = capacity
+    else:
+        elapsed_minutes = (now - integration.sync_tokens_updated_at).total_seconds() / 60
+        tokens = min(capacity, integration.sync_tokens + elapsed_minutes * rate_per_minute)
+
+    integration.sync_tokens = tokens
+    integration.sync_tokens_updated_at = now
+    return tokens
+
+
+def _max_sync_attempts() -> int:
+    """Failed attempts after which a queued booking is no longer retried automatically."""
+    return getattr(settings, 'GOOGLE_CALENDAR_SYNC_MAX_ATTEMPTS', 5)
+
+
+def _sync_backoff(error_count: int) -> timedelta:
+    """Delay before retrying an integration with consecutive sync errors."""
+    base = getattr(settings, 'GOOGLE_CALENDAR_SYNC_BACKOFF', 60)
+    maximum = getattr(settings, 'GOOGLE_CALENDAR_SYNC_MAX_BACKOFF', 3600)
+    return timedelta(seconds=min(base * 2 ** max(error_count - 1, 0), maximum))
+
+
 # Global service instance
 google_calendar_service = GoogleCalendarService() if GOOGLE_LIBRARIES_AVAILABLE else None
\ No newline at end of file
@@ -17,8 +17,12 @@ https://aperature-booking.org/commercial
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile, Booking, BookingHistory, Maintenance, NotificationPreference, BackupSchedule
-from .notifications import booking_notifications, maintenance_notifications
+from .models import (
+    UserProfile, Booking, BookingHistory, Maintenance, NotificationPreference, BackupSchedule,
+    BrandingConfiguration, LicenseConfiguration, LabSettings, SystemSetting, CalendarSyncPreferences
+)
+from .outbox import record_event
+from .services.google_calendar import queue_booking_sync, queue_user_resync
 
 
 @receiver(post_save, sender=User)
@@ -52,20 +56,54 @@ def log_booking_changes(sender, instance, created, **kwargs):
                 'status': instance.status,
             }
         )
-        # Send booking creation notification
-        booking_notifications.booking_created(instance)
+        # Queue booking creation notification for after commit
+        record_event('booking_created', booking_id=instance.pk)
     else:
+        changes = {
+            name: values for name, values in getattr(instance, '_changed_fields', {}).items()
+            if name not in Booking.HISTORY_IGNORED_FIELDS
+        }
+        if not changes:
+            return
+
+        BookingHistory.objects.create(
+            booking=instance,
+            user_id=instance.user_id,
+            action='updated',
+            old_values={name: _history_value(old) for name, (old, new) in changes.items()},
+            new_values={name: _history_value(new) for name, (old, new) in changes.items()},
+        )
+
         # Handle status changes
-        try:
-            old_booking = Booking.objects.get(pk=instance.pk)
-            if old_booking.status != instance.status:
-                if instance.status == 'confirmed':
-                    booking_notifications.booking_confirmed(instance)
-                elif instance.status == 'cancelled':
-                    # Note: We'd need to track who cancelled it for proper notification
-                    booking_notifications.booking_cancelled(instance, instance.user)
-        except Booking.DoesNotExist:
-            pass
+        if 'status' in changes and instance.status in ('confirmed', 'cancelled'):
+            record_event(
+                'booking_status_changed',
+                booking_id=instance.pk,
+                old_status=changes['status'][0],
+                new_status=instance.status
+            )
+
+
+@receiver(post_save, sender=Booking)
+def queue_calendar_sync(sender, instance, created, **kwargs):
+    """Queue booking changes for background Google Calendar sync."""
+    changed_fields = getattr(instance, '_changed_fields', {})
+    if created or any(name not in Booking.HISTORY_IGNORED_FIELDS for name in changed_fields):
+        queue_booking_sync(instance)
+
+
+@receiver(post_save, sender=CalendarSyncPreferences)
+def queue_calendar_resync(sender, instance, **kwargs):
+    """Resync a user's Google events when preferences that shape them change."""
+    if getattr(instance, '_synced_event_fields_changed', False):
+        queue_user_resync(instance.user_id)
+
+
+def _history_value(value):
+    """Convert a field value for storage in a BookingHistory JSON column."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
 
 
 @receiver(post_delete, sender=Booking)
@@ -88,11 +126,16 @@ def log_booking_deletion(sender, instance, **kwargs):
 def handle_maintenance_changes(sender, instance, created, **kwargs):
     """Handle maintenance creation and updates."""
     if created:
-        maintenance_notifications.maintenance_scheduled(instance)
+        record_event('maintenance_scheduled', maintenance_id=instance.pk)
 
 
 def create_default_notification_preferences(user):
     """Create default notification preferences for a new user."""
+    create_default_notification_preferences_bulk([user])
+
+
+def create_default_notification_preferences_bulk(users):
+    """Create default notification preferences for new users in one INSERT."""
     default_preferences = [
         ('booking_confirmed', 'email', True),
         ('booking_confirmed', 'in_app', True),
@@ -111,15 +154,16 @@ def create_default_notification_preferences(user):
     ]
     
     preferences_to_create = []
-    for notification_type, delivery_method, is_enabled in default_preferences:
-        preferences_to_create.append(
-            NotificationPreference(
-                user=user,
-                notification_type=notification_type,
-                delivery_method=delivery_method,
-                is_enabled=is_enabled
+    for user in users:
+        for notification_type, delivery_method, is_enabled in default_preferences:
+            preferences_to_create.append(
+                NotificationPreference(
+                    user=user,
+                    notification_type=notification_type,
+                    delivery_method=delivery_method,
+                    is_enabled=is_enabled
+                )
             )
-        )
     
     NotificationPreference.objects.bulk_create(preferences_to_create, ignore_conflicts=True)
 
@@ -156,4 +200,24 @@ def backup_schedule_deleted(sender, instance, **kwargs):
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error removing backup schedule from scheduler: {e}")
\ No newline at end of file
+        logger.error(f"Error removing backup schedule from scheduler: {e}")
+
+
+@receiver(post_save, sender=BrandingConfiguration)
+@receiver(post_delete, sender=BrandingConfiguration)
+@receiver(post_save, sender=LicenseConfiguration)
+@receiver(post_delete, sender=LicenseConfiguration)
+@receiver(post_save, sender=LabSettings)
+@receiver(post_delete, sender=LabSettings)
+def branding_changed(sender, instance, **kwargs):
+    """Invalidate cached email branding when branding or lab settings change."""
+    from .forms import invalidate_email_branding_cache
+    invalidate_email_branding_cache()
+
+
+@receiver(post_save, sender=SystemSetting)
+@receiver(post_delete, sender=SystemSetting)
+def system_setting_changed(sender, instance, **kwargs):
+    """Reload API throttle rates when system settings change."""
+    from .throttling import invalidate_throttle_rates
+    invalidate_throttle_rates()
@@ -1,4 +1,7 @@
 """Test factories for creating test data."""
+import random
+from collections import defaultdict
+
 import factory
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -6,7 +9,8 @@ from datetime import timedelta
 from booking.models import (
     UserProfile, Resource, Booking, BookingTemplate, 
     ApprovalRule, Maintenance, BookingHistory,
-    Faculty, College, Department, AccessRequest, ResourceAccess, TrainingRequest
+    Faculty, College, Department, AccessRequest, ResourceAccess, TrainingRequest,
+    Notification, WaitingListEntry
 )
 
 
@@ -25,7 +29,8 @@ class FacultyFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Faculty
     
-    name = factory.Faker('word')
+    # Names are unique, so random words collide in larger test runs
+    name = factory.Sequence(lambda n: f"Faculty {n}")
     code = factory.Sequence(lambda n: f"FAC{n}")
     is_active = True
 
@@ -34,7 +39,7 @@ class CollegeFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = College
     
-    name = factory.Faker('word')
+    name = factory.Sequence(lambda n: f"College {n}")
     code = factory.Sequence(lambda n: f"COL{n}")
     faculty = factory.SubFactory(FacultyFactory)
     is_active = True
@@ -44,7 +49,7 @@ class DepartmentFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Department
     
-    name = factory.Faker('word')
+    name = factory.Sequence(lambda n: f"Department {n}")
     code = factory.Sequence(lambda n: f"DEP{n}")
     college = factory.SubFactory(CollegeFactory)
     is_active = True
@@ -212,4 +217,184 @@ class TrainingRequestFactory(factory.django.DjangoModelFactory):
     requested_level = 2
     current_level = 1
     status = 'pending'
-    justification = factory.Faker('text', max_nb_chars=200)
\ No newline at end of file
+    justification = factory.Faker('text', max_nb_chars=200)
+
+
+# Bulk factories for large datasets.
+#
+# These build unsaved objects and insert them with bulk_create, so model
+# save() and post_save signals (profiles, history, calendar sync) don't run.
+# Helpers that need those rows create them directly.
+
+BULK_BATCH_SIZE = 1000
+
+# Dataset sizes for seed_scale_dataset
+SCALES = {
+    'small': {
+        'users': 200, 'resources': 50, 'bookings': 3000,
+        'notifications': 5000, 'waiting_list': 100, 'maintenance': 10,
+    },
+    'full': {
+        'users': 3000, 'resources': 1000, 'bookings': 30000,
+        'notifications': 60000, 'waiting_list': 1000, 'maintenance': 50,
+    },
+}
+
+BOOKING_STATUS_WEIGHTS = {
+    'approved': 55, 'pending': 20, 'completed': 15, 'cancelled': 7, 'rejected': 3,
+}
+
+NOTIFICATION_STATUS_WEIGHTS = {'sent': 60, 'read': 25, 'failed': 5, 'pending': 10}
+
+
+def bulk_build(factory_class, rows):
+    """Build one unsaved object per dict of factory kwargs."""
+    return [factory_class.build(**row) for row in rows]
+
+
+def create_users_bulk(count, role='student', **profile_fields):
+    """Create users and their profiles in batched INSERTs."""
+    users = User.objects.bulk_create(bulk_build(UserFactory, [{}] * count), batch_size=BULK_BATCH_SIZE)
+    profile_fields.setdefault('is_inducted', True)
+    profile_fields.setdefault('email_verified', True)
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, role=role, **profile_fields) for user in users],
+        batch_size=BULK_BATCH_SIZE
+    )
+    return users
+
+
+def create_resources_bulk(count, **kwargs):
+    """Create resources in batched INSERTs."""
+    return Resource.objects.bulk_create(
+        bulk_build(ResourceFactory, [kwargs] * count), batch_size=BULK_BATCH_SIZE
+    )
+
+
+def create_bookings_bulk(users, resources, count, start=None, days=180, hot_share=0.2,
+                         overlap_every=25, seed=0):
+    """
+    Create bookings spread over a window around now.
+
+    ``hot_share`` of the bookings go to the first resource so per-resource
+    paths see a busy calendar. Each resource's bookings are laid out back to
+    back across the window, and every ``overlap_every``-th one overlaps its
+    predecessor so conflict checks have conflicts to find.
+    """
+    rng = random.Random(seed)
+    start = start or timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=days // 2)
+    statuses = list(BOOKING_STATUS_WEIGHTS)
+    weights = list(BOOKING_STATUS_WEIGHTS.values())
+
+    by_resource = defaultdict(int)
+    for _ in range(count):
+        resource = resources[0] if rng.random() < hot_share else rng.choice(resources)
+        by_resource[resource] += 1
+
+    rows = []
+    window = timedelta(days=days)
+    for resource, resource_count in by_resource.items():
+        spacing = window / resource_count
+        duration = max(min(timedelta(hours=2), spacing * 0.75), timedelta(minutes=15))
+        previous_start = start
+        for n in range(resource_count):
+            if overlap_every and n % overlap_every == overlap_every - 1:
+                booking_start = previous_start + duration / 2
+            else:
+                booking_start = start + spacing * n
+            previous_start = booking_start
+            rows.append({
+                'user': rng.choice(users),
+                'resource': resource,
+                'title': f'{resource.name} session {n}',
+                'description': '',
+                'start_time': booking_start,
+                'end_time': booking_start + duration,
+                'status': rng.choices(statuses, weights)[0],
+            })
+    return Booking.objects.bulk_create(bulk_build(BookingFactory, rows), batch_size=BULK_BATCH_SIZE)
+
+
+def create_notifications_bulk(users, count, days=90, seed=0):
+    """Create a notification history spread evenly over the last ``days`` days."""
+    rng = random.Random(seed)
+    statuses = list(NOTIFICATION_STATUS_WEIGHTS)
+    weights = list(NOTIFICATION_STATUS_WEIGHTS.values())
+    types = ['booking_confirmed', 'booking_cancelled', 'booking_reminder', 'approval_decision']
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user=rng.choice(users),
+            notification_type=rng.choice(types),
+            title=f'Notification {n}',
+            message='',
+            delivery_method=rng.choice(['email', 'in_app']),
+            status=rng.choices(statuses, weights)[0],
+        )
+        for n in range(count)
+    ], batch_size=BULK_BATCH_SIZE)
+
+    # created_at is auto_now_add, so backdate one UPDATE per day
+    by_day = defaultdict(list)
+    for n, notification in enumerate(notifications):
+        by_day[n * days // max(count, 1)].append(notification.pk)
+    now = timezone.now()
+    for day, ids in by_day.items():
+        created_at = now - timedelta(days=day)
+        for offset in range(0, len(ids), BULK_BATCH_SIZE):
+            Notification.objects.filter(pk__in=ids[offset:offset + BULK_BATCH_SIZE]).update(
+                created_at=created_at, sent_at=created_at
+            )
+    return notifications
+
+
+def create_waiting_list_bulk(users, resource, count, seed=0):
+    """Create active waiting list entries for a resource."""
+    rng = random.Random(seed)
+    start = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    entries = []
+    for n in range(count):
+        desired_start = start + timedelta(days=rng.randrange(30), hours=rng.randrange(8))
+        entries.append(WaitingListEntry(
+            user=rng.choice(users),
+            resource=resource,
+            title=f'Waiting {n}',
+            desired_start_time=desired_start,
+            desired_end_time=desired_start + timedelta(hours=2),
+            priority=rng.choice(['low', 'normal', 'high']),
+            position=n + 1,
+        ))
+    return WaitingListEntry.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+
+
+def seed_scale_dataset(scale='small', seed=0):
+    """
+    Seed a realistic dataset for benchmarks.
+
+    ``scale`` is a key of SCALES or a dict of the same counts. Returns a dict
+    with the created objects plus the busiest resource and a manager account.
+    """
+    counts = SCALES[scale] if isinstance(scale, str) else scale
+    users = create_users_bulk(counts['users'])
+    manager = create_users_bulk(1, role='sysadmin')[0]
+    resources = create_resources_bulk(counts['resources'])
+    bookings = create_bookings_bulk(users, resources, counts['bookings'], seed=seed)
+    notifications = create_notifications_bulk(users, counts['notifications'], seed=seed)
+    hot_resource = resources[0]
+    waiting_list = create_waiting_list_bulk(users, hot_resource, counts['waiting_list'], seed=seed)
+    maintenance_start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    Maintenance.objects.bulk_create(bulk_build(MaintenanceFactory, [
+        {
+            'resource': hot_resource, 'created_by': manager,
+            'start_time': maintenance_start + timedelta(days=3 * n),
+        }
+        for n in range(counts['maintenance'])
+    ]))
+    return {
+        'users': users,
+        'manager': manager,
+        'resources': resources,
+        'bookings': bookings,
+        'notifications': notifications,
+        'waiting_list': waiting_list,
+        'hot_resource': hot_resource,
+    }
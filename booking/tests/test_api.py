@@ -1,13 +1,21 @@
 """Test cases for booking API endpoints."""
+import hashlib
+
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
+from unittest import mock
 
-from booking.models import Booking, Resource, UserProfile
+from booking.models import (
+    AccessRequest, Booking, BookingHistory, Notification, OutboxEvent, Resource, UserProfile
+)
 from booking.tests.factories import (
     UserFactory, UserProfileFactory, ResourceFactory, BookingFactory
 )
@@ -383,4 +391,328 @@ class TestAuthenticationAPI(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['role'], user_profile.role)
-        self.assertEqual(response.data['training_level'], user_profile.training_level)
\ No newline at end of file
+        self.assertEqual(response.data['training_level'], user_profile.training_level)
+
+
+class TestKeysetPagination(TestCase):
+    """Test opt-in cursor pagination on list endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = UserProfileFactory(role='sysadmin').user
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+        BookingFactory.create_batch(25, user=self.user)
+
+    def test_walk_bookings_with_cursor(self):
+        """Test cursor pages cover every booking once, newest first."""
+        url = reverse('api:booking-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 10})
+
+        self.assertNotIn('count', response.data)
+        ids = [booking['id'] for booking in response.data['results']]
+
+        while response.data['next']:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(response.data['next'])
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+            self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+            ids += [booking['id'] for booking in response.data['results']]
+
+        self.assertEqual(ids, sorted(Booking.objects.values_list('id', flat=True), reverse=True))
+
+    def test_page_size_is_capped(self):
+        """Test clients can't request pages above the configured maximum."""
+        with self.settings(API_CURSOR_MAX_PAGE_SIZE=5):
+            response = self.client.get(reverse('api:booking-list'), {'pagination': 'cursor', 'page_size': 50})
+
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_page_numbers_remain_default(self):
+        """Test clients that don't opt in still get numbered pages."""
+        response = self.client.get(reverse('api:booking-list'))
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertIn('results', response.data)
+
+    def test_notifications_cursor(self):
+        """Test notifications can be walked with a cursor."""
+        for n in range(3):
+            Notification.objects.create(
+                user=self.user, notification_type='booking_reminder', title=f'Reminder {n}',
+                message='Soon', delivery_method='in_app'
+            )
+
+        response = self.client.get(reverse('api:notification-list'), {'pagination': 'cursor', 'page_size': 2})
+
+        self.assertEqual([n['title'] for n in response.data['results']], ['Reminder 2', 'Reminder 1'])
+        self.assertIsNotNone(response.data['next'])
+
+
+class TestSparseFieldsets(TestCase):
+    """Test ?fields= and ?expand= on bookings and resources."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = UserProfileFactory(role='sysadmin').user
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+        self.resource = ResourceFactory(name='Confocal')
+        BookingFactory.create_batch(10, user=self.user, resource=self.resource)
+
+    def test_fields_limit_payload_and_queries(self):
+        """Test unrequested method fields and relations are never loaded."""
+        url = reverse('api:booking-list')
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as sparse:
+            response = self.client.get(url, {'fields': 'id,resource,start_time,end_time'})
+
+        booking = response.data['results'][0]
+        self.assertEqual(set(booking), {'id', 'resource', 'start_time', 'end_time'})
+        self.assertEqual(booking['resource'], self.resource.pk)
+        self.assertLess(len(sparse.captured_queries), len(full.captured_queries))
+        select = [query['sql'] for query in sparse.captured_queries if 'booking_booking' in query['sql']][-1]
+        self.assertNotIn('"description"', select)
+        self.assertNotIn('booking_resource', select)
+
+    def test_nested_fields_expand(self):
+        """Test dotted fields expand a relation with only the named fields."""
+        response = self.client.get(
+            reverse('api:booking-list'), {'fields': 'id,resource.name,user', 'expand': 'user'}
+        )
+
+        booking = response.data['results'][0]
+        self.assertEqual(booking['resource'], {'name': 'Confocal'})
+        self.assertEqual(booking['user']['username'], self.user.username)
+
+    def test_expand_without_fields(self):
+        """Test expand alone keeps every field but collapses other relations."""
+        response = self.client.get(reverse('api:booking-list'), {'expand': 'resource'})
+
+        booking = response.data['results'][0]
+        self.assertEqual(booking['resource']['name'], 'Confocal')
+        self.assertEqual(booking['user'], self.user.pk)
+        self.assertEqual(booking['attendees'], [])
+        self.assertIn('dependency_status', booking)
+
+    def test_default_payload_unchanged(self):
+        """Test clients that don't ask for sparse fields get full objects."""
+        response = self.client.get(reverse('api:booking-list'))
+
+        booking = response.data['results'][0]
+        self.assertEqual(booking['resource']['name'], 'Confocal')
+        self.assertIn('available_for_user', booking['resource'])
+
+    def test_default_payload_queries_do_not_grow_with_rows(self):
+        """Test the full representation prefetches relations and annotates conflicts."""
+        url = reverse('api:booking-list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        first = Booking.objects.filter(resource=self.resource).order_by('pk').first()
+        BookingFactory.create_batch(5, resource=self.resource)
+        BookingFactory(resource=self.resource, start_time=first.start_time, end_time=first.end_time, status='pending')
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+        results = {booking['id']: booking for booking in response.data['results']}
+        self.assertTrue(results[first.pk]['has_conflicts'])
+
+    def test_resource_method_field_skipped(self):
+        """Test available_for_user only runs when it is requested."""
+        with mock.patch.object(Resource, 'is_available_for_user') as available:
+            response = self.client.get(reverse('api:resource-list'), {'fields': 'id,name'})
+
+        available.assert_not_called()
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+
+class TestBulkBookingAPI(TestCase):
+    """Test creating many bookings in one request."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = UserProfileFactory(role='researcher').user
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+        self.resources = ResourceFactory.create_batch(2)
+        self.start = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        self.url = reverse('api:booking-bulk-create')
+
+    def _item(self, resource, day, hours=1, title='Lab session'):
+        start = self.start + timedelta(days=day)
+        return {
+            'resource_id': resource.pk, 'title': title,
+            'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=hours)).isoformat(),
+        }
+
+    def test_batch_created_in_few_queries(self):
+        """Test a timetable is validated and inserted in bulk."""
+        items = [self._item(resource, day) for resource in self.resources for day in range(30)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'bookings': items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 60)
+        self.assertLess(len(queries.captured_queries), 20)
+        self.assertEqual(Booking.objects.filter(user=self.user, status='pending').count(), 60)
+        self.assertEqual(BookingHistory.objects.filter(action='created').count(), 60)
+        event = OutboxEvent.objects.get(event_type='bookings_created')
+        self.assertEqual(len(event.payload['booking_ids']), 60)
+
+    def _conflicting_items(self):
+        BookingFactory(resource=self.resources[0], start_time=self.start, end_time=self.start + timedelta(hours=2))
+        return [
+            self._item(self.resources[0], 0),
+            self._item(self.resources[1], 1),
+            self._item(self.resources[1], 1, title='Overlaps item 1'),
+            {'resource_id': self.resources[1].pk, 'title': 'No times'},
+        ]
+
+    def test_atomic_batch_rejected(self):
+        """Test one invalid item stops the whole batch, with per-item errors."""
+        response = self.client.post(self.url, {'bookings': self._conflicting_items()}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['error', 'skipped', 'error', 'error'])
+        self.assertIn('existing bookings', results[0]['errors']['non_field_errors'][0])
+        self.assertIn('booking 1 in this request', results[2]['errors']['non_field_errors'][0])
+        self.assertIn('start_time', results[3]['errors'])
+        self.assertFalse(Booking.objects.filter(user=self.user).exists())
+
+    def test_partial_success(self):
+        """Test non-atomic requests create the valid items."""
+        response = self.client.post(
+            self.url, {'bookings': self._conflicting_items(), 'atomic': False}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        created = [result for result in response.data['results'] if result['status'] == 'created']
+        self.assertEqual([result['index'] for result in created], [1])
+        self.assertTrue(Booking.objects.filter(pk=created[0]['id'], user=self.user).exists())
+
+    def test_batch_size_limit(self):
+        """Test requests over the configured size are refused."""
+        items = [self._item(self.resources[0], day) for day in range(3)]
+
+        with self.settings(API_BULK_BOOKING_MAX_ITEMS=2):
+            response = self.client.post(self.url, {'bookings': items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_top_level_list_rejected(self):
+        """Test a bare JSON array is a validation error, not a server error."""
+        response = self.client.post(self.url, [self._item(self.resources[0], 0)], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+        self.assertFalse(Booking.objects.exists())
+
+
+class TestIdempotencyKeys(TestCase):
+    """Test Idempotency-Key replay on booking and access request writes."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = UserProfileFactory(role='researcher').user
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+        self.resource = ResourceFactory()
+        start = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        self.booking_data = {
+            'resource_id': self.resource.pk, 'title': 'Imaging',
+            'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=1)).isoformat(),
+        }
+
+    def _post(self, url, data, key='retry-1'):
+        return self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        """Test a retried create returns the stored booking without validating again."""
+        url = reverse('api:booking-list')
+        first = self._post(url, self.booking_data)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self._post(url, self.booking_data)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertFalse(any('booking_booking' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 1)
+
+    def test_keys_are_scoped_to_user(self):
+        """Test the same key from another user is a separate request."""
+        url = reverse('api:booking-list')
+        self._post(url, self.booking_data)
+
+        other = UserProfileFactory(role='researcher').user
+        self.client.force_authenticate(user=other)
+        response = self._post(url, self.booking_data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    def test_key_reused_for_different_request(self):
+        """Test reusing a key with a different body is refused."""
+        url = reverse('api:booking-list')
+        self._post(url, self.booking_data)
+
+        response = self._post(url, dict(self.booking_data, title='Changed'))
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_concurrent_retry_conflicts(self):
+        """Test a retry while the first request is running gets 409."""
+        cache.add(f'idempotency:{self.user.pk}:{hashlib.sha256(b"retry-1").hexdigest()}:lock', 'running')
+
+        response = self._post(reverse('api:booking-list'), self.booking_data)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_validation_errors_are_replayed(self):
+        """Test a rejected write is replayed rather than validated again."""
+        url = reverse('api:booking-list')
+        data = dict(self.booking_data, end_time=self.booking_data['start_time'])
+        first = self._post(url, data)
+
+        retry = self._post(url, data)
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_access_request_retry(self):
+        """Test retried access requests don't create duplicates."""
+        url = reverse('api:accessrequest-list')
+        data = {'user': self.user.pk, 'resource': self.resource.pk, 'justification': 'Thesis work'}
+
+        first = self._post(url, data)
+        retry = self._post(url, data)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(AccessRequest.objects.filter(user=self.user).count(), 1)
+
+    @mock.patch('booking.idempotency._local_cache_warned', False)
+    def test_warns_once_about_per_process_cache(self):
+        """Test a LocMemCache idempotency store is reported once per process."""
+        from booking.idempotency import get_idempotency_cache
+
+        with self.assertLogs('booking.idempotency', level='WARNING') as logs:
+            get_idempotency_cache()
+            get_idempotency_cache()
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('LocMemCache', logs.output[0])
@@ -0,0 +1,87 @@
+"""Test cases for the streaming database backup fallback."""
+import io
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.backup_service import BackupService
+from booking.models import Notification, Resource
+from booking.tests.factories import ResourceFactory, UserFactory
+
+
+class TestStreamingDump(TestCase):
+    """Test NDJSON dump and load used when no native dump tool applies."""
+
+    def setUp(self):
+        self.service = BackupService()
+        self.user = UserFactory()
+        self.resources = ResourceFactory.create_batch(3)
+
+    def _dump(self, **kwargs):
+        stream = io.StringIO()
+        counts = self.service.stream_dump(stream, **kwargs)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        return counts, lines
+
+    def test_dump_writes_one_object_per_line(self):
+        """Test each object is written as a separate JSON line."""
+        counts, lines = self._dump()
+
+        resource_lines = [line for line in lines if line['model'] == 'booking.resource']
+        self.assertEqual(counts['booking.resource'], 3)
+        self.assertEqual(len(resource_lines), 3)
+        self.assertEqual(
+            sorted(line['pk'] for line in resource_lines),
+            sorted(resource.pk for resource in self.resources)
+        )
+
+    def test_dump_applies_model_filters(self):
+        """Test per-model filters exclude old notifications."""
+        recent = Notification.objects.create(
+            user=self.user, notification_type='booking_reminder',
+            title='Recent', message='Recent', delivery_method='in_app'
+        )
+        old = Notification.objects.create(
+            user=self.user, notification_type='booking_reminder',
+            title='Old', message='Old', delivery_method='in_app'
+        )
+        Notification.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+
+        cutoff = timezone.now() - timedelta(days=90)
+        counts, lines = self._dump(model_filters={
+            'booking.Notification': lambda qs: qs.filter(created_at__gte=cutoff)
+        })
+
+        notification_pks = [line['pk'] for line in lines if line['model'] == 'booking.notification']
+        self.assertEqual(notification_pks, [recent.pk])
+        self.assertEqual(counts['booking.notification'], 1)
+
+    def test_dump_honours_excluded_models(self):
+        """Test models listed in BACKUP_DUMPDATA_EXCLUDE are skipped."""
+        with self.settings(BACKUP_DUMPDATA_EXCLUDE=['booking.Resource']):
+            counts, lines = self._dump()
+
+        self.assertNotIn('booking.resource', counts)
+        self.assertFalse(any(line['model'] == 'booking.resource' for line in lines))
+
+    def test_load_restores_dumped_objects(self):
+        """Test a streamed dump can be loaded back in chunks."""
+        stream = io.StringIO()
+        with self.settings(BACKUP_DUMPDATA_CHUNK_SIZE=2):
+            self.service.stream_dump(stream, model_filters={
+                'booking.resource': {'pk__in': [r.pk for r in self.resources]}
+            })
+        names = {r.pk: r.name for r in self.resources}
+        Resource.objects.all().delete()
+
+        stream.seek(0)
+        with self.settings(BACKUP_DUMPDATA_CHUNK_SIZE=2):
+            result = self.service.stream_load(stream)
+
+        self.assertGreaterEqual(result['objects_loaded'], 3)
+        self.assertEqual(
+            dict(Resource.objects.values_list('pk', 'name')),
+            names
+        )
@@ -0,0 +1,215 @@
+"""
+Scale benchmarks for hot paths.
+
+Skipped unless RUN_BENCHMARKS=1. Each benchmark seeds a large dataset with
+the bulk factories, times the fastest of several runs and counts queries,
+then compares against booking/tests/benchmark_baseline.json:
+
+    RUN_BENCHMARKS=1 python run_tests.py booking.tests.test_benchmarks
+
+Query counts are compared by default. The times in the committed baseline
+come from one developer machine, so they are only compared with
+BENCHMARK_CHECK_TIMES=1, after regenerating the baseline on the machine
+that runs the comparison:
+
+    RUN_BENCHMARKS=1 BENCHMARK_UPDATE_BASELINE=1 python run_tests.py booking.tests.test_benchmarks
+    RUN_BENCHMARKS=1 BENCHMARK_CHECK_TIMES=1 python run_tests.py booking.tests.test_benchmarks
+
+Options (environment variables):
+    BENCHMARK_SCALE            'small' (default) or 'full'
+    BENCHMARK_REPEAT           runs per benchmark, default 3
+    BENCHMARK_CHECK_TIMES      set to 1 to compare times as well as query counts
+    BENCHMARK_TIME_TOLERANCE   allowed slowdown as a fraction, default 0.5
+    BENCHMARK_UPDATE_BASELINE  set to 1 to rewrite the baseline for the scale
+"""
+import json
+import os
+import sys
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.conflicts import ConflictDetector, ConflictManager
+from booking.models import Booking
+from booking.notification_analytics import notification_analytics
+from booking.serializers import BookingSerializer
+from booking.tests.factories import BookingFactory, seed_scale_dataset
+from booking.waiting_list import waiting_list_service
+
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+SCALE = os.environ.get('BENCHMARK_SCALE', 'small')
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', 3))
+TIME_TOLERANCE = float(os.environ.get('BENCHMARK_TIME_TOLERANCE', 0.5))
+# Slowdowns smaller than this are timer noise, whatever the ratio
+TIME_FLOOR = 0.02
+UPDATE_BASELINE = os.environ.get('BENCHMARK_UPDATE_BASELINE') == '1'
+CHECK_TIMES = os.environ.get('BENCHMARK_CHECK_TIMES') == '1'
+
+
+def load_baseline():
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
+
+
+def measure(func, repeat=REPEAT):
+    """Return the fastest time and the query count of the last run."""
+    # Warm up imports, URL resolvers and connection state first
+    cache.clear()
+    func()
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    return {
+        'seconds': round(min(timings), 4),
+        'queries': len(queries.captured_queries),
+    }
+
+
+@unittest.skipUnless(os.environ.get('RUN_BENCHMARKS') == '1', 'set RUN_BENCHMARKS=1 to run benchmarks')
+class TestScaleBenchmarks(TestCase):
+    """Time and count queries for hot paths against a seeded dataset."""
+
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        started = time.perf_counter()
+        cls.data = seed_scale_dataset(SCALE)
+        sys.stderr.write(
+            f"\nSeeded '{SCALE}' dataset ({len(cls.data['bookings'])} bookings) "
+            f"in {time.perf_counter() - started:.1f}s\n"
+        )
+        cls.resource = cls.data['hot_resource']
+        cls.manager = cls.data['manager']
+        cls.user = cls.data['users'][0]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if not cls.results:
+            return
+        sys.stderr.write(f"\nBenchmarks ({SCALE}):\n")
+        for name, result in sorted(cls.results.items()):
+            sys.stderr.write(f"  {name:<40} {result['seconds'] * 1000:>9.1f} ms {result['queries']:>6} queries\n")
+        if UPDATE_BASELINE:
+            baseline = load_baseline()
+            baseline[SCALE] = dict(sorted(cls.results.items()))
+            BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            sys.stderr.write(f"Baseline written to {BASELINE_PATH}\n")
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.window_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.request = RequestFactory().get('/')
+        self.request.user = self.manager
+
+    def benchmark(self, name, func):
+        """Measure ``func`` and fail if it regressed against the baseline."""
+        result = measure(func)
+        type(self).results[name] = result
+        if UPDATE_BASELINE:
+            return result
+
+        expected = load_baseline().get(SCALE, {}).get(name)
+        if expected is None:
+            self.skipTest(f'No {SCALE} baseline for {name}; run with BENCHMARK_UPDATE_BASELINE=1')
+        self.assertLessEqual(
+            result['queries'], expected['queries'],
+            f"{name} ran {result['queries']} queries, baseline is {expected['queries']}"
+        )
+        if CHECK_TIMES:
+            allowed = max(expected['seconds'] * (1 + TIME_TOLERANCE), expected['seconds'] + TIME_FLOOR)
+            self.assertLessEqual(
+                result['seconds'], allowed,
+                f"{name} took {result['seconds']}s, baseline is {expected['seconds']}s"
+            )
+        return result
+
+    def test_conflict_check(self):
+        """Test checking a new booking against a busy resource."""
+        start = self.window_start + timedelta(days=7, hours=10)
+        booking = BookingFactory.build(
+            user=self.user, resource=self.resource, start_time=start, end_time=start + timedelta(hours=4)
+        )
+        self.benchmark('conflicts.check_booking_conflicts', lambda: ConflictDetector.check_all_conflicts(booking))
+
+    def test_resource_conflicts(self):
+        """Test scanning a busy resource's week for conflicts."""
+        self.benchmark('conflicts.find_resource_conflicts', lambda: ConflictDetector.find_resource_conflicts(
+            self.resource, self.window_start, self.window_start + timedelta(days=7)
+        ))
+
+    def test_conflict_report(self):
+        """Test the 30 day conflict report for a busy resource."""
+        self.benchmark('conflicts.resource_report', lambda: ConflictManager.get_resource_conflicts_report(
+            self.resource, days_ahead=30
+        ))
+
+    def test_booking_list_api(self):
+        """Test the first page of the booking list for a manager."""
+        self.client.force_login(self.manager)
+        url = reverse('api:booking-list')
+        self.benchmark('api.booking_list', lambda: self.assertEqual(self.client.get(url).status_code, 200))
+
+    def test_booking_calendar_api(self):
+        """Test a week of calendar events across all resources."""
+        self.client.force_login(self.manager)
+        url = reverse('api:booking-calendar')
+        params = {
+            'start_date': self.window_start.strftime('%Y-%m-%d'),
+            'end_date': (self.window_start + timedelta(days=6)).strftime('%Y-%m-%d'),
+        }
+        self.benchmark('api.booking_calendar', lambda: self.assertEqual(
+            self.client.get(url, params).status_code, 200
+        ))
+
+    def ics_generator(self):
+        # calendar_sync needs the sites framework, which test settings leave out
+        if not apps.is_installed('django.contrib.sites'):
+            self.skipTest('django.contrib.sites is not installed')
+        from booking.calendar_sync import ICSCalendarGenerator
+        return ICSCalendarGenerator(self.request)
+
+    def test_resource_ics_feed(self):
+        """Test the 90 day ICS feed for a busy resource."""
+        generator = self.ics_generator()
+        self.benchmark('ics.resource_calendar', lambda: generator.generate_resource_calendar(self.resource))
+
+    def test_user_ics_feed(self):
+        """Test a user's ICS feed including past bookings."""
+        generator = self.ics_generator()
+        self.benchmark('ics.user_calendar', lambda: generator.generate_user_calendar(self.user, include_past=True))
+
+    def test_booking_serializer_list(self):
+        """Test serializing a page of bookings with related objects."""
+        queryset = BookingSerializer.select_for_all_fields(Booking.objects.all()).order_by('start_time')[:200]
+        self.benchmark('serializers.booking_list', lambda: BookingSerializer(
+            queryset.all(), many=True, context={'request': self.request}
+        ).data)
+
+    def test_waiting_list_processing(self):
+        """Test finding free slots and processing a busy resource's waiting list."""
+        self.benchmark('waiting_list.process_resource', lambda: waiting_list_service.process_waiting_list_for_resource(
+            self.resource
+        ))
+
+    def test_notification_analytics_report(self):
+        """Test the 30 day notification analytics report."""
+        self.benchmark('analytics.notification_report', lambda: notification_analytics.generate_analytics_report(
+            days=30
+        ))
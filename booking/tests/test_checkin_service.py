@@ -0,0 +1,112 @@
+"""Test cases for bulk check-in service operations."""
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.checkin_service import checkin_service
+from booking.models import (
+    Booking, BookingHistory, CalendarSyncQueueItem, CheckInOutEvent, GoogleCalendarIntegration, Notification,
+    UsageAnalytics
+)
+from booking.outbox import dispatch_pending_events
+from booking.tests.factories import BookingFactory, ResourceFactory, UserProfileFactory
+
+
+class TestBulkCheckInOperations(TestCase):
+    """Test set-based no-show and auto check-out."""
+
+    def setUp(self):
+        self.manager = UserProfileFactory(role='lab_manager').user
+        self.manager.refresh_from_db()
+        self.resource = ResourceFactory()
+        self.bookings = BookingFactory.create_batch(30, resource=self.resource, status='approved')
+        self.queryset = Booking.objects.filter(resource=self.resource)
+
+    def test_bulk_mark_no_show(self):
+        """Test no-shows are marked, logged and counted in a few statements."""
+        Booking.objects.filter(pk=self.bookings[0].pk).update(checked_in_at=timezone.now())
+
+        with CaptureQueriesContext(connection) as queries:
+            result = checkin_service.bulk_mark_no_show(self.queryset, self.manager, 'Outage')
+
+        self.assertEqual(result, {'updated': 29, 'skipped': 1})
+        self.assertLess(len(queries.captured_queries), 20)
+        self.assertEqual(Booking.objects.filter(no_show=True, status='completed').count(), 29)
+        self.assertEqual(CheckInOutEvent.objects.filter(event_type='no_show', notes='Outage').count(), 29)
+        self.assertEqual(
+            BookingHistory.objects.filter(action='updated', new_values__no_show=True).count(), 29
+        )
+        analytics = UsageAnalytics.objects.get(resource=self.resource)
+        self.assertEqual((analytics.total_bookings, analytics.no_show_bookings), (29, 29))
+        self.assertEqual(analytics.no_show_rate, 1.0)
+
+    def test_bulk_mark_no_show_requires_manager(self):
+        """Test only lab managers and sysadmins can mark no-shows."""
+        student = UserProfileFactory(role='student').user
+        student.refresh_from_db()
+
+        with self.assertRaises(PermissionError):
+            checkin_service.bulk_mark_no_show(self.queryset, student)
+
+        self.assertFalse(Booking.objects.filter(no_show=True).exists())
+
+    def test_bulk_auto_check_out(self):
+        """Test checked-in bookings are checked out and owners notified after commit."""
+        checked_in = [booking.pk for booking in self.bookings[:10]]
+        Booking.objects.filter(pk__in=checked_in).update(checked_in_at=timezone.now())
+
+        result = checkin_service.bulk_auto_check_out(self.queryset)
+
+        self.assertEqual(result, {'updated': 10, 'skipped': 20})
+        booking = Booking.objects.get(pk=checked_in[0])
+        self.assertTrue(booking.auto_checked_out)
+        self.assertEqual(booking.actual_end_time, booking.end_time)
+        self.assertEqual(CheckInOutEvent.objects.filter(event_type='auto_check_out').count(), 10)
+
+        dispatch_pending_events()
+        self.assertEqual(
+            Notification.objects.filter(title__startswith='Auto Checked Out', delivery_method='email').count(),
+            10
+        )
+
+    def test_bulk_changes_queued_for_calendar_sync(self):
+        """Test bookings updated in bulk are queued for their owners' calendars."""
+        synced = {booking.user_id for booking in self.bookings[:2]}
+        integrations = {
+            user_id: GoogleCalendarIntegration.objects.create(
+                user_id=user_id, access_token='access', refresh_token='refresh',
+                token_expires_at=timezone.now() + timedelta(hours=1)
+            ).pk
+            for user_id in synced
+        }
+        CalendarSyncQueueItem.objects.all().delete()
+        checked_in = [self.bookings[1].pk, self.bookings[2].pk]
+        Booking.objects.filter(pk__in=checked_in).update(checked_in_at=timezone.now())
+
+        checkin_service.bulk_mark_no_show(self.queryset, self.manager)
+        checkin_service.bulk_auto_check_out(self.queryset)
+
+        self.assertEqual(
+            set(CalendarSyncQueueItem.objects.values_list('integration_id', 'booking_id')),
+            {
+                (integrations[self.bookings[0].user_id], self.bookings[0].pk),
+                (integrations[self.bookings[1].user_id], self.bookings[1].pk),
+            }
+        )
+
+    def test_process_automatic_checkouts(self):
+        """Test only bookings overdue for check-out are checked out automatically."""
+        now = timezone.now()
+        overdue, recent = self.bookings[:2]
+        Booking.objects.filter(pk=overdue.pk).update(
+            checked_in_at=now - timedelta(hours=2), start_time=now - timedelta(hours=2), end_time=now - timedelta(hours=1)
+        )
+        Booking.objects.filter(pk=recent.pk).update(
+            checked_in_at=now - timedelta(hours=1), start_time=now - timedelta(hours=1), end_time=now - timedelta(minutes=5)
+        )
+
+        self.assertEqual(checkin_service.process_automatic_checkouts(), 1)
+        self.assertEqual(list(Booking.objects.filter(auto_checked_out=True).values_list('pk', flat=True)), [overdue.pk])
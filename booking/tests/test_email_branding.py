@@ -0,0 +1,102 @@
+"""Test cases for cached email branding and inline logo attachment."""
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from booking import forms
+from booking.forms import (
+    LOGO_CID, get_email_branding_context, get_logo_asset, send_branded_email
+)
+from booking.models import BrandingConfiguration, LicenseConfiguration
+
+
+class TestEmailBranding(TestCase):
+    """Test branding context caching and logo handling."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        forms.invalidate_email_branding_cache()
+        handle, self.logo_path = tempfile.mkstemp(suffix='.png')
+        os.write(handle, b'first logo')
+        os.close(handle)
+        self.addCleanup(os.remove, self.logo_path)
+
+    def test_context_is_cached(self):
+        """Test branding lookups hit the database only once."""
+        get_email_branding_context()
+
+        with self.assertNumQueries(0):
+            context = get_email_branding_context()
+
+        self.assertEqual(context['app_title'], 'Aperature Booking')
+
+    def test_branding_save_invalidates_cache(self):
+        """Test saving branding refreshes the cached context."""
+        license_config = LicenseConfiguration.objects.create(
+            license_key='test-key', organization_name='Test Lab',
+            organization_slug='test-lab', contact_email='admin@example.com'
+        )
+        branding = BrandingConfiguration.objects.create(
+            license=license_config, app_title='Old Title', company_name='Test Lab'
+        )
+        self.assertEqual(get_email_branding_context()['app_title'], 'Old Title')
+
+        branding.app_title = 'New Title'
+        branding.save()
+
+        self.assertEqual(get_email_branding_context()['app_title'], 'New Title')
+
+    def test_change_from_another_process_is_picked_up(self):
+        """Test a change saved elsewhere is used once the version is checked again."""
+        license_config = LicenseConfiguration.objects.create(
+            license_key='test-key', organization_name='Test Lab',
+            organization_slug='test-lab', contact_email='admin@example.com'
+        )
+        branding = BrandingConfiguration.objects.create(
+            license=license_config, app_title='Old Title', company_name='Test Lab'
+        )
+        self.assertEqual(get_email_branding_context()['app_title'], 'Old Title')
+
+        # A queryset update sends no signal, like a save in another worker
+        BrandingConfiguration.objects.filter(pk=branding.pk).update(
+            app_title='New Title', updated_at=timezone.now()
+        )
+        self.assertEqual(get_email_branding_context()['app_title'], 'Old Title')
+
+        with mock.patch('booking.forms.time.monotonic',
+                        return_value=time.monotonic() + forms.BRANDING_VERSION_CHECK_INTERVAL):
+            self.assertEqual(get_email_branding_context()['app_title'], 'New Title')
+
+    def test_logo_reread_when_file_changes(self):
+        """Test the logo is cached until its mtime changes."""
+        self.assertEqual(get_logo_asset(self.logo_path)['data'], b'first logo')
+
+        with open(self.logo_path, 'wb') as logo_file:
+            logo_file.write(b'second logo')
+        mtime = os.path.getmtime(self.logo_path) + 10
+        os.utime(self.logo_path, (mtime, mtime))
+
+        self.assertEqual(get_logo_asset(self.logo_path)['data'], b'second logo')
+
+    def test_logo_attached_inline(self):
+        """Test the logo is sent as a CID part rather than a data URI."""
+        context = {'logo_path': self.logo_path, 'logo_cid': LOGO_CID}
+
+        send_branded_email(
+            'Subject', f'<p>Hello</p><img src="cid:{LOGO_CID}">', ['user@example.com'], context
+        )
+
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0].message()
+        self.assertEqual(message.get_content_subtype(), 'related')
+        logo_part = message.get_payload()[-1]
+        self.assertEqual(logo_part['Content-ID'], f'<{LOGO_CID}>')
+        self.assertEqual(logo_part.get_content_type(), 'image/png')
+        self.assertNotIn('base64,', mail.outbox[0].alternatives[0][0])
@@ -0,0 +1,124 @@
+"""Test cases for streaming CSV and JSON exports."""
+import csv
+import io
+import json
+from datetime import date
+
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from booking.admin import UserProfileAdmin
+from booking.exports import iter_values
+from booking.models import UsageAnalytics, UserProfile
+from booking.tests.factories import BookingFactory, ResourceFactory, UserProfileFactory
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+class TestStreamingExports(TestCase):
+    """Test exports stream chunks with related columns joined up front."""
+
+    def setUp(self):
+        self.admin = UserProfileFactory(role='technician', user__username='admin').user
+        self.admin.refresh_from_db()
+        self.client.force_login(self.admin)
+        self.profiles = [UserProfileFactory(role='student', user__username=f'student{n}') for n in range(5)]
+
+    def test_iter_values_chunks_by_key(self):
+        """Test rows are read in keyset chunks, one query each."""
+        queryset = UserProfile.objects.filter(role='student')
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(iter_values(queryset, ['user__username', 'department__name'], chunk_size=2))
+
+        self.assertEqual([row[0] for row in rows], [f'student{n}' for n in range(5)])
+        self.assertEqual(rows[0][1], self.profiles[0].department.name)
+        self.assertEqual(len(queries.captured_queries), 3)
+
+    def test_users_csv(self):
+        """Test the users export streams the lab admin columns in username order."""
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(reverse('booking:lab_admin_users_export'), {'role': 'student'})
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Disposition'], 'attachment; filename="users_export.csv"')
+
+            with CaptureQueriesContext(connection) as queries:
+                rows = list(csv.reader(io.StringIO(read_stream(response))))
+
+        self.assertEqual(rows[0][:5], ['username', 'email', 'first_name', 'last_name', 'role'])
+        self.assertEqual([row[0] for row in rows[1:]], [f'student{n}' for n in range(5)])
+        self.assertEqual(rows[1][4:8], ['Student', self.profiles[0].department.name, 'Yes', 'Yes'])
+        # One query per chunk, none per row
+        self.assertEqual(len(queries.captured_queries), 3)
+
+    def test_users_json(self):
+        """Test ?format=json streams an array of objects."""
+        response = self.client.get(reverse('booking:lab_admin_users_export'), {'format': 'json', 'search': 'student1'})
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        users = json.loads(read_stream(response))
+        self.assertEqual(len(users), 1)
+        self.assertEqual((users[0]['username'], users[0]['role'], users[0]['is_active']), ('student1', 'student', True))
+
+    def test_bookings_export_uses_management_filters(self):
+        """Test the bookings export applies the booking management filters."""
+        resource = ResourceFactory(name='Microscope')
+        BookingFactory(resource=resource, user=self.profiles[0].user, status='approved', title='Wanted')
+        BookingFactory(resource=resource, user=self.profiles[1].user, status='pending')
+        BookingFactory(status='approved')
+
+        response = self.client.get(reverse('booking:lab_admin_bookings_export'), {
+            'resource': resource.pk, 'status': 'approved'
+        })
+
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            (rows[0]['title'], rows[0]['resource'], rows[0]['username'], rows[0]['status']),
+            ('Wanted', 'Microscope', 'student0', 'Approved')
+        )
+        self.assertEqual(rows[0]['no_show'], 'No')
+
+    def test_usage_export(self):
+        """Test daily usage analytics export with a date range."""
+        resource = ResourceFactory(name='Laser')
+        UsageAnalytics.objects.create(resource=resource, date=date(2025, 1, 1), total_bookings=3)
+        UsageAnalytics.objects.create(resource=resource, date=date(2025, 2, 1), total_bookings=5)
+
+        response = self.client.get(reverse('booking:lab_admin_usage_export'), {
+            'format': 'json', 'date_from': '2025-01-15'
+        })
+
+        usage = json.loads(read_stream(response))
+        self.assertEqual(usage, [{
+            'date': '2025-02-01', 'resource': 'Laser', 'total_bookings': 5, 'completed_bookings': 0,
+            'no_show_bookings': 0, 'cancelled_bookings': 0, 'total_booked_minutes': 0,
+            'total_actual_minutes': 0, 'total_wasted_minutes': 0, 'utilization_rate': 0.0,
+            'efficiency_rate': 0.0, 'no_show_rate': 0.0,
+        }])
+
+    def test_invalid_resource_filter_rejected_before_streaming(self):
+        """Test a non-numeric resource id is a 400, not a truncated download."""
+        for name in ('booking:lab_admin_usage_export', 'booking:lab_admin_bookings_export'):
+            response = self.client.get(reverse(name), {'resource': 'abc'})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.streaming)
+
+    def test_admin_export_in_import_format(self):
+        """Test the admin action exports profiles in the import_users_csv format."""
+        request = RequestFactory().post('/')
+        request.user = self.admin
+        queryset = UserProfile.objects.filter(pk=self.profiles[0].pk)
+
+        response = UserProfileAdmin(UserProfile, site).export_users_csv(request, queryset)
+
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        self.assertEqual(rows[0]['username'], 'student0')
+        self.assertEqual(rows[0]['department_code'], self.profiles[0].department.code)
+        self.assertEqual(rows[0]['student_id'], self.profiles[0].student_id or '')
@@ -0,0 +1,289 @@
+"""Test cases for Google Calendar sync."""
+import itertools
+import threading
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.models import (
+    CalendarSyncPreferences, CalendarSyncQueueItem, GoogleCalendarIntegration, GoogleCalendarSyncLog
+)
+from booking.services.google_calendar import CalendarSyncEngine, process_sync_queue, queue_manual_sync
+from booking.tests.factories import BookingFactory, ResourceFactory, UserFactory
+
+
+class FakeCalendarClient:
+    """In-process stand-in for the Calendar API batch client."""
+
+    def __init__(self, fail_titles=(), latency=0.05):
+        self.events = {}
+        self.batches = []
+        self.fail_titles = set(fail_titles)
+        self.latency = latency
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def execute_batch(self, calendar_id, operations):
+        with self._lock:
+            self.batches.append(len(operations))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.latency)
+
+        results = []
+        for operation in operations:
+            body = operation['body']
+            if body and any(title in body['summary'] for title in self.fail_titles):
+                results.append((None, 'Rate Limit Exceeded'))
+            elif operation['action'] == 'created':
+                event_id = f'event{next(self._ids)}'
+                self.events[event_id] = body
+                results.append(({'id': event_id, 'htmlLink': f'https://calendar/{event_id}'}, None))
+            elif operation['action'] == 'updated':
+                self.events[operation['event_id']] = body
+                results.append(({'id': operation['event_id']}, None))
+            else:
+                self.events.pop(operation['event_id'], None)
+                results.append(({}, None))
+
+        with self._lock:
+            self.active -= 1
+        return results
+
+
+class TestCalendarSyncEngine(TestCase):
+    """Test incremental, batched sync against the fake Calendar API."""
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.integration = GoogleCalendarIntegration.objects.create(
+            user=self.user, access_token='access', refresh_token='refresh',
+            token_expires_at=timezone.now() + timedelta(hours=1), google_calendar_id='primary'
+        )
+        resource = ResourceFactory()
+        start = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        self.bookings = [
+            BookingFactory(
+                user=self.user, resource=resource, title=f'Run {n}',
+                start_time=start + timedelta(days=n), end_time=start + timedelta(days=n, hours=1)
+            )
+            for n in range(25)
+        ]
+
+    def _sync(self, client, **kwargs):
+        engine = CalendarSyncEngine(client, batch_size=10, max_workers=3)
+        return engine.sync(self.integration, **kwargs)
+
+    def test_first_sync_creates_in_concurrent_batches(self):
+        """Test all bookings are created in batches with one log insert."""
+        client = FakeCalendarClient()
+        with CaptureQueriesContext(connection) as queries:
+            counts = self._sync(client)
+
+        self.assertEqual(counts['created'], 25)
+        self.assertEqual(sorted(client.batches), [5, 10, 10])
+        self.assertGreater(client.max_active, 1)
+        log_inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT') and 'googlecalendarsynclog' in query['sql']
+        ]
+        self.assertEqual(len(log_inserts), 1)
+        self.assertEqual(GoogleCalendarSyncLog.objects.filter(action='created', status='success').count(), 25)
+        self.integration.refresh_from_db()
+        self.assertIsNotNone(self.integration.last_sync)
+
+    def test_resync_sends_only_changes(self):
+        """Test unchanged bookings are skipped and changes are sent."""
+        client = FakeCalendarClient()
+        self._sync(client)
+
+        self.assertEqual(self._sync(client)['skipped'], 25)
+        self.assertEqual(len(client.batches), 3)
+
+        self.bookings[0].title = 'Renamed run'
+        self.bookings[0].save()
+        self.bookings[1].status = 'cancelled'
+        self.bookings[1].save()
+
+        counts = self._sync(client)
+
+        self.assertEqual((counts['updated'], counts['deleted'], counts['skipped']), (1, 1, 23))
+        self.assertEqual(len(client.events), 24)
+        self.assertIn('Renamed run', [event['summary'] for event in client.events.values()])
+
+    def test_failed_changes_retried(self):
+        """Test errors keep last_sync so failed bookings are sent again."""
+        counts = self._sync(FakeCalendarClient(fail_titles=['Run 3']))
+
+        self.assertEqual((counts['created'], counts['errors']), (24, 1))
+        self.integration.refresh_from_db()
+        self.assertIsNone(self.integration.last_sync)
+        self.assertEqual(self.integration.sync_error_count, 1)
+        self.assertEqual(self.integration.last_error, 'Rate Limit Exceeded')
+
+        counts = self._sync(FakeCalendarClient())
+
+        self.assertEqual((counts['created'], counts['updated'], counts['errors']), (1, 24, 0))
+        self.integration.refresh_from_db()
+        self.assertEqual(self.integration.sync_error_count, 0)
+
+
+class TestCalendarSyncQueue(TestCase):
+    """Test background sync of queued booking changes."""
+
+    def setUp(self):
+        self.client_api = FakeCalendarClient(latency=0)
+        self.start = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        self.resource = ResourceFactory()
+
+    def _integration(self):
+        user = UserFactory()
+        return GoogleCalendarIntegration.objects.create(
+            user=user, access_token='access', refresh_token='refresh',
+            token_expires_at=timezone.now() + timedelta(hours=1), google_calendar_id='primary'
+        )
+
+    def _bookings(self, integration, count):
+        return [
+            BookingFactory(
+                user=integration.user, resource=self.resource, title=f'Run {n}',
+                start_time=self.start + timedelta(days=n), end_time=self.start + timedelta(days=n, hours=1)
+            )
+            for n in range(count)
+        ]
+
+    def test_repeated_edits_merge(self):
+        """Test edits to a queued booking don't add more queue items."""
+        integration = self._integration()
+        booking, = self._bookings(integration, 1)
+
+        booking.title = 'First edit'
+        booking.save()
+        booking.title = 'Second edit'
+        booking.save()
+
+        self.assertEqual(CalendarSyncQueueItem.objects.filter(integration=integration).count(), 1)
+
+    def test_manual_timing_not_queued(self):
+        """Test users who sync manually have nothing queued."""
+        integration = self._integration()
+        CalendarSyncPreferences.objects.create(user=integration.user, auto_sync_timing='manual')
+
+        self._bookings(integration, 1)
+
+        self.assertFalse(CalendarSyncQueueItem.objects.exists())
+
+    def test_queue_processed_in_background(self):
+        """Test queued changes are pushed and removed from the queue."""
+        integration = self._integration()
+        self._bookings(integration, 2)
+
+        results = process_sync_queue(client_factory=lambda integration: self.client_api)
+
+        self.assertEqual(results, {'integrations': 1, 'synced': 2, 'errors': 0})
+        self.assertEqual(len(self.client_api.events), 2)
+        self.assertFalse(CalendarSyncQueueItem.objects.exists())
+
+    def test_token_bucket_limits_each_integration(self):
+        """Test an integration only syncs as many changes as its budget allows."""
+        integration = self._integration()
+        self._bookings(integration, 5)
+
+        with self.settings(GOOGLE_CALENDAR_SYNC_BURST=3, GOOGLE_CALENDAR_SYNC_RATE=0):
+            process_sync_queue(client_factory=lambda integration: self.client_api)
+            self.assertEqual(CalendarSyncQueueItem.objects.count(), 2)
+
+            process_sync_queue(client_factory=lambda integration: self.client_api)
+            self.assertEqual(CalendarSyncQueueItem.objects.count(), 2)
+
+        integration.refresh_from_db()
+        self.assertEqual(integration.sync_tokens, 0)
+
+    def test_failing_integration_backs_off_without_blocking_others(self):
+        """Test errors back off one integration while others keep syncing."""
+        broken = self._integration()
+        healthy = self._integration()
+        self._bookings(broken, 1)
+        self._bookings(healthy, 1)
+
+        def client_factory(integration):
+            if integration.pk == broken.pk:
+                raise ValueError('Unable to refresh access token')
+            return self.client_api
+
+        results = process_sync_queue(client_factory=client_factory)
+
+        self.assertEqual((results['synced'], results['errors']), (1, 1))
+        broken.refresh_from_db()
+        self.assertEqual(broken.sync_error_count, 1)
+        self.assertGreater(broken.next_sync_at, timezone.now())
+        self.assertEqual(CalendarSyncQueueItem.objects.get().integration, broken)
+
+        # Backed off integrations are skipped until their retry time
+        self.assertEqual(process_sync_queue(client_factory=client_factory)['integrations'], 0)
+
+    def test_failing_booking_stops_after_max_attempts(self):
+        """Test a booking that always fails is kept with its error but no longer retried."""
+        integration = self._integration()
+        failing, working = self._bookings(integration, 2)
+        failing.title = 'Broken run'
+        failing.save()
+        client_api = FakeCalendarClient(fail_titles=['Broken'], latency=0)
+
+        with self.settings(GOOGLE_CALENDAR_SYNC_MAX_ATTEMPTS=2, GOOGLE_CALENDAR_SYNC_BACKOFF=0):
+            process_sync_queue(client_factory=lambda integration: client_api)
+            process_sync_queue(client_factory=lambda integration: client_api)
+            self.assertEqual(
+                process_sync_queue(client_factory=lambda integration: client_api)['integrations'], 0
+            )
+
+        item = CalendarSyncQueueItem.objects.get()
+        self.assertEqual(item.booking, failing)
+        self.assertEqual((item.attempts, item.last_error), (2, 'Rate Limit Exceeded'))
+        self.assertEqual(client_api.batches, [2, 1])
+
+        # A new change to the booking gives it another try
+        failing.title = 'Fixed run'
+        failing.save()
+        item.refresh_from_db()
+        self.assertEqual((item.attempts, item.last_error), (0, ''))
+
+    def test_manual_sync_queues_changes_since_last_sync(self):
+        """Test a manual sync only queues bookings changed since the last sync."""
+        integration = self._integration()
+        CalendarSyncPreferences.objects.create(user=integration.user, auto_sync_timing='manual')
+        unchanged, changed = self._bookings(integration, 2)
+        CalendarSyncEngine(self.client_api).sync(integration)
+
+        changed.title = 'Moved run'
+        changed.save()
+
+        self.assertEqual(queue_manual_sync(integration), 1)
+        self.assertEqual(CalendarSyncQueueItem.objects.get().booking, changed)
+        self.assertEqual(queue_manual_sync(integration, full=True), 2)
+
+    def test_preference_change_resyncs_existing_events(self):
+        """Test changing the event title preferences rebuilds events already pushed."""
+        integration = self._integration()
+        preferences = CalendarSyncPreferences.objects.create(user=integration.user, auto_sync_timing='immediate')
+        self._bookings(integration, 2)
+        process_sync_queue(client_factory=lambda integration: self.client_api)
+
+        preferences.notify_sync_success = True
+        preferences.save()
+        self.assertFalse(CalendarSyncQueueItem.objects.exists())
+
+        preferences.event_prefix = '[Imaging]'
+        preferences.save()
+        self.assertEqual(CalendarSyncQueueItem.objects.count(), 2)
+        integration.refresh_from_db()
+        self.assertIsNone(integration.last_sync)
+
+        process_sync_queue(client_factory=lambda integration: self.client_api)
+        self.assertTrue(all(event['summary'].startswith('[Imaging] ') for event in self.client_api.events.values()))
@@ -0,0 +1,100 @@
+"""Test cases for background-sampled health checks."""
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from booking.health import SAMPLE_CACHE_KEY, get_latest_sample, record_system_sample
+from booking.tests.factories import UserProfileFactory
+from booking.views import site_admin_health_check_view
+
+
+class TestHealthSampler(TestCase):
+    """Test samples are recorded without blocking."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_sample_does_not_block_on_cpu(self):
+        """Test CPU usage is read without a sampling interval."""
+        with mock.patch('psutil.cpu_percent', return_value=12.5) as cpu_percent:
+            sample = record_system_sample()
+
+        cpu_percent.assert_called_once_with(interval=None)
+        self.assertEqual(sample['cpu_percent'], 12.5)
+        self.assertIsNotNone(sample['db_latency_ms'])
+
+        latest, age = get_latest_sample()
+        self.assertEqual(latest, sample)
+        self.assertLess(age, 5)
+
+    def test_missing_sample(self):
+        """Test no sample is reported before the sampler has run."""
+        self.assertEqual(get_latest_sample(), (None, None))
+
+
+class TestHealthEndpoints(TestCase):
+    """Test the health check view and probes."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin = UserProfileFactory(role='sysadmin').user
+        self.admin.refresh_from_db()
+        self.factory = RequestFactory()
+
+    def _health_check(self):
+        request = self.factory.post('/site-admin/health-check/')
+        request.user = self.admin
+        with mock.patch('psutil.cpu_percent', side_effect=AssertionError('unexpected CPU sample')):
+            response = site_admin_health_check_view(request)
+        return json.loads(response.content)['checks']['system_resources']
+
+    def _store_sample(self, age_seconds):
+        cache.set(SAMPLE_CACHE_KEY, {
+            'sampled_at': (timezone.now() - timedelta(seconds=age_seconds)).isoformat(),
+            'cpu_percent': 5.0, 'memory_percent': 40.0, 'disk_percent': 50.0,
+            'db_latency_ms': 0.4, 'warnings': [],
+        })
+
+    def test_health_check_reads_latest_sample(self):
+        """Test the view reports the cached sample and its age."""
+        self._store_sample(age_seconds=3)
+
+        result = self._health_check()
+
+        self.assertEqual(result['status'], 'healthy')
+        self.assertEqual(result['cpu_percent'], 5.0)
+        self.assertFalse(result['stale'])
+        self.assertGreaterEqual(result['sample_age_seconds'], 3)
+
+    def test_stale_sample_is_a_warning(self):
+        """Test old samples are flagged as stale instead of measured in the request."""
+        self._store_sample(age_seconds=600)
+
+        result = self._health_check()
+
+        self.assertEqual(result['status'], 'warning')
+        self.assertTrue(result['stale'])
+        self.assertEqual(result['cpu_percent'], 5.0)
+
+    def test_missing_sample_is_a_warning(self):
+        """Test no sample means unknown resources, not a made-up reading."""
+        result = self._health_check()
+
+        self.assertEqual(result['status'], 'warning')
+        self.assertNotIn('cpu_percent', result)
+        self.assertEqual(get_latest_sample(), (None, None))
+
+    def test_probes(self):
+        """Test liveness and readiness need no login or license."""
+        self.assertEqual(self.client.get('/health/live/').status_code, 200)
+
+        response = self.client.get('/health/ready/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['checks']['database']['status'], 'ok')
@@ -0,0 +1,227 @@
+"""Test cases for the system log viewer."""
+import io
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from booking import log_viewer as log_viewer_module
+from booking.log_viewer import LOG_PARSERS, LogEntry, LogViewer, decode_cursor, read_lines_reverse
+
+
+class TestReadLinesReverse(TestCase):
+    """Test the block-wise reverse line reader."""
+
+    def test_lines_and_offsets_across_blocks(self):
+        """Test lines spanning block boundaries are returned newest first."""
+        data = b'first\nsecond line\n\nthird\n'
+        with mock.patch.object(log_viewer_module, 'BLOCK_SIZE', 4):
+            lines = list(read_lines_reverse(io.BytesIO(data), 0, len(data)))
+
+        self.assertEqual(
+            [line for _, line in lines],
+            [b'third', b'', b'second line', b'first']
+        )
+        for offset, line in lines:
+            self.assertEqual(data[offset:offset + len(line)], line)
+
+    def test_reads_only_requested_range(self):
+        """Test lines before the start offset are not returned."""
+        data = b'old\nnew one\nnew two\n'
+        lines = list(read_lines_reverse(io.BytesIO(data), 4, len(data)))
+
+        self.assertEqual([line for _, line in lines], [b'new two', b'new one'])
+
+
+class TestLogViewerCursor(TestCase):
+    """Test incremental reads of file sources using cursors."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.viewer = LogViewer()
+        self.viewer.log_sources = {
+            'app': {'name': 'App Log', 'path': self.path, 'type': 'file'}
+        }
+
+    def _write(self, *lines, mode='a'):
+        stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with open(self.path, mode) as log_file:
+            for line in lines:
+                log_file.write(f'{stamp} {line}\n')
+
+    def test_follow_up_returns_only_new_lines(self):
+        """Test a cursor limits the next read to appended lines."""
+        self._write('INFO started', 'ERROR failed')
+
+        logs, cursor = self.viewer.get_logs_since()
+        self.assertEqual([log.message for log in logs][::-1], ['INFO started', 'ERROR failed'])
+
+        self._write('WARNING slow')
+        logs, cursor = self.viewer.get_logs_since(cursor)
+        self.assertEqual([log.message for log in logs], ['WARNING slow'])
+        self.assertEqual(logs[0].level, 'WARNING')
+
+        logs, _ = self.viewer.get_logs_since(cursor)
+        self.assertEqual(logs, [])
+
+    def test_burst_larger_than_page_is_not_skipped(self):
+        """Test lines beyond max_lines are returned by the following polls."""
+        self._write('INFO start')
+        _, cursor = self.viewer.get_logs_since(max_lines=3)
+
+        self._write(*[f'INFO burst {n}' for n in range(7)])
+        seen = []
+        for _ in range(3):
+            logs, cursor = self.viewer.get_logs_since(cursor, max_lines=3)
+            self.assertLessEqual(len(logs), 3)
+            seen.extend(log.message for log in reversed(logs))
+
+        self.assertEqual(seen, [f'INFO burst {n}' for n in range(7)])
+        logs, _ = self.viewer.get_logs_since(cursor, max_lines=3)
+        self.assertEqual(logs, [])
+
+    def test_merge_trim_keeps_unreturned_lines(self):
+        """Test entries trimmed from the merged page stay behind the cursor."""
+        handle, other_path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, other_path)
+        self.viewer.log_sources['other'] = {'name': 'Other Log', 'path': other_path, 'type': 'file'}
+        _, cursor = self.viewer.get_logs_since()
+
+        base = datetime.now().replace(microsecond=0)
+        with open(self.path, 'a') as app_log, open(other_path, 'a') as other_log:
+            for n in range(4):
+                app_log.write(f'{base + timedelta(seconds=2 * n):%Y-%m-%d %H:%M:%S} INFO app {n}\n')
+                other_log.write(f'{base + timedelta(seconds=2 * n + 1):%Y-%m-%d %H:%M:%S} INFO other {n}\n')
+
+        logs, cursor = self.viewer.get_logs_since(cursor, max_lines=3)
+        self.assertEqual([log.message for log in logs], ['INFO app 1', 'INFO other 0', 'INFO app 0'])
+
+        logs, _ = self.viewer.get_logs_since(cursor, max_lines=10)
+        self.assertEqual(
+            [log.message for log in logs],
+            ['INFO other 3', 'INFO app 3', 'INFO other 2', 'INFO app 2', 'INFO other 1']
+        )
+
+    def test_partial_line_is_deferred(self):
+        """Test a line still being written is returned on the next poll."""
+        self._write('INFO complete')
+        with open(self.path, 'a') as log_file:
+            log_file.write('INFO part')
+
+        logs, cursor = self.viewer.get_logs_since()
+        self.assertEqual(len(logs), 1)
+
+        with open(self.path, 'a') as log_file:
+            log_file.write('ial\n')
+        logs, _ = self.viewer.get_logs_since(cursor)
+        self.assertEqual([log.message for log in logs], ['INFO partial'])
+
+    def test_truncated_file_is_reread(self):
+        """Test a truncated file is read from the start again."""
+        self._write('INFO one', 'INFO two', 'INFO three')
+        _, cursor = self.viewer.get_logs_since()
+
+        self._write('INFO fresh', mode='w')
+        logs, _ = self.viewer.get_logs_since(cursor)
+
+        self.assertEqual([log.message for log in logs], ['INFO fresh'])
+
+    def test_filters_and_limit(self):
+        """Test level filters are applied while scanning."""
+        self._write(*[f'INFO line {n}' for n in range(20)], 'ERROR broken')
+
+        logs = self.viewer.get_logs(level='ERROR', max_lines=5)
+
+        self.assertEqual([log.message for log in logs], ['ERROR broken'])
+
+    def test_invalid_cursor(self):
+        """Test undecodable cursors are rejected."""
+        with self.assertRaises(ValueError):
+            decode_cursor('not a cursor')
+
+
+class TestLogParsers(TestCase):
+    """Test the per-format line parsers."""
+
+    def test_nginx_access_level_from_status(self):
+        """Test server errors in access logs are reported as errors."""
+        line = '10.0.0.1 - - [13/Jul/2025:14:17:38 +0000] "GET /api/ HTTP/1.1" 502 157 "-" "curl"'
+
+        entry = LOG_PARSERS['nginx_access'](line, 0, 'Nginx Access Log')
+
+        self.assertEqual(entry.level, 'ERROR')
+        self.assertEqual(entry.timestamp, datetime(2025, 7, 13, 14, 17, 38))
+
+    def test_nginx_error(self):
+        """Test nginx error severity and message are extracted."""
+        entry = LOG_PARSERS['nginx_error'](
+            '2025/07/13 14:17:38 [warn] 123#0: upstream slow', 0, 'Nginx Error Log'
+        )
+
+        self.assertEqual(entry.level, 'WARNING')
+        self.assertEqual(entry.message, '123#0: upstream slow')
+
+    def test_postgresql(self):
+        """Test PostgreSQL severities map to log levels."""
+        entry = LOG_PARSERS['postgresql'](
+            '2025-07-13 14:17:38.123 UTC [4242] FATAL:  password authentication failed', 0, 'PostgreSQL'
+        )
+
+        self.assertEqual(entry.level, 'CRITICAL')
+        self.assertEqual(entry.message, 'password authentication failed')
+
+    def test_syslog_picks_most_severe_keyword(self):
+        """Test the most severe level keyword wins."""
+        entry = LOG_PARSERS['syslog'](
+            'Jul  3 09:01:02 host app[1]: info: retry after critical failure', 0, 'System Log'
+        )
+
+        self.assertEqual(entry.level, 'CRITICAL')
+        self.assertEqual((entry.timestamp.month, entry.timestamp.day), (7, 3))
+
+    def test_django_ignores_unmatched_lines(self):
+        """Test continuation lines in Django logs are skipped."""
+        self.assertIsNone(LOG_PARSERS['django']('Traceback (most recent call last):', 0, 'Django'))
+
+
+class TestLogViewerCollection(TestCase):
+    """Test concurrent collection and merging across sources."""
+
+    def setUp(self):
+        self.viewer = LogViewer()
+        self.viewer.log_sources = {
+            'fast': {'name': 'Fast', 'path': 'fast', 'type': 'file'},
+            'other': {'name': 'Other', 'path': 'other', 'type': 'file'},
+            'slow': {'name': 'Slow', 'path': 'slow', 'type': 'file'},
+        }
+        self.now = datetime.now()
+
+    def _read_source(self, source_key, source_config, *args):
+        if source_key == 'slow':
+            time.sleep(2)
+        offsets = {'fast': [1, 3, 5], 'other': [2, 4], 'slow': [0]}[source_key]
+        entries = [
+            LogEntry(self.now - timedelta(minutes=minutes), 'INFO', source_key, f'{source_key} {minutes}', minutes)
+            for minutes in offsets
+        ]
+        return entries, [source_key, len(entries)]
+
+    def test_merges_by_timestamp_and_skips_slow_sources(self):
+        """Test entries are merged newest first and slow sources time out."""
+        self.viewer.time_budget = 0.5
+        with mock.patch.object(self.viewer, '_read_source', side_effect=self._read_source):
+            started = time.monotonic()
+            logs, cursor = self.viewer.get_logs_since(max_lines=4)
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 1.5)
+        messages = [log.message for log in logs]
+        self.assertEqual(messages[0], 'Timed out after 0.5s; showing other sources')
+        self.assertEqual(messages[1:], ['fast 1', 'other 2', 'fast 3'])
+        self.assertEqual(set(decode_cursor(cursor)), {'fast', 'other'})
@@ -0,0 +1,96 @@
+"""Test cases for the batch predictive maintenance analysis."""
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from booking.maintenance_service import MaintenancePredictionService
+from booking.models import Booking, MaintenanceAlert
+from booking.tests.factories import MaintenanceFactory, ResourceFactory, UserFactory
+
+
+class TestMaintenancePredictionService(TestCase):
+    """Test batch analysis across resources."""
+
+    def setUp(self):
+        self.service = MaintenancePredictionService()
+        self.user = UserFactory()
+
+    def _book_week(self, resource, hours_per_day):
+        """Create five approved weekday bookings in a week three weeks ago."""
+        today = timezone.localtime().replace(hour=8, minute=0, second=0, microsecond=0)
+        monday = today - timedelta(days=today.weekday(), weeks=3)
+        Booking.objects.bulk_create([
+            Booking(
+                resource=resource, user=self.user, title='Run',
+                start_time=monday + timedelta(days=day),
+                end_time=monday + timedelta(days=day, hours=hours_per_day),
+                status='approved'
+            )
+            for day in range(5)
+        ])
+        return monday
+
+    def test_high_usage_week_alert(self):
+        """Test weekly usage is labelled with ISO year and week."""
+        busy = ResourceFactory()
+        quiet = ResourceFactory()
+        monday = self._book_week(busy, hours_per_day=9)
+        self._book_week(quiet, hours_per_day=2)
+
+        results = self.service.analyze_resources([busy, quiet])
+
+        iso_year, iso_week, _ = monday.isocalendar()
+        busy_titles = [alert.title for alert in results[0]['alerts']]
+        self.assertIn(f"High Usage Week {iso_year}-W{iso_week:02d}", busy_titles)
+        self.assertEqual(results[1]['alerts'], [])
+
+    def test_alerts_are_not_duplicated(self):
+        """Test re-running analysis refreshes existing alerts."""
+        resource = ResourceFactory()
+        self._book_week(resource, hours_per_day=9)
+
+        self.service.analyze_resources([resource])
+        self.service.analyze_resources([resource])
+
+        self.assertEqual(MaintenanceAlert.objects.filter(resource=resource).count(), 1)
+
+    def test_failure_prediction(self):
+        """Test failure intervals drive the predicted failure date."""
+        resource = ResourceFactory()
+        now = timezone.now()
+        for days_ago in (90, 60, 30):
+            start = now - timedelta(days=days_ago, hours=2)
+            MaintenanceFactory(
+                resource=resource, maintenance_type='corrective',
+                start_time=start, end_time=start + timedelta(hours=1),
+                status='completed', completed_at=start + timedelta(hours=1)
+            )
+
+        analysis = self.service.analyze_resource(resource)
+
+        predictions = analysis['predictions']
+        self.assertLessEqual(predictions['days_to_predicted_failure'], 0)
+        self.assertAlmostEqual(predictions['failure_probability'], 1.0)
+        resource.maintenance_analytics.refresh_from_db()
+        self.assertIsNotNone(resource.maintenance_analytics.next_failure_prediction)
+
+    def test_failing_resource_does_not_drop_batch(self):
+        """Test one failing resource is skipped without losing the rest of its batch."""
+        resources = [ResourceFactory() for _ in range(3)]
+        bad = resources[1]
+        original = self.service._generate_recommendations
+
+        def recommendations(resource, analytics):
+            if resource.id == bad.id:
+                raise ValueError('boom')
+            return original(resource, analytics)
+
+        with mock.patch.object(self.service, '_generate_recommendations', side_effect=recommendations):
+            with self.assertLogs('booking.maintenance_service', level='ERROR') as logs:
+                results = self.service.analyze_all_resources()
+
+        analysed = [result['resource'].id for result in results]
+        self.assertEqual(analysed, [resources[0].id, resources[2].id])
+        self.assertIn(f"Error analyzing resource {bad.id}: boom", logs.output[-1])
@@ -3,12 +3,18 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from datetime import datetime, time, timedelta
 
-from booking.models import UserProfile, Resource, Booking, BookingTemplate, ApprovalRule
+from booking.models import (
+    UserProfile, Resource, Booking, BookingTemplate, ApprovalRule, MaintenanceAnalytics,
+    AccessRequest, ApprovalStatistics, BookingHistory, OutboxEvent, ResourceResponsible
+)
 from booking.tests.factories import (
     UserFactory, UserProfileFactory, ResourceFactory, 
-    BookingFactory, BookingTemplateFactory, ApprovalRuleFactory
+    BookingFactory, BookingTemplateFactory, ApprovalRuleFactory, MaintenanceFactory,
+    AccessRequestFactory
 )
 
 
@@ -207,6 +213,69 @@ class TestBooking(TestCase):
         self.assertFalse(past_booking.can_be_cancelled)
 
 
+class TestBookingChangeTracking(TestCase):
+    """Test dirty-field tracking and the history it produces."""
+
+    def setUp(self):
+        self.booking = Booking.objects.get(pk=BookingFactory(title='Original').pk)
+
+    def test_dirty_fields(self):
+        """Test only fields changed since loading are reported."""
+        self.assertEqual(self.booking.get_dirty_fields(), {})
+
+        self.booking.title = 'Renamed'
+
+        self.assertEqual(self.booking.get_dirty_fields(), {'title': ('Original', 'Renamed')})
+
+    def test_save_resets_dirty_fields(self):
+        """Test saved values become the new baseline."""
+        self.booking.title = 'Renamed'
+        self.booking.save()
+
+        self.assertEqual(self.booking.get_dirty_fields(), {})
+
+    def test_update_logged_without_refetch(self):
+        """Test history is written from the diff without re-reading the booking."""
+        self.booking.status = 'cancelled'
+        with CaptureQueriesContext(connection) as queries:
+            self.booking.save()
+
+        booking_selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "booking_booking"' in query['sql']
+        ]
+        self.assertEqual(booking_selects, [])
+        history = BookingHistory.objects.get(booking=self.booking, action='updated')
+        self.assertEqual(history.old_values, {'status': 'pending'})
+        self.assertEqual(history.new_values, {'status': 'cancelled'})
+        event = OutboxEvent.objects.get(event_type='booking_status_changed')
+        self.assertEqual(event.payload['old_status'], 'pending')
+
+    def test_noop_save_not_logged(self):
+        """Test saves that change nothing meaningful write no history."""
+        self.booking.check_in_reminder_sent = True
+        self.booking.save()
+        self.booking.save()
+
+        self.assertFalse(BookingHistory.objects.filter(action='updated').exists())
+
+    def test_in_place_json_change_detected(self):
+        """Test mutating a JSON field counts as a change."""
+        self.booking.dependency_conditions['requires'] = 'sample'
+
+        self.assertIn('dependency_conditions', self.booking.get_dirty_fields())
+
+    def test_deferred_fields_not_tracked(self):
+        """Test only the loaded fields of a partial booking are snapshotted."""
+        booking = Booking.objects.only('title', 'dependency_conditions').get(pk=self.booking.pk)
+
+        self.assertEqual(set(booking._loaded_values), {'id', 'title', 'dependency_conditions'})
+        booking.dependency_conditions['requires'] = 'sample'
+        booking.title = 'Renamed'
+
+        self.assertEqual(set(booking.get_dirty_fields()), {'title', 'dependency_conditions'})
+
+
 class TestBookingTemplate(TestCase):
     """Test BookingTemplate model functionality."""
     
@@ -293,4 +362,156 @@ class TestApprovalRule(TestCase):
         )
         
         user = UserProfileFactory(role='student')
-        self.assertFalse(rule.applies_to_user(user))
\ No newline at end of file
+        self.assertFalse(rule.applies_to_user(user))
+
+
+class TestMaintenanceAnalytics(TestCase):
+    """Test set-based maintenance metric calculation."""
+    
+    def _completed(self, resource, maintenance_type, start, hours=2, cost=None):
+        return MaintenanceFactory(
+            resource=resource,
+            maintenance_type=maintenance_type,
+            start_time=start,
+            end_time=start + timedelta(hours=hours),
+            status='completed',
+            completed_at=start + timedelta(hours=hours),
+            actual_cost=cost
+        )
+    
+    def test_calculate_metrics(self):
+        """Test counts, costs, downtime and first-time fix rate."""
+        resource = ResourceFactory()
+        base = timezone.now() - timedelta(days=200)
+        self._completed(resource, 'preventive', base, hours=2, cost=100)
+        self._completed(resource, 'corrective', base + timedelta(days=50), hours=4, cost=300)
+        # Repeat corrective work 10 days later marks the previous fix as failed
+        self._completed(resource, 'corrective', base + timedelta(days=60), hours=6)
+        MaintenanceFactory(resource=resource, maintenance_type='emergency',
+                           start_time=timezone.now() + timedelta(days=5),
+                           end_time=timezone.now() + timedelta(days=5, hours=1))
+        
+        analytics = MaintenanceAnalytics.objects.create(resource=resource)
+        analytics.calculate_metrics()
+        analytics.refresh_from_db()
+        
+        self.assertEqual(analytics.total_maintenance_count, 4)
+        self.assertEqual(analytics.preventive_maintenance_count, 1)
+        self.assertEqual(analytics.corrective_maintenance_count, 2)
+        self.assertEqual(analytics.emergency_maintenance_count, 1)
+        self.assertEqual(analytics.total_maintenance_cost, 400)
+        self.assertEqual(analytics.average_maintenance_cost, 200)
+        self.assertEqual(analytics.preventive_cost_ratio, 25)
+        self.assertEqual(analytics.total_downtime_hours, 12)
+        self.assertEqual(analytics.average_repair_time, timedelta(hours=4))
+        self.assertAlmostEqual(float(analytics.first_time_fix_rate), 66.67, places=2)
+    
+    def test_calculate_metrics_bulk(self):
+        """Test bulk calculation creates rows and skips fresh analytics."""
+        busy = ResourceFactory()
+        idle = ResourceFactory()
+        fresh = ResourceFactory()
+        start = timezone.now() - timedelta(days=30)
+        self._completed(busy, 'preventive', start, cost=50)
+        self._completed(fresh, 'preventive', start, cost=75)
+        MaintenanceAnalytics.objects.create(resource=fresh)
+        
+        updated = MaintenanceAnalytics.calculate_metrics_bulk(
+            [busy.id, idle.id, fresh.id],
+            stale_before=timezone.now() - timedelta(hours=24)
+        )
+        
+        self.assertEqual(updated, 1)
+        self.assertEqual(MaintenanceAnalytics.objects.filter(resource__in=[busy, idle, fresh]).count(), 3)
+        self.assertEqual(busy.maintenance_analytics.total_maintenance_cost, 50)
+        self.assertEqual(busy.maintenance_analytics.first_time_fix_rate, 100)
+        self.assertEqual(MaintenanceAnalytics.objects.get(resource=fresh).total_maintenance_count, 0)
+
+
+class TestApprovalStatistics(TestCase):
+    """Test aggregate-based approval statistics."""
+    
+    def setUp(self):
+        self.resource = ResourceFactory()
+        self.approver = UserFactory()
+        now = timezone.now()
+        
+        for hours, status in ((2, 'approved'), (6, 'rejected')):
+            request = AccessRequestFactory(resource=self.resource, status=status)
+            AccessRequest.objects.filter(pk=request.pk).update(
+                reviewed_by=self.approver,
+                created_at=now,
+                reviewed_at=now + timedelta(hours=hours)
+            )
+        AccessRequestFactory(resource=self.resource, status='pending')
+        self.period_start = timezone.localdate().replace(day=1)
+    
+    def test_generate_statistics(self):
+        """Test counts and response times for a resource."""
+        with self.assertNumQueries(3):
+            stats = ApprovalStatistics.generate_statistics(
+                resource=self.resource, period_start=self.period_start
+            )
+        
+        self.assertEqual(stats['access_requests_received'], 3)
+        self.assertEqual(stats['access_requests_approved'], 1)
+        self.assertEqual(stats['access_requests_rejected'], 1)
+        self.assertEqual(stats['access_requests_pending'], 1)
+        self.assertAlmostEqual(stats['avg_response_time_hours'], 4, places=2)
+        self.assertAlmostEqual(stats['min_response_time_hours'], 2, places=2)
+        self.assertAlmostEqual(stats['max_response_time_hours'], 6, places=2)
+    
+    def test_generate_statistics_batch(self):
+        """Test batch mode fills one row per resource and approver."""
+        written = ApprovalStatistics.generate_statistics_batch(period_start=self.period_start)
+        
+        self.assertEqual(written, 1)
+        stat = ApprovalStatistics.objects.get(resource=self.resource, approver=self.approver)
+        self.assertEqual(stat.access_requests_received, 2)
+        self.assertEqual(stat.access_requests_approved, 1)
+        self.assertAlmostEqual(stat.avg_response_time_hours, 4, places=2)
+        
+        # Re-running updates the existing row instead of duplicating it
+        ApprovalStatistics.generate_statistics_batch(period_start=self.period_start)
+        self.assertEqual(ApprovalStatistics.objects.filter(resource=self.resource).count(), 1)
+    
+    def test_generate_statistics_batch_counts_pending_for_resource_approver(self):
+        """Test pending and overdue requests land on the resource's access approver."""
+        ResourceResponsible.objects.create(
+            resource=self.resource, user=self.approver, assigned_by=self.approver
+        )
+        last_month = (self.period_start - timedelta(days=1)).replace(day=1)
+        overdue = AccessRequestFactory(resource=self.resource, status='pending')
+        AccessRequest.objects.filter(pk=overdue.pk).update(
+            created_at=timezone.make_aware(datetime.combine(last_month, time(12)))
+        )
+        
+        ApprovalStatistics.generate_statistics_batch(period_start=self.period_start)
+        ApprovalStatistics.generate_statistics_batch(period_start=last_month)
+        
+        current = ApprovalStatistics.objects.get(
+            resource=self.resource, approver=self.approver, period_start=self.period_start
+        )
+        self.assertEqual(current.access_requests_pending, 1)
+        previous = ApprovalStatistics.objects.get(
+            resource=self.resource, approver=self.approver, period_start=last_month
+        )
+        self.assertEqual(previous.access_requests_pending, 1)
+        self.assertEqual(previous.overdue_items, 1)
+        stats = ApprovalStatistics.generate_statistics(
+            resource=self.resource, approver=self.approver, period_start=last_month
+        )
+        self.assertEqual(stats['access_requests_pending'], 1)
+        self.assertEqual(stats['overdue_items'], 1)
+    
+    def test_generate_statistics_batch_resets_inactive_rows(self):
+        """Test rows for pairs with no activity left are zeroed on re-run."""
+        ApprovalStatistics.generate_statistics_batch(period_start=self.period_start)
+        AccessRequest.objects.filter(reviewed_by=self.approver).delete()
+        
+        ApprovalStatistics.generate_statistics_batch(period_start=self.period_start)
+        
+        stat = ApprovalStatistics.objects.get(resource=self.resource, approver=self.approver)
+        self.assertEqual(stat.access_requests_received, 0)
+        self.assertEqual(stat.access_requests_approved, 0)
+        self.assertEqual(stat.avg_response_time_hours, 0)
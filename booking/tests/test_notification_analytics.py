@@ -0,0 +1,146 @@
+"""Test cases for notification analytics aggregation."""
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from booking.models import Notification
+from booking.notification_analytics import NotificationAnalytics
+from booking.views import site_admin_notification_analytics_ajax
+from booking.tests.factories import UserFactory, UserProfileFactory
+
+
+class TestNotificationAnalytics(TestCase):
+    """Test volume series and aggregate statistics."""
+
+    def setUp(self):
+        cache.clear()
+        self.analytics = NotificationAnalytics()
+        self.user = UserFactory()
+        self.now = timezone.now()
+
+    def _notify(self, status='sent', days_ago=0, **kwargs):
+        notification = Notification.objects.create(
+            user=self.user, notification_type=kwargs.pop('notification_type', 'booking_reminder'),
+            title='Reminder', message='Reminder', delivery_method='in_app', status=status, **kwargs
+        )
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=self.now - timedelta(days=days_ago, minutes=1)
+        )
+        return notification
+
+    def test_volume_series_fills_empty_days(self):
+        """Test daily series has a bucket per day with conditional counts."""
+        self._notify('sent', days_ago=1)
+        self._notify('failed', days_ago=1)
+        self._notify('read', days_ago=3)
+
+        with self.assertNumQueries(1):
+            series = self.analytics.get_volume_series(self.now - timedelta(days=4), self.now)
+
+        self.assertEqual(len(series), 5)
+        by_date = {bucket['date']: bucket for bucket in series}
+        one_day_ago = timezone.localtime(self.now - timedelta(days=1)).date()
+        three_days_ago = timezone.localtime(self.now - timedelta(days=3)).date()
+        self.assertEqual(by_date[one_day_ago]['count'], 2)
+        self.assertEqual(by_date[one_day_ago]['failed'], 1)
+        self.assertEqual(by_date[three_days_ago]['read'], 1)
+        self.assertEqual(sum(bucket['count'] for bucket in series), 3)
+
+    def test_weekly_series(self):
+        """Test weekly buckets start on Monday."""
+        self._notify(days_ago=0)
+        self._notify(days_ago=14)
+
+        series = self.analytics.get_volume_series(
+            self.now - timedelta(days=20), self.now, granularity='week'
+        )
+
+        self.assertTrue(all(bucket['date'].weekday() == 0 for bucket in series))
+        self.assertEqual(sum(bucket['count'] for bucket in series), 2)
+
+    def test_invalid_granularity(self):
+        """Test unsupported granularity is rejected."""
+        with self.assertRaises(ValueError):
+            self.analytics.get_volume_series(granularity='minute')
+
+    def test_notification_stats_are_cached(self):
+        """Test repeated stats requests are served from the cache."""
+        self._notify('sent')
+        self._notify('failed')
+        start = self.now - timedelta(days=7)
+
+        with self.assertNumQueries(4):
+            stats = self.analytics.get_notification_stats(start=start, end=self.now)
+        with self.assertNumQueries(0):
+            self.analytics.get_notification_stats(start=start, end=self.now)
+
+        self.assertEqual(stats['total_notifications'], 2)
+        self.assertEqual(stats['failed_notifications'], 1)
+        self.assertEqual(stats['delivery_rate'], 50.0)
+
+    def test_default_period_stats_are_cached(self):
+        """Test calls without an explicit end share a cache entry."""
+        self._notify('sent')
+        minute = self.now.replace(second=0, microsecond=0)
+
+        with mock.patch('django.utils.timezone.now', return_value=minute + timedelta(seconds=5)):
+            with self.assertNumQueries(4):
+                stats = self.analytics.get_notification_stats(days=7)
+        with mock.patch('django.utils.timezone.now', return_value=minute + timedelta(seconds=50)):
+            with self.assertNumQueries(0):
+                self.analytics.get_notification_stats(days=7)
+
+        self.assertEqual(stats['total_notifications'], 1)
+
+    def test_escalation_levels(self):
+        """Test escalations are counted per level in one aggregate."""
+        for level in (1, 1, 2):
+            self._notify(
+                notification_type='escalation_notification',
+                metadata={'escalation_level': level, 'request_type': 'access'}
+            )
+
+        stats = self.analytics.get_escalation_stats()
+
+        self.assertEqual(stats['total_escalations'], 3)
+        self.assertEqual(
+            [level['count'] for level in stats['escalation_levels']],
+            [2, 1, 0]
+        )
+
+
+class TestNotificationAnalyticsEndpoint(TestCase):
+    """Test the site admin notification analytics endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = UserProfileFactory(role='sysadmin').user
+        self.admin.refresh_from_db()
+        self.factory = RequestFactory()
+
+    def _get(self, params):
+        request = self.factory.get('/site-admin/notifications/analytics/', params)
+        request.user = self.admin
+        return site_admin_notification_analytics_ajax(request)
+
+    def test_hourly_series(self):
+        """Test an hourly series is returned for an explicit range."""
+        end = timezone.now()
+        start = end - timedelta(hours=5)
+
+        response = self._get({
+            'start': start.isoformat(), 'end': end.isoformat(), 'granularity': 'hour'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(len(json.loads(response.content)['series']), (6, 7))
+
+    def test_rejects_invalid_granularity(self):
+        """Test an unknown granularity returns a client error."""
+        response = self._get({'granularity': 'minute'})
+
+        self.assertEqual(response.status_code, 400)
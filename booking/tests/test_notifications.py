@@ -0,0 +1,173 @@
+"""Test cases for the notification service email delivery."""
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from booking.models import EmailTemplate, Notification, NotificationPreference
+from booking.notifications import NotificationService
+from booking.tests.factories import UserFactory
+
+
+class TestEmailTemplateCompilation(TestCase):
+    """Test compiled templates are reused until the template changes."""
+
+    def setUp(self):
+        self.template = EmailTemplate.objects.create(
+            name='Reminder', notification_type='booking_reminder',
+            subject_template='Hi {{ name }}', html_template='<p>{{ name }}</p>',
+            text_template='{{ name }}'
+        )
+
+    def test_compiled_templates_are_reused(self):
+        """Test the same compiled templates are returned for the same version."""
+        first = EmailTemplate.objects.get(pk=self.template.pk).get_compiled_templates()
+        second = EmailTemplate.objects.get(pk=self.template.pk).get_compiled_templates()
+
+        self.assertIs(first, second)
+
+    def test_saving_template_recompiles(self):
+        """Test an edited template is compiled again."""
+        self.template.render_subject({'name': 'Ada'})
+
+        self.template.subject_template = 'Hello {{ name }}'
+        self.template.save()
+
+        self.assertEqual(self.template.render_subject({'name': 'Ada'}), 'Hello Ada')
+
+
+class TestEmailBatchSending(TestCase):
+    """Test pending emails are sent over a shared connection."""
+
+    def setUp(self):
+        self.service = NotificationService()
+        self.users = UserFactory.create_batch(3)
+        EmailTemplate.objects.create(
+            name='Reminder', notification_type='booking_reminder',
+            subject_template='Reminder: {{ notification.title }}',
+            html_template='<p>{{ notification.message }}</p>',
+            text_template='{{ notification.message }}'
+        )
+        self.notifications = [
+            Notification.objects.create(
+                user=user, notification_type='booking_reminder', title='Run',
+                message='Your booking starts soon', delivery_method='email'
+            )
+            for user in self.users
+        ]
+
+    def test_batch_reuses_one_connection(self):
+        """Test all emails in a batch share one opened connection."""
+        with mock.patch('booking.notifications.get_connection', wraps=mail.get_connection) as get_connection:
+            sent_count = self.service.send_pending_notifications()
+
+        self.assertEqual(sent_count, 3)
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].subject, 'Reminder: Run')
+        self.assertEqual(
+            Notification.objects.filter(status='sent', sent_at__isnull=False).count(), 3
+        )
+
+    def test_failures_recorded_per_message(self):
+        """Test one failing message does not stop the rest of the batch."""
+        failing = self.notifications[1]
+        original_send = mail.EmailMessage.send
+
+        def send(message, *args, **kwargs):
+            if failing.user.email in message.to:
+                raise ConnectionError('Recipient refused')
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(mail.EmailMessage, 'send', send):
+            sent_count = self.service.send_pending_notifications()
+
+        self.assertEqual(sent_count, 2)
+        failing.refresh_from_db()
+        self.assertEqual(failing.retry_count, 1)
+        self.assertEqual(failing.metadata['failure_reasons'][0]['reason'], 'Recipient refused')
+        self.assertEqual(Notification.objects.filter(status='sent').count(), 2)
+
+    def test_sent_emails_not_resent_after_interrupted_batch(self):
+        """Test emails sent before a worker is stopped are already marked sent."""
+        original_send = mail.EmailMessage.send
+        calls = []
+
+        def send(message, *args, **kwargs):
+            calls.append(message)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(mail.EmailMessage, 'send', send):
+            with self.assertRaises(KeyboardInterrupt):
+                self.service.send_pending_notifications()
+
+        self.assertEqual(Notification.objects.filter(status='sent').count(), 1)
+        self.assertEqual(self.service.send_pending_notifications(), 2)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_limit(self):
+        """Test only the oldest notifications up to the limit are sent."""
+        sent_count = self.service.send_pending_notifications(limit=2)
+
+        self.assertEqual(sent_count, 2)
+        self.assertEqual(Notification.objects.filter(status='pending').count(), 1)
+
+
+class TestNotificationDigests(TestCase):
+    """Test notifications held for daily and weekly digests."""
+
+    def setUp(self):
+        self.service = NotificationService()
+        self.user = UserFactory(email='digest@example.com')
+        NotificationPreference.objects.update_or_create(
+            user=self.user, notification_type='booking_confirmed', delivery_method='email',
+            defaults={'is_enabled': True, 'frequency': 'daily_digest'}
+        )
+
+    def _notify(self, title='Booking confirmed', **kwargs):
+        return self.service.create_notification(
+            self.user, 'booking_confirmed', title, f'{title} details', **kwargs
+        )
+
+    def test_digest_preference_holds_email(self):
+        """Test digest emails are held while in-app notifications are not."""
+        notifications = {n.delivery_method: n for n in self._notify()}
+
+        self.assertEqual(notifications['email'].digest_frequency, 'daily_digest')
+        self.assertEqual(notifications['in_app'].digest_frequency, '')
+
+        self.service.send_pending_notifications()
+        self.assertEqual(len(mail.outbox), 0)
+        notifications['email'].refresh_from_db()
+        self.assertEqual(notifications['email'].status, 'pending')
+
+    def test_urgent_notifications_bypass_digest(self):
+        """Test urgent notifications are sent immediately."""
+        notifications = {n.delivery_method: n for n in self._notify(priority='urgent')}
+
+        self.assertEqual(notifications['email'].digest_frequency, '')
+
+    def test_digest_sends_one_email_per_user(self):
+        """Test held notifications are summarised in one email."""
+        for n in range(40):
+            self._notify(title=f'Booking {n} confirmed')
+
+        digest_count = self.service.send_digest_notifications('daily_digest')
+
+        self.assertEqual(digest_count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Your daily digest: 40 notifications')
+        self.assertIn('Booking 39 confirmed', mail.outbox[0].body)
+        self.assertFalse(
+            Notification.objects.filter(digest_frequency='daily_digest', status='pending').exists()
+        )
+
+    def test_weekly_digest_not_sent_daily(self):
+        """Test only notifications held for the requested frequency are sent."""
+        NotificationPreference.objects.filter(user=self.user).update(frequency='weekly_digest')
+        self._notify()
+
+        self.assertEqual(self.service.send_digest_notifications('daily_digest'), 0)
+        self.assertEqual(self.service.send_digest_notifications('weekly_digest'), 1)
@@ -0,0 +1,90 @@
+"""Test cases for the transactional outbox."""
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+
+from booking.models import Notification, OutboxEvent
+from booking.outbox import OUTBOX_HANDLERS, dispatch_pending_events, record_event
+from booking.tests.factories import BookingFactory, UserProfileFactory
+
+
+class TestOutbox(TestCase):
+    """Test booking side effects are recorded and dispatched after commit."""
+
+    def setUp(self):
+        self.approver = UserProfileFactory(role='sysadmin').user
+
+    def test_booking_save_records_event_without_notifying(self):
+        """Test creating a booking queues its notifications instead of sending them."""
+        booking = BookingFactory()
+
+        event = OutboxEvent.objects.get(event_type='booking_created')
+        self.assertEqual(event.payload, {'booking_id': booking.pk})
+        self.assertFalse(Notification.objects.filter(booking=booking).exists())
+
+        results = dispatch_pending_events()
+
+        self.assertEqual(results['dispatched'], 1)
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'dispatched')
+        self.assertTrue(
+            Notification.objects.filter(
+                booking=booking, user=self.approver, notification_type='approval_request'
+            ).exists()
+        )
+
+    def test_rolled_back_booking_records_nothing(self):
+        """Test events are discarded with the transaction that recorded them."""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                BookingFactory()
+                raise RuntimeError('abort')
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failing_handler_is_retried_then_failed(self):
+        """Test handler errors back off and give up after the attempt limit."""
+        handler = mock.Mock(side_effect=ValueError('boom'))
+        event = record_event('test_event', value=1)
+
+        with mock.patch.dict(OUTBOX_HANDLERS, {'test_event': handler}), \
+                self.settings(OUTBOX_MAX_ATTEMPTS=2):
+            self.assertEqual(dispatch_pending_events()['retried'], 1)
+            event.refresh_from_db()
+            self.assertEqual(event.status, 'pending')
+            self.assertEqual(event.last_error, 'boom')
+
+            # Backoff delays the next attempt
+            self.assertEqual(dispatch_pending_events()['retried'], 0)
+
+            OutboxEvent.objects.filter(pk=event.pk).update(available_at=event.created_at)
+            self.assertEqual(dispatch_pending_events()['failed'], 1)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'failed')
+        handler.assert_called_with({'value': 1})
+
+    def test_event_is_dispatched_on_commit(self):
+        """Test events are dispatched in-process once their transaction commits."""
+        handler = mock.Mock()
+
+        with mock.patch.dict(OUTBOX_HANDLERS, {'test_event': handler}):
+            with self.captureOnCommitCallbacks(execute=True):
+                event = record_event('test_event', value=1)
+
+        handler.assert_called_once_with({'value': 1})
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'dispatched')
+
+    def test_failed_commit_dispatch_is_left_for_retry(self):
+        """Test a failing on-commit dispatch leaves the event pending for the dispatcher."""
+        handler = mock.Mock(side_effect=ValueError('boom'))
+
+        with mock.patch.dict(OUTBOX_HANDLERS, {'test_event': handler}):
+            with self.captureOnCommitCallbacks(execute=True):
+                event = record_event('test_event', value=1)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'pending')
+        self.assertEqual(event.attempts, 1)
@@ -0,0 +1,101 @@
+"""Test cases for request profiling."""
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, TestCase, override_settings
+
+from booking.middleware.profiling import RequestProfilingMiddleware
+from booking.profiling import get_slow_requests, get_view_stats, percentile
+from booking.tests.factories import UserProfileFactory
+from booking.views import site_admin_performance_view
+
+
+def profiled_view(request):
+    """Stand-in view that runs queries and renders a template."""
+    request.resolver_match = SimpleNamespace(view_name='booking:profiled')
+    for _ in range(3):
+        User.objects.count()
+    html = engines['django'].from_string('{% for n in numbers %}{{ n }}{% endfor %}').render({'numbers': range(5)})
+    return HttpResponse(html)
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True)
+class TestRequestProfilingMiddleware(TestCase):
+    """Test requests are timed and aggregated per view."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.middleware = RequestProfilingMiddleware(profiled_view)
+
+    def test_disabled_by_default(self):
+        """Test the middleware removes itself unless enabled."""
+        with self.settings(REQUEST_PROFILING_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                RequestProfilingMiddleware(profiled_view)
+
+    def test_samples_recorded_per_view(self):
+        """Test query count, database and template time are recorded."""
+        for _ in range(4):
+            self.middleware(self.factory.get('/profiled/'))
+
+        stats, = get_view_stats()
+
+        self.assertEqual(stats['view_name'], 'booking:profiled')
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['max_queries'], 3)
+        self.assertGreaterEqual(stats['p95_ms'], stats['p50_ms'])
+        self.assertGreater(stats['avg_template_ms'], 0)
+        self.assertEqual(get_slow_requests(), [])
+
+    def test_slow_request_logged_with_queries(self):
+        """Test requests over the threshold are logged with their top queries."""
+        with self.settings(REQUEST_PROFILING_SLOW_QUERIES=2):
+            with self.assertLogs('booking.performance', 'WARNING') as logs:
+                self.middleware(self.factory.get('/profiled/'))
+
+        self.assertIn('3 queries', logs.output[0])
+        slow, = get_slow_requests()
+        self.assertEqual(slow['path'], '/profiled/')
+        self.assertEqual(slow['top_queries'][0]['count'], 3)
+        self.assertIn('auth_user', slow['top_queries'][0]['sql'])
+
+    def test_window_is_bounded(self):
+        """Test only the most recent samples are kept per view."""
+        with self.settings(REQUEST_PROFILING_WINDOW=3):
+            for _ in range(5):
+                self.middleware(self.factory.get('/profiled/'))
+
+        self.assertEqual(get_view_stats()[0]['count'], 3)
+
+    def test_performance_page(self):
+        """Test site admins can see the worst offenders."""
+        self.middleware(self.factory.get('/profiled/'))
+        admin = UserProfileFactory(role='sysadmin').user
+        admin.refresh_from_db()
+        request = self.factory.get('/site-admin/performance/', {'sort': 'max_queries'})
+        request.user = admin
+
+        with mock.patch('booking.views.main.render', return_value=HttpResponse()) as render:
+            site_admin_performance_view(request)
+
+        template, context = render.call_args[0][1:]
+        self.assertEqual(template, 'booking/site_admin_performance.html')
+        self.assertEqual(context['order_by'], 'max_queries')
+        self.assertEqual(context['view_stats'][0]['view_name'], 'booking:profiled')
+
+
+class TestPercentile(TestCase):
+    """Test nearest-rank percentiles."""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 99), 7)
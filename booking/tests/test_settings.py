@@ -89,6 +89,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        # Budgets come from SystemSetting api_throttle_rate_<scope>, see booking/throttling.py
+        'booking.throttling.UserRateThrottle',
+        'booking.throttling.AnonRateThrottle',
+        'booking.throttling.ScopedRateThrottle',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
 }
@@ -0,0 +1,120 @@
+"""Test cases for API rate limiting."""
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import SystemSetting
+from booking.tests.factories import UserProfileFactory
+from booking.throttling import (
+    DEFAULT_RATES, FeedTokenRateThrottle, get_throttle_cache, get_throttle_rates, throttle_view
+)
+
+
+class TestThrottleRates(TestCase):
+    """Test throttle budgets come from system settings."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_system_setting_overrides_default(self):
+        """Test saved settings take effect without a restart."""
+        self.assertEqual(get_throttle_rates()['calendar'], DEFAULT_RATES['calendar'])
+
+        SystemSetting.set_setting('api_throttle_rate_calendar', '5/min', category='api')
+
+        self.assertEqual(get_throttle_rates()['calendar'], '5/min')
+
+    def test_invalid_and_empty_rates(self):
+        """Test invalid rates are ignored and empty rates turn the limit off."""
+        SystemSetting.set_setting('api_throttle_rate_calendar', 'lots', category='api')
+        SystemSetting.set_setting('api_throttle_rate_statistics', '', category='api')
+
+        rates = get_throttle_rates()
+
+        self.assertEqual(rates['calendar'], DEFAULT_RATES['calendar'])
+        self.assertIsNone(rates['statistics'])
+
+    @mock.patch('booking.throttling._local_cache_warned', False)
+    def test_warns_once_about_per_process_cache(self):
+        """Test per-worker counters in a LocMemCache are reported once per process."""
+        with self.assertLogs('booking.throttling', level='WARNING') as logs:
+            get_throttle_cache()
+            get_throttle_cache()
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('per worker', logs.output[0])
+
+
+class TestScopedThrottling(TestCase):
+    """Test costly endpoints have their own per-user budgets."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        SystemSetting.set_setting('api_throttle_rate_calendar', '2/min', category='api')
+        SystemSetting.set_setting('api_throttle_rate_ics_export', '1/min', category='api')
+        self.client = APIClient()
+        self.user = UserProfileFactory(role='researcher').user
+        self.client.force_authenticate(user=self.user)
+
+    def test_calendar_throttled_with_retry_after(self):
+        """Test requests over budget get 429 and Retry-After."""
+        url = reverse('api:booking-calendar')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Other endpoints use the general budget
+        self.assertEqual(self.client.get(reverse('api:booking-list')).status_code, status.HTTP_200_OK)
+
+    def test_budgets_are_per_user(self):
+        """Test one user's requests don't use up another's budget."""
+        url = reverse('api:booking-calendar')
+        for _ in range(3):
+            self.client.get(url)
+
+        self.client.force_authenticate(user=UserProfileFactory(role='researcher').user)
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_plain_view_throttled(self):
+        """Test plain Django views such as ICS exports can be throttled too."""
+        factory = RequestFactory()
+        view = throttle_view('ics_export')(lambda request: HttpResponse('BEGIN:VCALENDAR'))
+
+        def export():
+            request = factory.get('/calendar/export/')
+            request.user = self.user
+            return view(request)
+
+        self.assertEqual(export().status_code, 200)
+        response = export()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_feed_budgets_are_per_token(self):
+        """Test feeds fetched from one shared address are limited per token."""
+        factory = RequestFactory()
+        view = throttle_view('ics_export', throttle_class=FeedTokenRateThrottle)(
+            lambda request, token: HttpResponse('BEGIN:VCALENDAR')
+        )
+
+        def fetch(token):
+            request = factory.get(f'/calendar/feed/{token}/', REMOTE_ADDR='203.0.113.7')
+            request.user = AnonymousUser()
+            return view(request, token=token)
+
+        self.assertEqual(fetch('lab-one').status_code, 200)
+        self.assertEqual(fetch('lab-two').status_code, 200)
+        self.assertEqual(fetch('lab-one').status_code, 429)
@@ -0,0 +1,228 @@
+"""Test cases for streaming CSV user import."""
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import NotificationPreference, UserImportJob, UserProfile
+from booking.tests.factories import DepartmentFactory, UserFactory, UserProfileFactory
+from booking.user_import import UserImporter, UserImportError, process_import_jobs
+
+HEADER = 'username,email,first_name,last_name,role,faculty_code,college_code,department_code,training_level\n'
+
+
+def csv_bytes(*rows, header=HEADER, encoding='utf-8'):
+    return (header + ''.join(row + '\n' for row in rows)).encode(encoding)
+
+
+class TestUserImporter(TestCase):
+    """Test rows are upserted in chunks with per-row errors."""
+
+    def setUp(self):
+        self.department = DepartmentFactory()
+        self.college = self.department.college
+        self.faculty = self.college.faculty
+        self.codes = f'{self.faculty.code},{self.college.code},{self.department.code}'
+
+    def test_creates_users_in_chunks(self):
+        """Test new users, profiles and preferences are written with bulk statements."""
+        rows = [f'student{n},student{n}@example.com,First,Last{n},student,{self.codes},2' for n in range(30)]
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = UserImporter(chunk_size=10).run(io.BytesIO(csv_bytes(*rows)))
+
+        self.assertEqual((counts['rows'], counts['created'], counts['errors']), (30, 30, 0))
+        # A fixed number of statements per chunk, however many rows it holds
+        self.assertLess(len(queries.captured_queries), 40)
+        profile = UserProfile.objects.select_related('user').get(user__username='student7')
+        self.assertEqual(profile.user.email, 'student7@example.com')
+        self.assertEqual((profile.role, profile.training_level), ('student', 2))
+        self.assertEqual(profile.department, self.department)
+        self.assertFalse(profile.user.has_usable_password())
+        self.assertTrue(NotificationPreference.objects.filter(user=profile.user).exists())
+
+    def test_update_existing_keeps_blank_cells(self):
+        """Test existing users are updated from non-blank cells only."""
+        existing = UserProfileFactory(role='student', user__username='jdoe', user__email='old@example.com')
+        first_name, department_id = existing.user.first_name, existing.department_id
+
+        counts = UserImporter(update_existing=True).run(io.BytesIO(csv_bytes(
+            'jdoe,new@example.com,,,researcher,,,,',
+        )))
+
+        self.assertEqual(counts['updated'], 1)
+        existing.refresh_from_db()
+        existing.user.refresh_from_db()
+        self.assertEqual(existing.user.email, 'new@example.com')
+        self.assertEqual(existing.role, 'researcher')
+        self.assertEqual(existing.user.first_name, first_name)
+        self.assertEqual(existing.department_id, department_id)
+
+    def test_existing_users_skipped(self):
+        """Test existing users are left alone unless updating."""
+        UserFactory(username='jdoe')
+
+        counts = UserImporter().run(io.BytesIO(csv_bytes('jdoe,jdoe@example.com,J,Doe,student,,,,')))
+
+        self.assertEqual((counts['created'], counts['skipped']), (0, 1))
+
+    def test_row_errors(self):
+        """Test bad rows are reported by row number and the rest imported."""
+        UserFactory(username='taken', email='taken@example.com')
+
+        importer = UserImporter()
+        counts = importer.run(io.BytesIO(csv_bytes(
+            'good,good@example.com,G,Ood,student,,,,',
+            ',nouser@example.com,N,O,student,,,,',
+            'badrole,badrole@example.com,B,R,wizard,,,,',
+            'clash,taken@example.com,C,L,student,,,,',
+            'good,other@example.com,G,Two,student,,,,',
+            'nofaculty,nofaculty@example.com,N,F,student,NOPE,,,',
+        )))
+
+        self.assertEqual((counts['created'], counts['errors']), (2, 4))
+        errors = {error['row']: error['error'] for error in importer.errors}
+        self.assertEqual(sorted(errors), [3, 4, 5, 6])
+        self.assertEqual(errors[4], 'Invalid role: wizard')
+        self.assertIn('already exists for different user', errors[5])
+        self.assertIn('Duplicate username', errors[6])
+
+    def test_rejected_row_does_not_reserve_username(self):
+        """Test a row rejected for an email clash doesn't block a corrected row."""
+        UserFactory(username='taken', email='taken@example.com')
+
+        importer = UserImporter()
+        counts = importer.run(io.BytesIO(csv_bytes(
+            'jdoe,taken@example.com,J,Doe,student,,,,',
+            'jdoe,jdoe@example.com,J,Doe,student,,,,',
+        )))
+
+        self.assertEqual((counts['created'], counts['errors']), (1, 1))
+        self.assertIn('already exists for different user', importer.errors[0]['error'])
+        self.assertEqual(User.objects.get(username='jdoe').email, 'jdoe@example.com')
+
+    def test_unknown_codes_are_warnings(self):
+        """Test users with unknown hierarchy codes are imported without those links."""
+        importer = UserImporter()
+        counts = importer.run(io.BytesIO(csv_bytes(
+            f'nofaculty,nofaculty@example.com,N,F,student,NOPE,{self.college.code},NOPE,',
+        )))
+
+        self.assertEqual((counts['created'], counts['errors'], counts['warnings']), (1, 0, 2))
+        self.assertEqual(importer.warnings, [
+            {'row': 2, 'warning': 'Faculty not found: NOPE'},
+            {'row': 2, 'warning': 'Department not found: NOPE'},
+        ])
+        profile = UserProfile.objects.get(user__username='nofaculty')
+        self.assertIsNone(profile.faculty)
+        self.assertEqual(profile.college, self.college)
+        self.assertIsNone(profile.department)
+
+    def test_latin1_file(self):
+        """Test files that aren't UTF-8 are read as Latin-1."""
+        UserImporter().run(io.BytesIO(csv_bytes('zoe,zoe@example.com,Zoë,Smith,student,,,,', encoding='latin-1')))
+
+        self.assertEqual(User.objects.get(username='zoe').first_name, 'Zoë')
+
+    def test_missing_columns(self):
+        """Test a file without the required columns is rejected."""
+        with self.assertRaises(UserImportError):
+            UserImporter().run(io.BytesIO(b'email\nsomeone@example.com\n'))
+
+    def test_command_dry_run(self):
+        """Test the management command reports without writing."""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as csv_file:
+            csv_file.write(csv_bytes('jdoe,jdoe@example.com,J,Doe,student,,,,'))
+            csv_file.flush()
+            output = io.StringIO()
+            call_command('import_users_csv', csv_file.name, dry_run=True, stdout=output)
+
+        self.assertIn('Would create: 1 users', output.getvalue())
+        self.assertFalse(User.objects.filter(username='jdoe').exists())
+
+    def test_command_requires_email(self):
+        """Test the management command rejects rows without an email, as it always has."""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as csv_file:
+            csv_file.write(csv_bytes('jdoe,,J,Doe,student,,,,', 'asmith,asmith@example.com,A,Smith,student,,,,'))
+            csv_file.flush()
+            output = io.StringIO()
+            call_command('import_users_csv', csv_file.name, stdout=output)
+
+        self.assertIn('Missing email', output.getvalue())
+        self.assertFalse(User.objects.filter(username='jdoe').exists())
+        self.assertTrue(User.objects.filter(username='asmith').exists())
+
+
+class TestBackgroundUserImport(TestCase):
+    """Test uploads are queued and imported outside the request."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = UserProfileFactory(role='technician').user
+        self.admin.refresh_from_db()
+        self.client.force_login(self.admin)
+
+    def _upload(self, content):
+        return self.client.post(reverse('booking:lab_admin_users_bulk_import'), {
+            'csv_file': SimpleUploadedFile('users.csv', content, content_type='text/csv'),
+        })
+
+    def test_upload_queues_job(self):
+        """Test the upload returns at once and the scheduler runs the import."""
+        rows = [f'user{n}x,user{n}x@example.com,U,Ser,,,,,' for n in range(5)] + [',,,,,,,,']
+
+        response = self._upload(csv_bytes(*rows))
+
+        self.assertEqual(response.status_code, 202)
+        job = UserImportJob.objects.get(pk=response.json()['job_id'])
+        self.assertEqual(job.status, 'pending')
+        self.assertFalse(User.objects.filter(username='user0x').exists())
+
+        self.assertEqual(process_import_jobs(), {'completed': 1, 'failed': 0})
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'completed')
+        self.assertEqual((status['created'], status['error_count'], status['progress']), (5, 1, 100))
+        self.assertEqual(status['errors'], ['Row 7: Missing username'])
+        self.assertEqual(UserProfile.objects.get(user__username='user0x').role, 'researcher')
+        job.refresh_from_db()
+        self.assertFalse(job.file)
+
+    def test_stalled_job_is_failed(self):
+        """Test a job left running by a stopped scheduler is failed so polling ends."""
+        response = self._upload(csv_bytes('user0x,user0x@example.com,U,Ser,,,,,'))
+        job = UserImportJob.objects.get(pk=response.json()['job_id'])
+        stopped_at = timezone.now() - timedelta(hours=1)
+        UserImportJob.objects.filter(pk=job.pk).update(
+            status='running', started_at=stopped_at, progress_at=stopped_at
+        )
+
+        self.assertEqual(process_import_jobs(), {'completed': 0, 'failed': 0, 'stalled': 1})
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('stopped', status['error'])
+        job.refresh_from_db()
+        self.assertFalse(job.file)
+
+    def test_upload_checks_header(self):
+        """Test files without a username column are rejected straight away."""
+        response = self._upload(b'email\nsomeone@example.com\n')
+
+        self.assertFalse(response.json()['success'])
+        self.assertIn('username', response.json()['error'])
+        self.assertFalse(UserImportJob.objects.exists())
@@ -0,0 +1,167 @@
+# booking/throttling.py
+"""
+API rate limiting for Aperature Booking.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import hashlib
+import logging
+import math
+import re
+from functools import wraps
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from rest_framework import throttling
+
+logger = logging.getLogger(__name__)
+
+RATES_CACHE_KEY = 'api_throttle_rates'
+# Longest time a worker that doesn't share the default cache keeps old rates
+RATES_CACHE_TIMEOUT = 60
+# SystemSetting keys are this prefix followed by the scope, e.g. api_throttle_rate_calendar
+SETTING_PREFIX = 'api_throttle_rate_'
+# Requests per period, e.g. 100/hour or 10/min
+RATE_PATTERN = re.compile(r'^\d+/[smhd][a-z]*$')
+
+_local_cache_warned = False
+
+# Budgets used when neither SystemSetting nor DEFAULT_THROTTLE_RATES sets one.
+# Endpoints that build large responses get much smaller budgets.
+DEFAULT_RATES = {
+    'user': '2000/hour',
+    'anon': '100/hour',
+    'calendar': '60/min',
+    'statistics': '20/min',
+    'ics_export': '20/min',
+    'bulk': '10/min',
+}
+
+
+def get_throttle_rates():
+    """
+    Return rates by scope, with SystemSetting values overriding settings and defaults.
+
+    The merged rates are cached for RATES_CACHE_TIMEOUT seconds. Saving a
+    SystemSetting clears them at once where the default cache is shared by
+    every worker (Redis); with a per-process cache, other workers pick up
+    the change when their copy expires.
+    """
+    rates = cache.get(RATES_CACHE_KEY)
+    if rates is None:
+        from .models import SystemSetting
+        
+        rates = dict(DEFAULT_RATES)
+        rates.update(getattr(settings, 'REST_FRAMEWORK', {}).get('DEFAULT_THROTTLE_RATES', {}))
+        for key, value in SystemSetting.objects.filter(key__startswith=SETTING_PREFIX).values_list('key', 'value'):
+            value = value.strip()
+            if value and not RATE_PATTERN.match(value):
+                logger.warning(f"Ignoring invalid throttle rate {key}={value!r}")
+                continue
+            # An empty value turns the scope's limit off
+            rates[key[len(SETTING_PREFIX):]] = value or None
+        cache.set(RATES_CACHE_KEY, rates, RATES_CACHE_TIMEOUT)
+    return rates
+
+
+def invalidate_throttle_rates():
+    """Drop the cached rates after a SystemSetting changes, in this process's default cache."""
+    cache.delete(RATES_CACHE_KEY)
+
+
+def get_throttle_cache():
+    """
+    Return the cache that counts requests, API_THROTTLE_CACHE (default 'default').
+    
+    Counters must be in a cache shared by every worker (e.g. Redis). With a
+    per-process LocMemCache each worker keeps its own count, so a client gets
+    the configured budget once per worker; a warning is logged once per
+    process when that is the case.
+    """
+    global _local_cache_warned
+    
+    alias = getattr(settings, 'API_THROTTLE_CACHE', 'default')
+    throttle_cache = caches[alias]
+    if isinstance(throttle_cache, LocMemCache) and not _local_cache_warned:
+        _local_cache_warned = True
+        logger.warning(
+            f"API_THROTTLE_CACHE '{alias}' is a per-process LocMemCache; rate limits are "
+            f"enforced per worker rather than overall. Configure a shared cache such as Redis."
+        )
+    return throttle_cache
+
+
+class SystemSettingRateMixin:
+    """Read rates from get_throttle_rates() and count requests in API_THROTTLE_CACHE."""
+    
+    @property
+    def cache(self):
+        return get_throttle_cache()
+    
+    def get_rate(self):
+        return get_throttle_rates().get(self.scope)
+
+
+class UserRateThrottle(SystemSettingRateMixin, throttling.UserRateThrottle):
+    """Overall budget for each authenticated user."""
+
+
+class AnonRateThrottle(SystemSettingRateMixin, throttling.AnonRateThrottle):
+    """Overall budget for each anonymous client address."""
+
+
+class ScopedRateThrottle(SystemSettingRateMixin, throttling.ScopedRateThrottle):
+    """Separate budget per user for views and actions that set ``throttle_scope``."""
+
+
+class FeedTokenRateThrottle(ScopedRateThrottle):
+    """
+    Scoped budget per feed token rather than per user or address.
+
+    Calendar services poll subscribed feeds from shared addresses, so an
+    address-based budget would be used up by every feed they fetch.
+    """
+    
+    def get_cache_key(self, request, view):
+        token = view.kwargs['token']
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.sha256(token.encode('utf-8')).hexdigest()[:32],
+        }
+
+
+def throttle_view(scope, throttle_class=ScopedRateThrottle):
+    """
+    Apply a scoped throttle to a plain Django view.
+
+    Requests over budget get 429 with a Retry-After header, like API views.
+    The view's URL arguments are available to ``throttle_class`` as
+    ``view.kwargs``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            throttle = throttle_class()
+            view = SimpleNamespace(throttle_scope=scope, args=args, kwargs=kwargs)
+            if not throttle.allow_request(request, view):
+                response = HttpResponse("Too many requests. Please try again later.", status=429)
+                wait = throttle.wait()
+                if wait is not None:
+                    response['Retry-After'] = str(math.ceil(wait))
+                return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -136,8 +136,11 @@ urlpatterns = [
     path('lab-admin/users/<int:user_id>/toggle/', views.lab_admin_user_toggle_view, name='lab_admin_user_toggle'),
     path('lab-admin/users/add/', views.lab_admin_user_add_view, name='lab_admin_user_add'),
     path('lab-admin/users/bulk-import/', views.lab_admin_users_bulk_import_view, name='lab_admin_users_bulk_import'),
+    path('lab-admin/users/bulk-import/<int:job_id>/', views.lab_admin_users_import_status_view, name='lab_admin_users_import_status'),
     path('lab-admin/users/bulk-action/', views.lab_admin_users_bulk_action_view, name='lab_admin_users_bulk_action'),
     path('lab-admin/users/export/', views.lab_admin_users_export_view, name='lab_admin_users_export'),
+    path('lab-admin/bookings/export/', views.lab_admin_bookings_export_view, name='lab_admin_bookings_export'),
+    path('lab-admin/usage/export/', views.lab_admin_usage_export_view, name='lab_admin_usage_export'),
     path('lab-admin/resources/', views.lab_admin_resources_view, name='lab_admin_resources'),
     path('lab-admin/resources/add/', views.lab_admin_add_resource_view, name='lab_admin_add_resource'),
     path('lab-admin/resources/bulk-import/', views.lab_admin_resources_bulk_import_view, name='lab_admin_resources_bulk_import'),
@@ -194,7 +197,11 @@ urlpatterns = [
     path('site-admin/lab-settings/', views.site_admin_lab_settings_view, name='site_admin_lab_settings'),
     path('site-admin/audit/', views.site_admin_audit_logs_view, name='site_admin_audit'),
     path('site-admin/audit/logs-ajax/', views.site_admin_logs_ajax, name='site_admin_logs_ajax'),
+    path('site-admin/notifications/analytics/', views.site_admin_notification_analytics_ajax, name='site_admin_notification_analytics'),
     path('site-admin/health-check/', views.site_admin_health_check_view, name='site_admin_health_check'),
+    path('site-admin/performance/', views.site_admin_performance_view, name='site_admin_performance'),
+    path('health/live/', views.health_liveness_view, name='health_liveness'),
+    path('health/ready/', views.health_readiness_view, name='health_readiness'),
     path('site-admin/test-email/', views.site_admin_test_email_view, name='site_admin_test_email'),
     path('site-admin/email-config/', views.site_admin_email_config_view, name='site_admin_email_config'),
     path('site-admin/email-config/create/', views.site_admin_email_config_create_view, name='site_admin_email_config_create'),
@@ -0,0 +1,467 @@
+# booking/user_import.py
+"""
+Streaming CSV user import.
+
+Rows are read from the file as they are needed and upserted in chunks: each
+chunk looks up its existing usernames and emails in two queries, then writes
+users and profiles with bulk INSERT/UPDATE statements in its own transaction.
+Faculty, college and department codes are loaded once per import.
+
+Uploads from the lab admin pages are stored as a UserImportJob and imported
+by the scheduler, which records progress and per-row errors on the job.
+
+This file is part of the Aperature Booking.
+Copyright (C) 2025 Aperature Booking Contributors
+
+This software is dual-licensed:
+1. GNU General Public License v3.0 (GPL-3.0) - for open source use
+2. Commercial License - for proprietary and commercial use
+
+For GPL-3.0 license terms, see LICENSE file.
+For commercial licensing, see COMMERCIAL-LICENSE.txt or visit:
+https://aperature-booking.org/commercial
+"""
+
+import codecs
+import csv
+import io
+import logging
+from datetime import timedelta
+from typing import Dict, List
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import College, Department, Faculty, UserImportJob, UserProfile
+from .signals import create_default_notification_preferences_bulk
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ('username',)
+USER_FIELDS = ('email', 'first_name', 'last_name')
+PROFILE_TEXT_FIELDS = ('group', 'phone', 'student_id', 'staff_number')
+ROLES = {role for role, _ in UserProfile.ROLE_CHOICES}
+
+
+class UserImportError(Exception):
+    """The file as a whole can't be imported."""
+
+
+def decode_csv(binary_file, sample_size=64 * 1024):
+    """
+    Wrap a binary CSV file for reading as text, without loading it.
+
+    The file is decoded as UTF-8 (with or without a BOM), or as Latin-1 if
+    its first block isn't valid UTF-8. Detach the wrapper when done to leave
+    the binary file open.
+    """
+    sample = binary_file.read(sample_size)
+    binary_file.seek(0)
+    encoding = 'utf-8-sig'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+    except UnicodeDecodeError:
+        encoding = 'latin-1'
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline='')
+
+
+def check_columns(fieldnames, required_columns=REQUIRED_COLUMNS):
+    """Raise UserImportError unless the header has the required columns."""
+    if not fieldnames:
+        raise UserImportError('CSV file is empty')
+    missing = [column for column in required_columns if column not in fieldnames]
+    if missing:
+        raise UserImportError(
+            f'Missing required columns: {", ".join(missing)}. '
+            f'Available columns: {", ".join(fieldnames)}'
+        )
+
+
+class UserImporter:
+    """
+    Import users and profiles from CSV rows in chunks.
+
+    Blank cells leave existing values alone. Unknown faculty, college or
+    department codes are reported as warnings and the user is imported
+    without that link. New users share one password hash, made once per
+    import, or get an unusable password when no password is given.
+    With ``require_email`` rows without an email are rejected.
+    ``progress`` is called with the importer after every chunk.
+    """
+
+    def __init__(self, update_existing=False, password=None, default_role='student',
+                 profile_defaults=None, required_columns=REQUIRED_COLUMNS, dry_run=False,
+                 chunk_size=None, max_errors=None, progress=None, require_email=False):
+        self.update_existing = update_existing
+        self.require_email = require_email
+        self.password_hash = make_password(password)
+        self.default_role = default_role
+        self.profile_defaults = profile_defaults or {}
+        self.required_columns = required_columns
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or getattr(settings, 'USER_IMPORT_CHUNK_SIZE', 1000)
+        self.max_errors = max_errors or getattr(settings, 'USER_IMPORT_MAX_ERRORS', 1000)
+        self.progress = progress
+
+        self.counts = {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0, 'warnings': 0}
+        self.errors: List[Dict] = []
+        self.warnings: List[Dict] = []
+        self.bytes_processed = 0
+        self._seen_usernames = set()
+        self._seen_emails = {}
+
+    def run(self, binary_file) -> Dict[str, int]:
+        """Import every row of a binary CSV file and return the counts."""
+        text = decode_csv(binary_file)
+        try:
+            reader = csv.DictReader(text)
+            check_columns(reader.fieldnames, self.required_columns)
+            self._load_hierarchy()
+
+            chunk = []
+            # Row numbers match the spreadsheet, with the header as row 1
+            for row_num, row in enumerate(reader, start=2):
+                chunk.append((row_num, row))
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(chunk, binary_file)
+                    chunk = []
+            if chunk:
+                self._import_chunk(chunk, binary_file)
+        finally:
+            text.detach()
+
+        if not self.counts['rows']:
+            raise UserImportError('CSV file has no data rows')
+        return self.counts
+
+    def _load_hierarchy(self):
+        """Load faculty, college and department codes once per import."""
+        self.faculties = {}
+        for faculty in Faculty.objects.order_by('pk'):
+            self.faculties.setdefault(faculty.code, faculty)
+
+        # Keyed by (parent id, code), with a None parent for code-only lookups
+        self.colleges = {}
+        for college in College.objects.order_by('pk'):
+            self.colleges.setdefault((college.faculty_id, college.code), college)
+            self.colleges.setdefault((None, college.code), college)
+
+        self.departments = {}
+        for department in Department.objects.order_by('pk'):
+            self.departments.setdefault((department.college_id, department.code), department)
+            self.departments.setdefault((None, department.code), department)
+
+    def _error(self, row_num, message):
+        self.counts['errors'] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_num, 'error': str(message)})
+
+    def _warning(self, row_num, message):
+        self.counts['warnings'] += 1
+        if len(self.warnings) < self.max_errors:
+            self.warnings.append({'row': row_num, 'warning': message})
+
+    def _parse_row(self, row):
+        """
+        Return (username, user fields, profile fields, warnings) from the
+        non-blank cells of a row.
+        """
+        def value(column):
+            return (row.get(column) or '').strip()
+
+        username = value('username')
+        if not username:
+            raise ValueError('Missing username')
+
+        user_fields = {field: value(field) for field in USER_FIELDS if value(field)}
+        if self.require_email and 'email' not in user_fields:
+            raise ValueError('Missing email')
+        profile_fields = {field: value(field) for field in PROFILE_TEXT_FIELDS if value(field)}
+
+        role = value('role').lower()
+        if role:
+            if role not in ROLES:
+                raise ValueError(f'Invalid role: {role}')
+            profile_fields['role'] = role
+
+        if value('training_level'):
+            try:
+                profile_fields['training_level'] = int(value('training_level'))
+            except ValueError:
+                raise ValueError(f'Invalid training level: {value("training_level")}')
+
+        warnings = []
+        faculty = college = None
+        if value('faculty_code'):
+            faculty = self.faculties.get(value('faculty_code'))
+            if faculty is None:
+                warnings.append(f'Faculty not found: {value("faculty_code")}')
+            else:
+                profile_fields['faculty'] = faculty
+        if value('college_code'):
+            college = self.colleges.get((faculty.pk if faculty else None, value('college_code')))
+            if college is None:
+                warnings.append(f'College not found: {value("college_code")}')
+            else:
+                profile_fields['college'] = college
+        if value('department_code'):
+            department = self.departments.get((college.pk if college else None, value('department_code')))
+            if department is None:
+                warnings.append(f'Department not found: {value("department_code")}')
+            else:
+                profile_fields['department'] = department
+
+        return username, user_fields, profile_fields, warnings
+
+    def _import_chunk(self, chunk, binary_file=None):
+        parsed = []
+        for row_num, row in chunk:
+            self.counts['rows'] += 1
+            try:
+                parsed.append((row_num, *self._parse_row(row)))
+            except ValueError as e:
+                self._error(row_num, e)
+
+        existing = {
+            user.username: user
+            for user in User.objects.filter(username__in=[item[1] for item in parsed])
+        }
+        emails = [item[2]['email'] for item in parsed if 'email' in item[2]]
+        email_owners = {}
+        for email, username in User.objects.filter(email__in=emails).values_list('email', 'username'):
+            email_owners.setdefault(email, set()).add(username)
+
+        to_create = []
+        to_update = []
+        written_rows = []
+        skipped = 0
+        for row_num, username, user_fields, profile_fields, warnings in parsed:
+            # Usernames and emails count as used only once their row is accepted,
+            # so a rejected row doesn't block a corrected one later in the file
+            email = user_fields.get('email')
+            if username in self._seen_usernames:
+                self._error(row_num, f'Duplicate username {username} in file')
+                continue
+            if email and self._seen_emails.get(email, username) != username:
+                self._error(row_num, f'Duplicate email {email} in file')
+                continue
+            if email_owners.get(email, set()) - {username}:
+                self._error(row_num, f'Email {email} already exists for different user')
+                continue
+            self._seen_usernames.add(username)
+            if email:
+                self._seen_emails[email] = username
+            for warning in warnings:
+                self._warning(row_num, warning)
+            if username not in existing:
+                to_create.append((username, user_fields, profile_fields))
+            elif self.update_existing:
+                to_update.append((existing[username], user_fields, profile_fields))
+            else:
+                skipped += 1
+                continue
+            written_rows.append(row_num)
+
+        if not self.dry_run and (to_create or to_update):
+            try:
+                with transaction.atomic():
+                    self._create_users(to_create)
+                    self._update_users(to_update)
+            except Exception as e:
+                logger.error(f'User import chunk at row {chunk[0][0]} failed: {e}')
+                for row_num in written_rows:
+                    self._error(row_num, f'Chunk failed: {e}')
+                to_create, to_update = [], []
+
+        self.counts['created'] += len(to_create)
+        self.counts['updated'] += len(to_update)
+        self.counts['skipped'] += skipped
+
+        if binary_file is not None:
+            try:
+                self.bytes_processed = binary_file.tell()
+            except (OSError, ValueError):
+                pass
+        if self.progress:
+            self.progress(self)
+
+    def _create_users(self, rows):
+        if not rows:
+            return
+        User.objects.bulk_create([
+            User(username=username, password=self.password_hash, **user_fields)
+            for username, user_fields, _ in rows
+        ], batch_size=self.chunk_size)
+
+        # Not every backend returns primary keys from bulk_create
+        user_ids = dict(
+            User.objects.filter(username__in=[username for username, _, _ in rows])
+            .values_list('username', 'pk')
+        )
+        users = []
+        profiles = []
+        for username, _, profile_fields in rows:
+            user = User(pk=user_ids[username], username=username)
+            users.append(user)
+            fields = {'role': self.default_role, **self.profile_defaults, **profile_fields}
+            profiles.append(UserProfile(user=user, **fields))
+        UserProfile.objects.bulk_create(profiles, batch_size=self.chunk_size)
+        create_default_notification_preferences_bulk(users)
+
+    def _update_users(self, rows):
+        if not rows:
+            return
+        user_fields_changed = set()
+        profile_fields_changed = set()
+        for user, user_fields, profile_fields in rows:
+            for field, value in user_fields.items():
+                setattr(user, field, value)
+            user_fields_changed.update(user_fields)
+            profile_fields_changed.update(profile_fields)
+        if user_fields_changed:
+            User.objects.bulk_update([row[0] for row in rows], sorted(user_fields_changed),
+                                     batch_size=self.chunk_size)
+
+        profiles = {
+            profile.user_id: profile
+            for profile in UserProfile.objects.filter(user__in=[row[0] for row in rows])
+        }
+        now = timezone.now()
+        new_profiles = []
+        for user, _, profile_fields in rows:
+            profile = profiles.get(user.pk)
+            if profile is None:
+                fields = {'role': self.default_role, **self.profile_defaults, **profile_fields}
+                new_profiles.append(UserProfile(user=user, **fields))
+                continue
+            for field, value in profile_fields.items():
+                setattr(profile, field, value)
+            profile.updated_at = now
+        if profile_fields_changed and profiles:
+            UserProfile.objects.bulk_update(
+                list(profiles.values()), sorted(profile_fields_changed | {'updated_at'}),
+                batch_size=self.chunk_size
+            )
+        UserProfile.objects.bulk_create(new_profiles, batch_size=self.chunk_size)
+
+
+def queue_import(uploaded_file, user=None, update_existing=False) -> UserImportJob:
+    """Store an uploaded CSV file as a pending import job."""
+    job = UserImportJob(created_by=user, update_existing=update_existing, file_size=uploaded_file.size)
+    job.file.save(uploaded_file.name, uploaded_file, save=False)
+    job.save()
+    return job
+
+
+def run_import_job(job: UserImportJob) -> UserImportJob:
+    """Import a job's file, saving progress after every chunk."""
+    def save_progress(importer):
+        UserImportJob.objects.filter(pk=job.pk).update(
+            bytes_processed=importer.bytes_processed,
+            rows_processed=importer.counts['rows'],
+            created_count=importer.counts['created'],
+            updated_count=importer.counts['updated'],
+            skipped_count=importer.counts['skipped'],
+            error_count=importer.counts['errors'],
+            progress_at=timezone.now(),
+        )
+
+    # Matches accounts created one at a time from the lab admin pages
+    importer = UserImporter(
+        update_existing=job.update_existing,
+        default_role='researcher',
+        profile_defaults={'is_inducted': False, 'email_verified': False},
+        progress=save_progress,
+    )
+    try:
+        with job.file.open('rb') as csv_file:
+            importer.run(csv_file)
+    except Exception as e:
+        logger.error(f'User import job {job.pk} failed: {e}')
+        job.status = 'failed'
+        job.last_error = str(e)
+    else:
+        job.status = 'completed'
+        job.bytes_processed = job.file_size
+
+    job.rows_processed = importer.counts['rows']
+    job.created_count = importer.counts['created']
+    job.updated_count = importer.counts['updated']
+    job.skipped_count = importer.counts['skipped']
+    job.error_count = importer.counts['errors']
+    job.errors = importer.errors
+    job.warnings = importer.warnings
+    job.finished_at = timezone.now()
+    # The upload holds personal data and isn't needed once imported
+    job.file.delete(save=False)
+    job.save()
+    return job
+
+
+def fail_stalled_jobs() -> int:
+    """
+    Fail running jobs with no progress for USER_IMPORT_STALL_TIMEOUT seconds.
+
+    A job is left running when the scheduler stops partway through it, and
+    would otherwise be polled by the lab admin page forever.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'USER_IMPORT_STALL_TIMEOUT', 900))
+    stalled = UserImportJob.objects.filter(status='running').filter(
+        Q(progress_at__lt=cutoff) | Q(progress_at__isnull=True, started_at__lt=cutoff)
+    )
+    count = 0
+    for job in stalled:
+        logger.error(f'User import job {job.pk} stopped making progress')
+        job.status = 'failed'
+        job.last_error = (
+            f'The import stopped after {job.rows_processed} rows, probably because the '
+            f'scheduler restarted. Upload the file again to import the remaining rows.'
+        )
+        job.finished_at = timezone.now()
+        job.file.delete(save=False)
+        job.save()
+        count += 1
+    return count
+
+
+def process_import_jobs(limit: int = 1) -> Dict[str, int]:
+    """Fail stalled jobs, then claim and run pending import jobs, oldest first."""
+    results = {'completed': 0, 'failed': 0}
+    stalled = fail_stalled_jobs()
+    if stalled:
+        results['stalled'] = stalled
+    for _ in range(limit):
+        with transaction.atomic():
+            job = UserImportJob.objects.select_for_update(skip_locked=True).filter(
+                status='pending'
+            ).order_by('created_at').first()
+            if job is None:
+                break
+            job.status = 'running'
+            job.started_at = job.progress_at = timezone.now()
+            job.save(update_fields=['status', 'started_at', 'progress_at'])
+
+        run_import_job(job)
+        results[job.status] += 1
+    return results
+
+
+def job_status(job: UserImportJob) -> Dict:
+    """Summarise a job for the lab admin progress display."""
+    return {
+        'job_id': job.pk,
+        'status': job.status,
+        'progress': job.progress_percent,
+        'rows_processed': job.rows_processed,
+        'created': job.created_count,
+        'updated': job.updated_count,
+        'skipped': job.skipped_count,
+        'error_count': job.error_count,
+        'errors': [f"Row {error['row']}: {error['error']}" for error in job.errors],
+        'warnings': [f"Row {warning['row']}: {warning['warning']}" for warning in job.warnings],
+        'error': job.last_error,
+    }
@@ -22,6 +22,7 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.http import require_http_methods
 from django.template.loader import render_to_string
 from django.http import JsonResponse
+from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.views import PasswordResetView, PasswordResetConfirmView, LoginView
 from django.contrib import messages
@@ -49,6 +50,10 @@ from ..forms import (
 from ..recurring import RecurringBookingGenerator, RecurringBookingManager
 from ..conflicts import ConflictDetector, ConflictResolver, ConflictManager
 from ..services.licensing import require_license_feature
+from ..pagination import OptionalKeysetPagination
+from ..bulk_booking import bulk_booking_service
+from ..idempotency import idempotent
+from ..throttling import FeedTokenRateThrottle, throttle_view
 from booking.serializers import (
     UserProfileSerializer, ResourceSerializer, BookingSerializer,
     ApprovalRuleSerializer, MaintenanceSerializer, WaitingListEntrySerializer,
@@ -171,6 +176,10 @@ class ResourceViewSet(viewsets.ModelViewSet):
         """Filter resources based on query parameters."""
         queryset = super().get_queryset()
         
+        fields, expand = ResourceSerializer.get_requested_fields(self.request)
+        if fields is not None or expand is not None:
+            queryset = ResourceSerializer.select_for_fields(queryset, fields, expand)
+        
         # Filter by resource_type if provided
         resource_type = self.request.query_params.get('resource_type')
         if resource_type:
@@ -204,11 +213,22 @@ class BookingViewSet(viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrManagerPermission]
+    pagination_class = OptionalKeysetPagination
+    # Must be declared for @action(throttle_scope=...) to set it; see booking/throttling.py
+    throttle_scope = None
     
     def get_queryset(self):
         """Filter bookings based on user role and query parameters."""
         user = self.request.user
-        queryset = Booking.objects.select_related('resource', 'user', 'approved_by')
+        fields, expand = BookingSerializer.get_requested_fields(self.request)
+        if fields is not None or expand is not None:
+            # Only fetch what the sparse fieldset reads
+            queryset = BookingSerializer.select_for_fields(Booking.objects.all(), fields, expand)
+        elif self.action == 'calendar':
+            # Events only read the resource and user names
+            queryset = Booking.objects.select_related('resource', 'user')
+        else:
+            queryset = BookingSerializer.select_for_all_fields(Booking.objects.all())
         
         try:
             user_profile = user.userprofile
@@ -264,6 +284,56 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('start_time')
     
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """Create a booking; retries with the same Idempotency-Key get the first response."""
+        return super().create(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['post'], url_path='bulk', throttle_scope='bulk')
+    @idempotent
+    def bulk_create(self, request):
+        """
+        Create many bookings in one request.
+
+        The body is ``{"bookings": [...], "atomic": true}``. Atomic requests create
+        nothing unless every booking is valid; otherwise valid bookings are created
+        and the rest reported. Each item gets a result with its index and status.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"error": "Request body must be an object with a bookings list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        items = request.data.get('bookings')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "bookings must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_items = getattr(settings, 'API_BULK_BOOKING_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            return Response(
+                {"error": f"At most {max_items} bookings can be created per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        atomic = str(request.data.get('atomic', True)).lower() not in ('false', '0')
+        results = bulk_booking_service.create_bookings(request.user, items, atomic=atomic)
+        created = sum(1 for result in results if result['status'] == 'created')
+        
+        if created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {'atomic': atomic, 'created': created, 'results': results},
+            status=response_status
+        )
+    
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """Approve a booking."""
@@ -333,7 +403,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(booking)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], throttle_scope='calendar')
     def calendar(self, request):
         """Get bookings in calendar event format."""
         queryset = self.get_queryset()
@@ -366,7 +436,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         return Response(events)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], throttle_scope='statistics')
     def statistics(self, request):
         """Get booking statistics."""
         user_profile = request.user.userprofile
@@ -624,6 +694,8 @@ class MaintenanceViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Maintenance.objects.all()
     serializer_class = MaintenanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Must be declared for @action(throttle_scope=...) to set it; see booking/throttling.py
+    throttle_scope = None
     
     def get_queryset(self):
         """Filter maintenance by date range if provided."""
@@ -651,7 +723,7 @@ class MaintenanceViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset.order_by('start_time')
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], throttle_scope='calendar')
     def calendar(self, request):
         """Get maintenance periods formatted for FullCalendar."""
         # Get date range from query params
@@ -1401,6 +1473,7 @@ def notification_preferences(request):
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """API viewset for user notifications."""
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
     
     def get_queryset(self):
         return Notification.objects.filter(
@@ -1599,6 +1672,10 @@ class WaitingListEntryViewSet(viewsets.ModelViewSet):
     """API viewset for waiting list entries."""
     serializer_class = WaitingListEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
+    cursor_ordering = 'id'
+    # Must be declared for @action(throttle_scope=...) to set it; see booking/throttling.py
+    throttle_scope = None
     
     def get_queryset(self):
         """Get waiting list entries based on user permissions."""
@@ -1679,7 +1756,7 @@ class WaitingListEntryViewSet(viewsets.ModelViewSet):
         
         return Response(formatted_opportunities)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], throttle_scope='statistics')
     def statistics(self, request):
         """Get waiting list statistics."""
         if request.user.userprofile.role not in ['technician', 'sysadmin']:
@@ -2365,29 +2442,14 @@ def bulk_booking_operations_view(request):
     return redirect('booking:dashboard')
 
 
-@login_required
-def booking_management_view(request):
-    """Management interface for bookings with bulk operations."""
-    try:
-        user_profile = request.user.userprofile
-        if user_profile.role not in ['technician', 'sysadmin']:
-            messages.error(request, 'You do not have permission to access booking management.')
-            return redirect('booking:dashboard')
-    except UserProfile.DoesNotExist:
-        messages.error(request, 'You do not have permission to access booking management.')
-        return redirect('booking:dashboard')
-    
-    # Get filter parameters
-    status_filter = request.GET.get('status', '')
-    resource_filter = request.GET.get('resource', '')
-    user_filter = request.GET.get('user', '')
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
-    
-    # Base queryset
-    bookings = Booking.objects.select_related('resource', 'user', 'approved_by').order_by('-created_at')
+def filter_managed_bookings(bookings, params):
+    """Apply the booking management page filters to a booking queryset."""
+    status_filter = params.get('status', '')
+    resource_filter = params.get('resource', '')
+    user_filter = params.get('user', '')
+    date_from = params.get('date_from', '')
+    date_to = params.get('date_to', '')
     
-    # Apply filters
     if status_filter:
         bookings = bookings.filter(status=status_filter)
     
@@ -2415,6 +2477,33 @@ def booking_management_view(request):
         except ValueError:
             pass
     
+    return bookings
+
+
+@login_required
+def booking_management_view(request):
+    """Management interface for bookings with bulk operations."""
+    try:
+        user_profile = request.user.userprofile
+        if user_profile.role not in ['technician', 'sysadmin']:
+            messages.error(request, 'You do not have permission to access booking management.')
+            return redirect('booking:dashboard')
+    except UserProfile.DoesNotExist:
+        messages.error(request, 'You do not have permission to access booking management.')
+        return redirect('booking:dashboard')
+    
+    # Get filter parameters
+    status_filter = request.GET.get('status', '')
+    resource_filter = request.GET.get('resource', '')
+    user_filter = request.GET.get('user', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    bookings = filter_managed_bookings(
+        Booking.objects.select_related('resource', 'user', 'approved_by').order_by('-created_at'),
+        request.GET
+    )
+    
     # Pagination
     from django.core.paginator import Paginator
     paginator = Paginator(bookings, 25)  # Show 25 bookings per page
@@ -3720,7 +3809,13 @@ class AccessRequestViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """Create an access request; retries with the same Idempotency-Key get the first response."""
+        return super().create(request, *args, **kwargs)
+    
     @action(detail=True, methods=['post'])
+    @idempotent
     def approve(self, request, pk=None):
         """Approve an access request."""
         access_request = self.get_object()
@@ -3749,6 +3844,7 @@ class AccessRequestViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
+    @idempotent
     def reject(self, request, pk=None):
         """Reject an access request."""
         access_request = self.get_object()
@@ -4317,10 +4413,11 @@ def approval_statistics_view(request):
     else:
         end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
     
-    # Base queryset for statistics
+    # Base queryset for statistics: every period overlapping the range, so
+    # the current (still open) period is included
     stats_qs = ApprovalStatistics.objects.filter(
-        period_start__gte=start_date,
-        period_end__lte=end_date,
+        period_start__lte=end_date,
+        period_end__gte=start_date,
         period_type=period_type
     )
     
@@ -4353,9 +4450,9 @@ def approval_statistics_view(request):
     previous_start = start_date - (end_date - start_date)
     previous_end = start_date - timedelta(days=1)
     
+    # Periods that ended in the previous window (so none overlap stats_qs)
     previous_stats = ApprovalStatistics.objects.filter(
-        period_start__gte=previous_start,
-        period_end__lte=previous_end,
+        period_end__range=[previous_start, previous_end],
         period_type=period_type
     )
     
@@ -5588,151 +5685,58 @@ def lab_admin_user_add_view(request):
 @login_required
 @user_passes_test(is_lab_admin)
 def lab_admin_users_bulk_import_view(request):
-    """Bulk import users from CSV."""
+    """Queue a CSV file of users to be imported in the background."""
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Method not allowed'})
     
+    from ..user_import import UserImportError, check_columns, decode_csv, queue_import
+    from django.urls import reverse
+    import csv
+    
+    csv_file = request.FILES.get('csv_file')
+    if not csv_file:
+        return JsonResponse({'success': False, 'error': 'No file uploaded'})
+    
+    max_size = getattr(settings, 'USER_IMPORT_MAX_FILE_SIZE', 0)
+    if max_size and csv_file.size > max_size:
+        return JsonResponse({
+            'success': False,
+            'error': f'File too large (max {max_size // (1024 * 1024)}MB)'
+        })
+    
+    # Check the header now so a wrong file is reported straight away
+    text = decode_csv(csv_file)
     try:
-        import csv
-        from io import StringIO
-        from booking.models import UserProfile
-        
-        csv_file = request.FILES.get('csv_file')
-        if not csv_file:
-            return JsonResponse({'success': False, 'error': 'No file uploaded'})
-        
-        # Check file size
-        if csv_file.size > 5 * 1024 * 1024:  # 5MB limit
-            return JsonResponse({'success': False, 'error': 'File too large (max 5MB)'})
-        
-        # Read CSV with better error handling
-        try:
-            file_data = csv_file.read().decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                csv_file.seek(0)
-                file_data = csv_file.read().decode('latin-1')
-            except:
-                return JsonResponse({'success': False, 'error': 'Unable to decode file. Please ensure it\'s a valid UTF-8 or Latin-1 encoded CSV file.'})
-        
-        # Parse CSV
-        try:
-            csv_reader = csv.DictReader(StringIO(file_data))
-            rows = list(csv_reader)
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': f'Invalid CSV format: {str(e)}'})
-        
-        if not rows:
-            return JsonResponse({'success': False, 'error': 'CSV file is empty or has no data rows'})
-        
-        # Check required columns
-        required_columns = ['username']
-        first_row = rows[0]
-        missing_columns = [col for col in required_columns if col not in first_row]
-        if missing_columns:
-            return JsonResponse({
-                'success': False, 
-                'error': f'Missing required columns: {", ".join(missing_columns)}. Available columns: {", ".join(first_row.keys())}'
-            })
-        
-        created = 0
-        updated = 0
-        errors = []
-        row_num = 1  # Start from 1 (header is row 0)
-        
-        for row in rows:
-            row_num += 1
-            try:
-                username = row.get('username', '').strip()
-                if not username:
-                    errors.append(f'Row {row_num}: Missing username')
-                    continue
-                
-                email = row.get('email', '').strip()
-                first_name = row.get('first_name', '').strip()
-                last_name = row.get('last_name', '').strip()
-                role = row.get('role', 'researcher').strip()
-                
-                if User.objects.filter(username=username).exists():
-                    if request.POST.get('update_existing') == 'on':
-                        user = User.objects.get(username=username)
-                        
-                        # Update user fields
-                        if email:
-                            user.email = email
-                        if first_name:
-                            user.first_name = first_name
-                        if last_name:
-                            user.last_name = last_name
-                        user.save()
-                        
-                        # Update or create profile
-                        if hasattr(user, 'userprofile'):
-                            if role:
-                                user.userprofile.role = role
-                                user.userprofile.save()
-                        else:
-                            UserProfile.objects.create(
-                                user=user,
-                                role=role,
-                            )
-                        
-                        updated += 1
-                    else:
-                        errors.append(f'Row {row_num}: User {username} already exists')
-                else:
-                    # Create new user
-                    from django.contrib.auth.models import make_password
-                    import secrets
-                    import string
-                    
-                    # Generate random password
-                    password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
-                    
-                    user = User.objects.create_user(
-                        username=username,
-                        email=email,
-                        password=password,
-                        first_name=first_name,
-                        last_name=last_name,
-                    )
-                    
-                    # Create user profile (use get_or_create to avoid duplicates)
-                    profile, created_profile = UserProfile.objects.get_or_create(
-                        user=user,
-                        defaults={
-                            'role': role,
-                            'phone': '',  # Default empty phone
-                            'is_inducted': False,
-                            'email_verified': False,
-                        }
-                    )
-                    
-                    # If profile existed, update the role
-                    if not created_profile and role:
-                        profile.role = role
-                        profile.save()
-                    
-                    created += 1
-                    
-            except Exception as e:
-                errors.append(f'Row {row_num}: Error processing - {str(e)}')
-        
-        # Prepare response
-        response_data = {
-            'success': True,
-            'created': created,
-            'updated': updated,
-        }
-        
-        if errors:
-            response_data['errors'] = errors
-            response_data['message'] = f'Processed with {len(errors)} error(s)'
-        
-        return JsonResponse(response_data)
-        
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': f'Import failed: {str(e)}'})
+        check_columns(next(csv.reader(text), None))
+    except UserImportError as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    except (csv.Error, UnicodeDecodeError) as e:
+        return JsonResponse({'success': False, 'error': f'Invalid CSV format: {str(e)}'})
+    finally:
+        text.detach()
+    csv_file.seek(0)
+    
+    job = queue_import(
+        csv_file,
+        user=request.user,
+        update_existing=request.POST.get('update_existing') == 'on'
+    )
+    return JsonResponse({
+        'success': True,
+        'job_id': job.pk,
+        'status_url': reverse('booking:lab_admin_users_import_status', args=[job.pk]),
+    }, status=202)
+
+
+@login_required
+@user_passes_test(is_lab_admin)
+def lab_admin_users_import_status_view(request, job_id):
+    """Report progress and row errors for a background user import."""
+    from ..models import UserImportJob
+    from ..user_import import job_status
+    
+    job = get_object_or_404(UserImportJob, pk=job_id)
+    return JsonResponse({'success': True, **job_status(job)})
 
 
 @login_required
@@ -5840,16 +5844,11 @@ def lab_admin_users_bulk_action_view(request):
 @login_required
 @user_passes_test(is_lab_admin)
 def lab_admin_users_export_view(request):
-    """Export users to CSV."""
-    import csv
-    from django.http import HttpResponse
-    
-    # Create response
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="users_export.csv"'
+    """Stream users as CSV, or JSON with ?format=json."""
+    from ..exports import USER_COLUMNS, export_response
     
     # Get filtered users
-    users = User.objects.select_related('userprofile').order_by('username')
+    users = User.objects.all()
     
     # Apply filters
     is_active_filter = request.GET.get('is_active')
@@ -5877,24 +5876,57 @@ def lab_admin_users_export_view(request):
             Q(email__icontains=search_query)
         )
     
-    # Write CSV
-    writer = csv.writer(response)
-    writer.writerow(['username', 'email', 'first_name', 'last_name', 'role', 'department', 'is_active', 'email_verified', 'date_joined'])
+    return export_response(
+        users, USER_COLUMNS, 'users_export', request.GET.get('format', 'csv'), key='username'
+    )
+
+
+@login_required
+@user_passes_test(is_lab_admin)
+def lab_admin_bookings_export_view(request):
+    """
+    Stream bookings matching the booking management filters as CSV or JSON.
     
-    for user in users:
-        writer.writerow([
-            user.username,
-            user.email,
-            user.first_name,
-            user.last_name,
-            user.userprofile.get_role_display() if hasattr(user, 'userprofile') else '',
-            user.userprofile.department.name if hasattr(user, 'userprofile') and user.userprofile.department else '',
-            'Yes' if user.is_active else 'No',
-            'Yes' if hasattr(user, 'userprofile') and user.userprofile.email_verified else 'No',
-            user.date_joined.strftime('%Y-%m-%d'),
-        ])
+    CSV shows display labels and local times; JSON keeps raw values.
+    """
+    from ..exports import BOOKING_COLUMNS, export_response
     
-    return response
+    # Filters must be checked before streaming starts, or a bad value fails mid-download
+    resource_filter = request.GET.get('resource', '')
+    if resource_filter and not resource_filter.isdigit():
+        return JsonResponse({'error': 'resource must be a resource id'}, status=400)
+    
+    bookings = filter_managed_bookings(Booking.objects.all(), request.GET)
+    return export_response(bookings, BOOKING_COLUMNS, 'bookings_export', request.GET.get('format', 'csv'))
+
+
+@login_required
+@user_passes_test(is_lab_admin)
+def lab_admin_usage_export_view(request):
+    """
+    Stream daily resource usage analytics as CSV or JSON.
+    
+    CSV shows display labels and local times; JSON keeps raw values.
+    """
+    from ..exports import USAGE_COLUMNS, export_response
+    from ..models import UsageAnalytics
+    
+    usage = UsageAnalytics.objects.all()
+    
+    # Filters must be checked before streaming starts, or a bad value fails mid-download
+    resource_filter = request.GET.get('resource')
+    if resource_filter:
+        if not resource_filter.isdigit():
+            return JsonResponse({'error': 'resource must be a resource id'}, status=400)
+        usage = usage.filter(resource_id=resource_filter)
+    
+    for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+        try:
+            usage = usage.filter(**{lookup: datetime.strptime(request.GET[param], '%Y-%m-%d').date()})
+        except (KeyError, ValueError):
+            pass
+    
+    return export_response(usage, USAGE_COLUMNS, 'usage_export', request.GET.get('format', 'csv'))
 
 
 @login_required
@@ -6805,6 +6837,7 @@ def lab_admin_inductions_view(request):
 
 
 @login_required
+@throttle_view('ics_export')
 def export_my_calendar_view(request):
     """Export user's bookings as ICS file for download."""
     from booking.calendar_sync import ICSCalendarGenerator, create_ics_response
@@ -6829,6 +6862,7 @@ def export_my_calendar_view(request):
 
 
 @login_required
+@throttle_view('ics_export', throttle_class=FeedTokenRateThrottle)
 def my_calendar_feed_view(request, token):
     """Provide ICS calendar feed for subscription (with token authentication)."""
     from booking.calendar_sync import ICSCalendarGenerator, CalendarTokenGenerator, create_ics_feed_response
@@ -6852,6 +6886,7 @@ def my_calendar_feed_view(request, token):
     return create_ics_feed_response(ics_content)
 
 
+@throttle_view('ics_export', throttle_class=FeedTokenRateThrottle)
 def public_calendar_feed_view(request, token):
     """Provide public ICS calendar feed for subscription (token-based, no login required)."""
     from booking.calendar_sync import ICSCalendarGenerator, CalendarTokenGenerator, create_ics_feed_response
@@ -6883,6 +6918,7 @@ def public_calendar_feed_view(request, token):
 
 
 @login_required
+@throttle_view('ics_export')
 def export_resource_calendar_view(request, resource_id):
     """Export resource bookings as ICS file for download."""
     from booking.calendar_sync import ICSCalendarGenerator, create_ics_response
@@ -7039,7 +7075,7 @@ def google_calendar_settings_view(request):
 @login_required
 def google_calendar_sync_view(request):
     """Manually trigger Google Calendar sync."""
-    from ..services.google_calendar import google_calendar_service
+    from ..services.google_calendar import queue_manual_sync
     from ..models import GoogleCalendarIntegration
     
     try:
@@ -7049,51 +7085,12 @@ def google_calendar_sync_view(request):
             messages.error(request, 'Google Calendar sync is not available. Please check your connection.')
             return redirect('booking:calendar_sync_settings')
         
-        # Get user's future bookings
-        from ..models import Booking
-        bookings = Booking.objects.filter(
-            user=request.user,
-            start_time__gte=timezone.now(),
-            status__in=['confirmed', 'pending']
-        ).order_by('start_time')
-        
-        sync_count = 0
-        error_count = 0
-        
-        for booking in bookings:
-            # Check if booking already has a Google event
-            existing_log = booking.googlecalendarsynclog_set.filter(
-                user=request.user,
-                action='created',
-                status='success'
-            ).first()
-            
-            if existing_log:
-                # Update existing event
-                success = google_calendar_service.update_calendar_event(
-                    integration, booking, existing_log.google_event_id
-                )
-            else:
-                # Create new event
-                event_id = google_calendar_service.create_calendar_event(integration, booking)
-                success = event_id is not None
-            
-            if success:
-                sync_count += 1
-            else:
-                error_count += 1
-        
-        # Update last sync time
-        integration.last_sync = timezone.now()
-        integration.save()
-        
-        if error_count == 0:
-            messages.success(request, f'Successfully synced {sync_count} bookings to Google Calendar.')
-        else:
-            messages.warning(
-                request, 
-                f'Synced {sync_count} bookings successfully, but {error_count} failed. Check sync logs for details.'
-            )
+        # Sync runs in the background so the request doesn't wait on Google
+        queued = queue_manual_sync(integration)
+        messages.success(
+            request,
+            f'Queued {queued} bookings for sync to Google Calendar. They will appear shortly.'
+        )
         
     except GoogleCalendarIntegration.DoesNotExist:
         messages.error(request, 'Google Calendar is not connected. Please connect first.')
@@ -8045,6 +8042,7 @@ def site_admin_logs_ajax(request):
         source = request.GET.get('source')
         level = request.GET.get('level')
         search = request.GET.get('search')
+        cursor = request.GET.get('cursor')
         
         # Validate numeric parameters
         try:
@@ -8059,7 +8057,13 @@ def site_admin_logs_ajax(request):
         hours = min(max(hours, 1), 720)  # 1 hour to 30 days
         max_lines = min(max(max_lines, 1), 1000)  # 1 to 1000 lines
         
-        logs = log_viewer.get_logs(source, level, search, hours, max_lines)
+        # Follow-up polls pass the previous cursor to fetch only new lines
+        try:
+            logs, next_cursor = log_viewer.get_logs_since(cursor, source, level, search, hours, max_lines)
+        except ValueError:
+            return JsonResponse({
+                'error': 'Invalid cursor'
+            }, status=400)
         
         log_data = []
         for log in logs:
@@ -8078,6 +8082,7 @@ def site_admin_logs_ajax(request):
         return JsonResponse({
             'logs': log_data,
             'total': len(log_data),
+            'cursor': next_cursor,
             'status': 'success'
         })
         
@@ -8090,6 +8095,117 @@ def site_admin_logs_ajax(request):
         }, status=500)
 
 
+@user_passes_test(lambda u: hasattr(u, 'userprofile') and u.userprofile.role == 'sysadmin')
+def site_admin_notification_analytics_ajax(request):
+    """AJAX endpoint for notification volume and delivery statistics."""
+    from django.http import JsonResponse
+    from django.utils.dateparse import parse_datetime
+    from booking.notification_analytics import notification_analytics
+    
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in notification_analytics.GRANULARITIES:
+        return JsonResponse({'error': 'Invalid granularity'}, status=400)
+    
+    try:
+        start = parse_datetime(request.GET['start']) if request.GET.get('start') else None
+        end = parse_datetime(request.GET['end']) if request.GET.get('end') else None
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date or numeric parameter'}, status=400)
+    
+    if (request.GET.get('start') and start is None) or (request.GET.get('end') and end is None):
+        return JsonResponse({'error': 'Invalid date parameter'}, status=400)
+    if start and timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    if end and timezone.is_naive(end):
+        end = timezone.make_aware(end)
+    if start and end and start >= end:
+        return JsonResponse({'error': 'Start must be before end'}, status=400)
+    
+    # Keep hourly series to a sensible number of buckets
+    days = min(max(days, 1), 366)
+    period_end = end or timezone.now()
+    if granularity == 'hour' and period_end - (start or period_end - timedelta(days=days)) > timedelta(days=31):
+        return JsonResponse({'error': 'Hourly granularity is limited to 31 days'}, status=400)
+    
+    # Leave a missing end to the service so default requests share its cache
+    stats = notification_analytics.get_notification_stats(
+        days=days, start=start, end=end, granularity=granularity
+    )
+    
+    return JsonResponse({
+        'status': 'success',
+        'period_start': stats['period_start'].isoformat(),
+        'period_end': stats['period_end'].isoformat(),
+        'granularity': granularity,
+        'totals': {
+            'total': stats['total_notifications'],
+            'sent': stats['sent_notifications'],
+            'failed': stats['failed_notifications'],
+            'read': stats['read_notifications'],
+            'delivery_rate': stats['delivery_rate'],
+            'read_rate': stats['read_rate'],
+        },
+        'type_breakdown': stats['type_breakdown'],
+        'method_breakdown': stats['method_breakdown'],
+        'series': [
+            {**bucket, 'date': bucket['date'].isoformat()}
+            for bucket in stats['daily_volume']
+        ],
+    })
+
+
+def health_liveness_view(request):
+    """Liveness probe: the process is up and serving requests."""
+    from django.http import JsonResponse
+    
+    return JsonResponse({'status': 'ok'})
+
+
+def health_readiness_view(request):
+    """Readiness probe: the database and cache are reachable."""
+    from django.http import JsonResponse
+    from ..health import check_readiness
+    
+    ready, checks = check_readiness()
+    return JsonResponse(
+        {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+        status=200 if ready else 503
+    )
+
+
+@user_passes_test(lambda u: hasattr(u, 'userprofile') and u.userprofile.role == 'sysadmin')
+def site_admin_performance_view(request):
+    """Slowest views and recent slow requests recorded by the profiling middleware."""
+    from ..profiling import (
+        clear_profiles, get_slow_request_ms, get_slow_request_queries, get_slow_requests, get_view_stats
+    )
+    
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        clear_profiles()
+        messages.success(request, "Request profiles cleared.")
+        return redirect('booking:site_admin_performance')
+    
+    sort_options = {
+        'p95_ms': 'p95 time', 'p99_ms': 'p99 time', 'max_queries': 'Most queries',
+        'avg_db_ms': 'Database time', 'count': 'Requests',
+    }
+    order_by = request.GET.get('sort', 'p95_ms')
+    if order_by not in sort_options:
+        order_by = 'p95_ms'
+    
+    context = {
+        'profiling_enabled': getattr(settings, 'REQUEST_PROFILING_ENABLED', False),
+        'view_stats': get_view_stats(order_by)[:50],
+        'slow_requests': get_slow_requests(),
+        'slow_request_ms': get_slow_request_ms(),
+        'slow_request_queries': get_slow_request_queries(),
+        'sort_options': sort_options,
+        'order_by': order_by,
+    }
+    return render(request, 'booking/site_admin_performance.html', context)
+
+
 @user_passes_test(lambda u: hasattr(u, 'userprofile') and u.userprofile.role == 'sysadmin')
 def site_admin_health_check_view(request):
     """System health check endpoint for site administrators."""
@@ -8154,55 +8270,45 @@ def site_admin_health_check_view(request):
         if overall_status == 'healthy':
             overall_status = 'warning'
     
-    # System resources check
-    try:
-        import psutil
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        system_status = 'healthy'
-        warnings = []
-        
-        if cpu_percent > 80:
-            warnings.append(f'High CPU usage: {cpu_percent}%')
-            system_status = 'warning'
-        
-        if memory.percent > 80:
-            warnings.append(f'High memory usage: {memory.percent}%')
-            system_status = 'warning'
-        
-        if disk.percent > 85:
-            warnings.append(f'High disk usage: {disk.percent}%')
-            system_status = 'warning'
-        
-        health_results['system_resources'] = {
-            'status': system_status,
-            'cpu_percent': cpu_percent,
-            'memory_percent': memory.percent,
-            'disk_percent': disk.percent,
-            'warnings': warnings,
-            'message': 'System resources monitored'
-        }
-        
-        if system_status == 'warning' and overall_status == 'healthy':
-            overall_status = 'warning'
-            
-    except ImportError:
+    # System resources from the latest background sample. Without a fresh
+    # sample the status is unknown, so it is reported as a warning rather
+    # than measured here (an in-request CPU reading is always 0).
+    from ..health import get_latest_sample, get_max_sample_age
+    sample, sample_age = get_latest_sample()
+    if sample is None:
         health_results['system_resources'] = {
             'status': 'warning',
-            'message': 'System resource monitoring unavailable (psutil not installed)'
+            'message': 'No system sample recorded yet - is the scheduler running with a shared cache?'
         }
-        if overall_status == 'healthy':
-            overall_status = 'warning'
-    except Exception as e:
+    elif 'error' in sample:
         health_results['system_resources'] = {
             'status': 'warning',
-            'error': str(e),
+            'error': sample['error'],
+            'sampled_at': sample['sampled_at'],
+            'sample_age_seconds': sample_age,
             'message': 'Could not check system resources'
         }
-        if overall_status == 'healthy':
-            overall_status = 'warning'
+    else:
+        warnings = list(sample['warnings'])
+        stale = sample_age > get_max_sample_age()
+        if stale:
+            warnings.append(f'System sample is stale ({sample_age:.0f}s old)')
+        
+        health_results['system_resources'] = {
+            'status': 'warning' if warnings else 'healthy',
+            'cpu_percent': sample['cpu_percent'],
+            'memory_percent': sample['memory_percent'],
+            'disk_percent': sample['disk_percent'],
+            'db_latency_ms': sample['db_latency_ms'],
+            'sampled_at': sample['sampled_at'],
+            'sample_age_seconds': sample_age,
+            'stale': stale,
+            'warnings': warnings,
+            'message': 'System resources monitored'
+        }
+    
+    if health_results['system_resources']['status'] == 'warning' and overall_status == 'healthy':
+        overall_status = 'warning'
     
     # Application models check
     try:
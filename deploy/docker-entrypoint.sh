@@ -101,9 +101,11 @@ setup_logging() {
 
 # Start background scheduler (if not disabled)
 start_scheduler() {
-    if [[ "${DISABLE_SCHEDULER}" != "true" ]]; then
+    if [[ "${1:-}" == "supervisord" ]]; then
+        log_info "Scheduler is managed by supervisord"
+    elif [[ "${DISABLE_SCHEDULER}" != "true" ]]; then
         log_info "Starting background scheduler..."
-        python manage.py scheduler &
+        python manage.py scheduler start --daemon &
         log_success "Scheduler started"
     else
         log_info "Scheduler disabled"
@@ -133,7 +135,7 @@ main() {
     load_initial_data
     
     # Start scheduler
-    start_scheduler
+    start_scheduler "$@"
     
     log_success "Initialization completed successfully!"
     